@@ -1,7 +1,16 @@
 from .BaseController import BaseController
-from models.db_schemes import Project, DataChunk
+from models.db_schemes import Project, DataChunk, RetrievedDocument
+from models.ChunkModel import ChunkModel
 from stores.llm.LLMEnums import DocumentTypeEnum
+from models.enums.StreamEventEnum import StreamEventEnum
+from models.enums.IndexingEnum import IndexingEnum
+from models.enums.SearchModeEnum import SearchModeEnum
+from models.enums.CacheEnum import CacheNamespaceEnum
+from models import ResponseSignal
+from helpers.indexing_pipeline import IndexingPipeline
 from typing import List, Optional, Tuple
+import asyncio
+import hashlib
 import json
 import logging
 
@@ -10,12 +19,20 @@ logger = logging.getLogger(__name__)
 class NLPController(BaseController):
 
     def __init__(self, vectordb_client, generation_client, 
-                 embedding_client, template_parser):
+                 embedding_client, template_parser, embedding_cache=None,
+                 db_client=None, rerank_client=None, embedding_batcher=None,
+                 retrieval_cache=None, answer_cache=None):
         super().__init__()
         self.vectordb_client = vectordb_client
         self.generation_client = generation_client
         self.embedding_client = embedding_client
         self.template_parser = template_parser
+        self.embedding_cache = embedding_cache
+        self.db_client = db_client
+        self.rerank_client = rerank_client
+        self.embedding_batcher = embedding_batcher
+        self.retrieval_cache = retrieval_cache
+        self.answer_cache = answer_cache
 
     def create_collection_name(self, project_id: str):
         return f"collection_{project_id}".strip()
@@ -32,93 +49,771 @@ class NLPController(BaseController):
             json.dumps(collection_info, default=lambda x: x.__dict__)
         )
     
-    def index_into_vector_db(self, 
-                             project: Project, 
-                             chunks: List[DataChunk],
-                             chunks_ids: List[int], 
-                             do_reset: bool = False):
-        
-        # step1: get collection name
-        collection_name = self.create_collection_name(project_id=project.project_id)
+    async def aembed_texts(self, texts: list, document_type: str):
+        if self.retrieval_cache and document_type == DocumentTypeEnum.QUERY.value:
+            return await self.acached_embed_texts(texts=texts, document_type=document_type)
 
-        # step2: manage items
-        texts = [c.chunk_text for c in chunks]
-        metadata = [c.chunk_metadata for c in chunks]
-        vectors = [
-            self.embedding_client.embed_text(
-                text=text, 
-                document_type=DocumentTypeEnum.DOCUMENT.value
+        return await self.aembed_texts_uncached(texts=texts, document_type=document_type)
+
+    async def acached_embed_texts(self, texts: list, document_type: str):
+        namespace = CacheNamespaceEnum.EMBEDDING.value
+        cache_keys = [
+            self.retrieval_cache.get_cache_key(
+                namespace=namespace,
+                model_id=self.embedding_client.embedding_model_id,
+                embedding_size=self.embedding_client.embedding_size,
+                document_type=document_type,
+                text=text,
             )
             for text in texts
         ]
 
-        # step3: create collection if not exists
-        _ = self.vectordb_client.create_collection(
-            collection_name=collection_name,
-            embedding_size=self.embedding_client.embedding_size,
-            do_reset=do_reset,
-        )
+        vectors = {}
+        for cache_key in dict.fromkeys(cache_keys):
+            vector = await self.retrieval_cache.aget(namespace=namespace, key=cache_key)
+            if vector is not None:
+                vectors[cache_key] = vector
 
-        # step4: insert into vector db
-        _ = self.vectordb_client.insert_many(
-            collection_name=collection_name,
+        missed_texts = {
+            cache_key: text
+            for cache_key, text in zip(cache_keys, texts)
+            if cache_key not in vectors
+        }
+
+        if missed_texts:
+            missed_vectors = await self.aembed_texts_uncached(
+                texts=list(missed_texts.values()),
+                document_type=document_type
+            )
+
+            if not missed_vectors or len(missed_vectors) != len(missed_texts):
+                return None
+
+            for cache_key, vector in zip(missed_texts, missed_vectors):
+                vectors[cache_key] = vector
+                await self.retrieval_cache.aset(namespace=namespace, key=cache_key, value=list(vector))
+
+        return [vectors[cache_key] for cache_key in cache_keys]
+
+    async def aembed_texts_uncached(self, texts: list, document_type: str):
+        # query embeddings of concurrent requests are coalesced by the batcher
+        embedding_client = self.embedding_client
+        if self.embedding_batcher and document_type == DocumentTypeEnum.QUERY.value:
+            embedding_client = self.embedding_batcher
+
+        # the cache, when set, only sends the texts it misses to the embedding API
+        if self.embedding_cache:
+            return await self.embedding_cache.aembed_texts(
+                embedding_client=embedding_client,
+                texts=texts,
+                document_type=document_type
+            )
+
+        return await embedding_client.aembed_texts(
             texts=texts,
-            metadata=metadata,
+            document_type=document_type
+        )
+
+    async def embed_chunks(self, chunks: List[DataChunk]):
+        return await self.aembed_texts(
+            texts=[c.chunk_text for c in chunks],
+            document_type=DocumentTypeEnum.DOCUMENT.value
+        )
+
+    async def upsert_chunks_vectors(self, project: Project, chunks: List[DataChunk],
+                                    vectors: list):
+        # the point ids are the chunk ids
+        return await self.vectordb_client.ainsert_many(
+            collection_name=self.create_collection_name(project_id=project.project_id),
+            texts=[c.chunk_text for c in chunks],
+            metadata=[c.chunk_metadata for c in chunks],
+            vectors=vectors,
+            record_ids=[c.chunk_id for c in chunks],
+            asset_ids=[c.chunk_asset_id for c in chunks],
+        )
+
+    async def index_into_vector_db(self, project: Project, chunks: List[DataChunk]):
+
+        vectors = await self.embed_chunks(chunks=chunks)
+
+        if not vectors or len(vectors) != len(chunks):
+            logger.error("Error while embedding the chunks of the page.")
+            return False
+
+        return await self.upsert_chunks_vectors(
+            project=project,
+            chunks=chunks,
             vectors=vectors,
-            record_ids=chunks_ids,
         )
 
-        return True
+    def get_indexing_state(self, project: Project):
+        return (project.project_config or {}).get(IndexingEnum.CONFIG_KEY.value) or {}
+
+    def get_vector_db_config(self, project: Project, section: str):
+        # the project's overrides of the "collection" or "search" options
+        vector_db_config = (project.project_config or {}).get(IndexingEnum.VECTOR_DB_CONFIG_KEY.value) or {}
+        return vector_db_config.get(section) or None
 
-    def search_vector_db_collection(self, 
-                                    project: Project, 
-                                    text: str, 
-                                    limit: int = 20,
-                                    threshold: float = None):
+    def get_indexing_signature(self, project: Project):
+        # vectors of another embedding model can not live in the same collection,
+        # and changed collection options or payload fields only apply to a rebuilt one
+        return {
+            "embedding_model_id": self.embedding_client.embedding_model_id,
+            "embedding_size": self.embedding_client.embedding_size,
+            "collection_config": self.get_vector_db_config(project=project, section="collection"),
+            "payload_schema": self.vectordb_client.payload_schema,
+        }
+
+    def prepare_search_filters(self, filters: list):
+        # None if a condition uses an unknown field, operator or value type
+        return self.vectordb_client.prepare_filters(filters=filters)
+
+    def get_collection_version(self, project: Project):
+        return (project.project_config or {}).get(IndexingEnum.COLLECTION_VERSION_KEY.value) or 0
+
+    def get_search_cache_key(self, project: Project, text: str, limit: int, threshold: float,
+                             filters: list, search_mode: str, use_rerank: bool):
+        return self.retrieval_cache.get_cache_key(
+            namespace=CacheNamespaceEnum.SEARCH.value,
+            project_id=project.project_id,
+            collection_version=self.get_collection_version(project=project),
+            model_id=self.embedding_client.embedding_model_id,
+            text=text,
+            limit=limit,
+            threshold=threshold,
+            filters=filters,
+            search_mode=search_mode,
+            use_rerank=use_rerank,
+            search_config=self.get_vector_db_config(project=project, section="search"),
+        )
+
+    async def aget_cached_search_results(self, cache_key: str):
+        results = await self.retrieval_cache.aget(
+            namespace=CacheNamespaceEnum.SEARCH.value,
+            key=cache_key,
+        )
+        if results is None:
+            return None
+
+        return [RetrievedDocument(**result) for result in results]
+
+    async def aset_cached_search_results(self, cache_key: str, results: list):
+        await self.retrieval_cache.aset(
+            namespace=CacheNamespaceEnum.SEARCH.value,
+            key=cache_key,
+            value=[result.model_dump() for result in results],
+        )
+
+    def get_search_mode(self, search_mode: str = None):
+        # None if the mode is unknown, or needs the chunks db that was not given
+        search_mode = search_mode or self.app_settings.SEARCH_DEFAULT_MODE
+
+        if search_mode not in [m.value for m in SearchModeEnum]:
+            return None
+
+        if search_mode != SearchModeEnum.DENSE.value and self.db_client is None:
+            return None
+
+        return search_mode
+
+    async def save_indexing_state(self, project: Project, project_model, last_chunk_id: int,
+                                  reconciled_version: int = None):
+        return await project_model.update_project_config(
+            project_id=project.project_id,
+            **{IndexingEnum.CONFIG_KEY.value: {
+                **self.get_indexing_signature(project=project),
+                "last_chunk_id": last_chunk_id,
+                "reconciled_version": reconciled_version,
+            }}
+        )
+
+    async def reconcile_vector_db_records(self, project: Project, chunk_model,
+                                          last_chunk_id: int, force: bool = False,
+                                          page_size: int = 1000):
         """
-        :param threshold: If set, only keep results with similarity >= threshold
-                          (assuming your vectordb_client interprets threshold as min similarity).
+        Bring the points up to the watermark in line with the chunks: delete
+        the points whose chunks are gone (e.g. the old chunks of a re-processed
+        asset) and index the chunks under the watermark that have no point,
+        i.e. the ones committed after a higher chunk_id was already indexed.
+
+        Cheap when the chunks did not change: the ids are only walked on force
+        or if the point count differs from the count of chunks up to the
+        watermark.
+
+        Returns (deleted, reindexed) counts, or None if a chunk could not be
+        indexed.
         """
-        # step1: get collection name
         collection_name = self.create_collection_name(project_id=project.project_id)
 
-        # step2: embed text
-        vector = self.embedding_client.embed_text(
-            text=text,
-            document_type=DocumentTypeEnum.QUERY.value
+        no_points = await self.vectordb_client.acount_records(collection_name=collection_name)
+        no_chunks = await chunk_model.count_project_chunks(
+            project_id=project.project_id,
+            max_chunk_id=last_chunk_id
+        )
+
+        if no_points == no_chunks and not force:
+            return 0, 0
+
+        no_deleted = 0
+        indexed_ids = set()
+        offset = None
+        while True:
+            record_ids, offset = await self.vectordb_client.alist_record_ids(
+                collection_name=collection_name,
+                offset=offset,
+                limit=page_size,
+            )
+
+            existing_ids = await chunk_model.get_existing_chunk_ids(
+                project_id=project.project_id,
+                chunk_ids=[int(record_id) for record_id in record_ids]
+            )
+
+            stale_ids = [
+                record_id for record_id in record_ids
+                if int(record_id) not in existing_ids
+            ]
+
+            if stale_ids:
+                _ = await self.vectordb_client.adelete_by_ids(
+                    collection_name=collection_name,
+                    record_ids=stale_ids,
+                )
+                no_deleted += len(stale_ids)
+
+            indexed_ids.update(
+                int(record_id) for record_id in record_ids
+                if int(record_id) in existing_ids
+            )
+
+            if offset is None:
+                break
+
+        no_reindexed = 0
+        if len(indexed_ids) < no_chunks:
+            async for page_chunks in chunk_model.iter_project_chunks(
+                project_id=project.project_id,
+                page_size=page_size,
+                max_chunk_id=last_chunk_id,
+            ):
+                missing_chunks = [
+                    chunk for chunk in page_chunks
+                    if chunk.chunk_id not in indexed_ids
+                ]
+
+                if missing_chunks:
+                    if not await self.index_into_vector_db(project=project, chunks=missing_chunks):
+                        return None
+                    no_reindexed += len(missing_chunks)
+
+        return no_deleted, no_reindexed
+
+    async def push_project_into_vector_db(self, project: Project, chunk_model, project_model,
+                                          do_reset: bool = False, page_size: int = None):
+        """
+        Bring the collection of a project in line with its chunks.
+
+        Points are keyed by chunk_id and the last indexed chunk_id is kept as a
+        watermark in the project_config, so a push only embeds the chunks added
+        since the previous one and drops the points of deleted chunks. The
+        collection is rebuilt on do_reset, when it is missing, or when the
+        embedding model changed.
+
+        Chunk ids are not committed in order: a re-processed asset may commit
+        ids below the watermark. Every chunk rewrite bumps the collection
+        version, so the points under the watermark are reconciled with the
+        chunks whenever the version moved since the last complete push.
+
+        Returns the push counters, or None if a page could not be indexed.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        collection_version = self.get_collection_version(project=project)
+        indexing_state = self.get_indexing_state(project=project)
+        indexing_signature = self.get_indexing_signature(project=project)
+
+        is_same_signature = all(
+            indexing_state.get(key) == value
+            for key, value in indexing_signature.items()
+        )
+
+        is_created = await self.vectordb_client.acreate_collection(
+            collection_name=collection_name,
+            embedding_size=self.embedding_client.embedding_size,
+            do_reset=bool(do_reset) or not is_same_signature,
+            collection_config=indexing_signature["collection_config"],
+        )
+
+        last_chunk_id = indexing_state.get("last_chunk_id", 0)
+        reconciled_version = indexing_state.get("reconciled_version")
+        if is_created:
+            last_chunk_id = 0
+            reconciled_version = None
+            _ = await self.save_indexing_state(
+                project=project,
+                project_model=project_model,
+                last_chunk_id=last_chunk_id,
+            )
+
+        reconcile_counts = (0, 0)
+        if last_chunk_id:
+            reconcile_counts = await self.reconcile_vector_db_records(
+                project=project,
+                chunk_model=chunk_model,
+                last_chunk_id=last_chunk_id,
+                force=reconciled_version != collection_version,
+            )
+
+        async def save_progress(chunk_id: int):
+            nonlocal last_chunk_id
+            last_chunk_id = chunk_id
+            _ = await self.save_indexing_state(
+                project=project,
+                project_model=project_model,
+                last_chunk_id=last_chunk_id,
+                reconciled_version=reconciled_version,
+            )
+
+        # an interrupted push resumes from the last saved watermark
+        pipeline = IndexingPipeline(
+            fetch_pages=chunk_model.iter_project_chunks(
+                project_id=project.project_id,
+                page_size=page_size or self.app_settings.INDEXING_PAGE_SIZE,
+                after_chunk_id=last_chunk_id,
+            ),
+            embed_page=lambda chunks: self.embed_chunks(chunks=chunks),
+            upsert_page=lambda chunks, vectors: self.upsert_chunks_vectors(
+                project=project,
+                chunks=chunks,
+                vectors=vectors,
+            ),
+            on_progress=save_progress,
+            embed_concurrency=self.app_settings.INDEXING_EMBED_CONCURRENCY,
+            queue_size=self.app_settings.INDEXING_QUEUE_SIZE,
+        )
+
+        is_pushed = reconcile_counts is not None and await pipeline.run()
+
+        # even a partial push changed the collection, cached results are stale
+        new_collection_version = await project_model.increment_config_counter(
+            project_id=project.project_id,
+            key=IndexingEnum.COLLECTION_VERSION_KEY.value,
         )
 
+        if not is_pushed:
+            return None
+
+        # only our own bump since the start: no chunk was rewritten meanwhile,
+        # so the next push can skip the reconcile walk
+        if new_collection_version == collection_version + 1:
+            _ = await self.save_indexing_state(
+                project=project,
+                project_model=project_model,
+                last_chunk_id=last_chunk_id,
+                reconciled_version=new_collection_version,
+            )
+
+        pipeline_stats = pipeline.get_stats()
+        no_deleted, no_reindexed = reconcile_counts
+
+        return {
+            "inserted_items_count": pipeline_stats["upsert"]["items"] + no_reindexed,
+            "deleted_items_count": no_deleted,
+            "reindexed_items_count": no_reindexed,
+            "last_chunk_id": last_chunk_id,
+            "pipeline": pipeline_stats,
+        }
+
+    async def adense_search_vector_db_collection(self,
+                                                 project: Project,
+                                                 text: str,
+                                                 limit: int = 20,
+                                                 threshold: float = None,
+                                                 filters: list = None,
+                                                 query_vector: list = None):
+        # step1: get collection name
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        # step2: embed text, unless the caller already did
+        vector = query_vector
+        if vector is None:
+            vectors = await self.aembed_texts(
+                texts=[text],
+                document_type=DocumentTypeEnum.QUERY.value
+            )
+            vector = vectors[0] if vectors else None
+
         if not vector or len(vector) == 0:
             logger.debug("No vector was generated from the query.")
             return []
 
         # step3: search in vector DB
-        results = self.vectordb_client.search_by_vector(
+        results = await self.vectordb_client.asearch_by_vector(
             collection_name=collection_name,
             vector=vector,
             limit=limit,
-            threshold=threshold
+            threshold=threshold,
+            search_config=self.get_vector_db_config(project=project, section="search"),
+            filters=filters,
         )
 
+        return results or []
+
+    async def alexical_search_project_chunks(self,
+                                             project: Project,
+                                             text: str,
+                                             limit: int = 20,
+                                             filters: list = None):
+        chunk_model = await ChunkModel.create_instance(db_client=self.db_client)
+
+        # a failing lexical side leaves a hybrid search with the dense results
+        try:
+            return await chunk_model.search_project_chunks(
+                project_id=project.project_id,
+                text=text,
+                limit=limit,
+                filters=filters,
+            )
+        except Exception as e:
+            logger.error(f"Error while searching the project chunks: {e}")
+            return []
+
+    def fuse_ranked_results(self, ranked_results: list, limit: int):
+        """
+        Reciprocal rank fusion: a document scores sum(1 / (k + rank)) over the
+        result lists it appears in, so only ranks matter and the cosine and
+        ts_rank scales never have to be compared.
+        """
+        rrf_k = self.app_settings.HYBRID_SEARCH_RRF_K
+
+        fused = {}
+        for results in ranked_results:
+            for rank, doc in enumerate(results, start=1):
+                key = doc.chunk_id if doc.chunk_id is not None else doc.text
+                best_doc, score = fused.get(key, (doc, 0.0))
+                fused[key] = (best_doc, score + 1.0 / (rrf_k + rank))
+
+        ranked = sorted(fused.values(), key=lambda item: item[1], reverse=True)[:limit]
+
+        return [
+            RetrievedDocument(text=doc.text, score=score, chunk_id=doc.chunk_id)
+            for doc, score in ranked
+        ]
+
+    async def asearch_vector_db_collection(self,
+                                           project: Project,
+                                           text: str,
+                                           limit: int = 20,
+                                           threshold: float = None,
+                                           filters: list = None,
+                                           search_mode: str = None,
+                                           use_rerank: bool = False,
+                                           query_vector: list = None):
+        """
+        Search the project's chunks for text, through the retrieval cache.
+
+        :param search_mode: A mode checked by get_search_mode. "lexical" runs
+                            the full-text search of the chunks, "hybrid" runs
+                            it alongside the vector search and merges both with
+                            reciprocal rank fusion; the scores are then RRF
+                            scores and the threshold only applies to the
+                            vector side.
+        :param use_rerank: Rerank the first RERANK_MAX_CANDIDATES results with
+                           the rerank client (ignored when there is none) and
+                           keep the best limit, or RERANK_TOP_K if lower.
+        :param query_vector: The embedding of text when the caller already has
+                             it, the vector search then skips embedding.
+        """
+        search_mode = search_mode or self.app_settings.SEARCH_DEFAULT_MODE
+        use_rerank = bool(use_rerank) and self.rerank_client is not None
+
+        if not self.retrieval_cache:
+            return await self.arun_search_vector_db_collection(
+                project=project, text=text, limit=limit, threshold=threshold,
+                filters=filters, search_mode=search_mode, use_rerank=use_rerank,
+                query_vector=query_vector,
+            )
+
+        cache_key = self.get_search_cache_key(
+            project=project, text=text, limit=limit, threshold=threshold,
+            filters=filters, search_mode=search_mode, use_rerank=use_rerank,
+        )
+
+        results = await self.aget_cached_search_results(cache_key=cache_key)
+        if results is not None:
+            return results
+
+        results = await self.arun_search_vector_db_collection(
+            project=project, text=text, limit=limit, threshold=threshold,
+            filters=filters, search_mode=search_mode, use_rerank=use_rerank,
+            query_vector=query_vector,
+        )
+
+        # an empty list may be an embedding or database failure, not cached
+        if results:
+            await self.aset_cached_search_results(cache_key=cache_key, results=results)
+
+        return results
+
+    async def arun_search_vector_db_collection(self,
+                                               project: Project,
+                                               text: str,
+                                               limit: int,
+                                               threshold: float,
+                                               filters: list,
+                                               search_mode: str,
+                                               use_rerank: bool,
+                                               query_vector: list = None):
+        # never fewer than limit, the reranker only scores the first candidates
+        search_limit = max(limit, self.app_settings.RERANK_MAX_CANDIDATES) if use_rerank else limit
+
+        if search_mode == SearchModeEnum.LEXICAL.value:
+            results = await self.alexical_search_project_chunks(
+                project=project,
+                text=text,
+                limit=search_limit,
+                filters=filters,
+            )
+
+        elif search_mode == SearchModeEnum.HYBRID.value:
+            # the full-text query runs while the query is being embedded
+            candidates_limit = max(search_limit, self.app_settings.HYBRID_SEARCH_CANDIDATES)
+            dense_results, lexical_results = await asyncio.gather(
+                self.adense_search_vector_db_collection(
+                    project=project,
+                    text=text,
+                    limit=candidates_limit,
+                    threshold=threshold,
+                    filters=filters,
+                    query_vector=query_vector,
+                ),
+                self.alexical_search_project_chunks(
+                    project=project,
+                    text=text,
+                    limit=candidates_limit,
+                    filters=filters,
+                ),
+            )
+
+            results = self.fuse_ranked_results(
+                ranked_results=[dense_results, lexical_results],
+                limit=search_limit,
+            )
+
+        else:
+            results = await self.adense_search_vector_db_collection(
+                project=project,
+                text=text,
+                limit=search_limit,
+                threshold=threshold,
+                filters=filters,
+                query_vector=query_vector,
+            )
+
         if not results:
-            logger.debug("No results returned from the vector DB search.")
+            logger.debug("No results returned from the search.")
             return []
 
-        logger.debug(f"search_vector_db_collection - total docs retrieved after threshold: {len(results)}")
+        if use_rerank:
+            results = await self.arerank_documents(query=text, documents=results, limit=limit)
+
+        logger.debug(f"asearch_vector_db_collection - total docs retrieved ({search_mode}): {len(results)}")
         return results
-    
-    def answer_rag_question(self, project: Project, query: str, limit: int = 10, threshold: float = None):
-        answer, full_prompt, chat_history = None, None, None
 
-        retrieved_documents = self.search_vector_db_collection(
-            project=project,
-            text=query,
+    async def arerank_documents(self, query: str, documents: list, limit: int):
+        if not documents:
+            return []
+
+        top_k = limit
+        if self.app_settings.RERANK_TOP_K:
+            top_k = min(limit, self.app_settings.RERANK_TOP_K)
+
+        reranked = await self.rerank_client.arerank(
+            query=query,
+            documents=documents,
+            top_k=top_k,
+        )
+
+        # keep the retrieval order when the reranker fails
+        if reranked is None:
+            logger.error("Error while reranking the search results.")
+            return documents[:top_k]
+
+        return reranked
+
+    async def adense_search_batch_vector_db_collection(self,
+                                                       project: Project,
+                                                       texts: list,
+                                                       limit: int = 20,
+                                                       threshold: float = None,
+                                                       filters: list = None):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        # all the queries in one embedding call and one vector DB batch
+        vectors = await self.aembed_texts(
+            texts=texts,
+            document_type=DocumentTypeEnum.QUERY.value
+        )
+
+        if not vectors or len(vectors) != len(texts):
+            logger.error("Error while embedding the batch of queries.")
+            return None
+
+        results = await self.vectordb_client.asearch_batch_by_vectors(
+            collection_name=collection_name,
+            vectors=vectors,
             limit=limit,
-            threshold=threshold
+            threshold=threshold,
+            search_config=self.get_vector_db_config(project=project, section="search"),
+            filters=filters,
         )
 
-        if not retrieved_documents:
-            return answer, full_prompt, chat_history, []
+        return [query_results or [] for query_results in results]
+
+    async def alexical_search_batch_project_chunks(self,
+                                                   project: Project,
+                                                   texts: list,
+                                                   limit: int = 20,
+                                                   filters: list = None):
+        chunk_model = await ChunkModel.create_instance(db_client=self.db_client)
+
+        try:
+            return await chunk_model.search_project_chunks_batch(
+                project_id=project.project_id,
+                texts=texts,
+                limit=limit,
+                filters=filters,
+            )
+        except Exception as e:
+            logger.error(f"Error while searching the project chunks: {e}")
+            return [[] for _ in texts]
+
+    async def asearch_batch_vector_db_collection(self,
+                                                 project: Project,
+                                                 texts: list,
+                                                 limit: int = 20,
+                                                 threshold: float = None,
+                                                 filters: list = None,
+                                                 search_mode: str = None,
+                                                 use_rerank: bool = False):
+        """
+        asearch_vector_db_collection for several queries at once, one result
+        list per query, or None if the queries could not be embedded. Only
+        the queries missing from the retrieval cache are searched.
+        """
+        search_mode = search_mode or self.app_settings.SEARCH_DEFAULT_MODE
+        use_rerank = bool(use_rerank) and self.rerank_client is not None
+
+        if not self.retrieval_cache:
+            return await self.arun_search_batch_vector_db_collection(
+                project=project, texts=texts, limit=limit, threshold=threshold,
+                filters=filters, search_mode=search_mode, use_rerank=use_rerank,
+            )
+
+        cache_keys = [
+            self.get_search_cache_key(
+                project=project, text=text, limit=limit, threshold=threshold,
+                filters=filters, search_mode=search_mode, use_rerank=use_rerank,
+            )
+            for text in texts
+        ]
+
+        cached_results = {}
+        for cache_key in dict.fromkeys(cache_keys):
+            results = await self.aget_cached_search_results(cache_key=cache_key)
+            if results is not None:
+                cached_results[cache_key] = results
+
+        missed_texts = {
+            cache_key: text
+            for cache_key, text in zip(cache_keys, texts)
+            if cache_key not in cached_results
+        }
+
+        if missed_texts:
+            missed_results = await self.arun_search_batch_vector_db_collection(
+                project=project, texts=list(missed_texts.values()), limit=limit,
+                threshold=threshold, filters=filters, search_mode=search_mode,
+                use_rerank=use_rerank,
+            )
+
+            if missed_results is None:
+                return None
+
+            for cache_key, results in zip(missed_texts, missed_results):
+                cached_results[cache_key] = results
+                if results:
+                    await self.aset_cached_search_results(cache_key=cache_key, results=results)
+
+        return [cached_results[cache_key] for cache_key in cache_keys]
+
+    async def arun_search_batch_vector_db_collection(self,
+                                                     project: Project,
+                                                     texts: list,
+                                                     limit: int,
+                                                     threshold: float,
+                                                     filters: list,
+                                                     search_mode: str,
+                                                     use_rerank: bool):
+        search_limit = max(limit, self.app_settings.RERANK_MAX_CANDIDATES) if use_rerank else limit
+
+        if search_mode == SearchModeEnum.LEXICAL.value:
+            results = await self.alexical_search_batch_project_chunks(
+                project=project,
+                texts=texts,
+                limit=search_limit,
+                filters=filters,
+            )
+
+        elif search_mode == SearchModeEnum.HYBRID.value:
+            candidates_limit = max(search_limit, self.app_settings.HYBRID_SEARCH_CANDIDATES)
+            dense_results, lexical_results = await asyncio.gather(
+                self.adense_search_batch_vector_db_collection(
+                    project=project,
+                    texts=texts,
+                    limit=candidates_limit,
+                    threshold=threshold,
+                    filters=filters,
+                ),
+                self.alexical_search_batch_project_chunks(
+                    project=project,
+                    texts=texts,
+                    limit=candidates_limit,
+                    filters=filters,
+                ),
+            )
+
+            if dense_results is None:
+                return None
+
+            results = [
+                self.fuse_ranked_results(
+                    ranked_results=[query_dense_results, query_lexical_results],
+                    limit=search_limit,
+                )
+                for query_dense_results, query_lexical_results in zip(dense_results, lexical_results)
+            ]
+
+        else:
+            results = await self.adense_search_batch_vector_db_collection(
+                project=project,
+                texts=texts,
+                limit=search_limit,
+                threshold=threshold,
+                filters=filters,
+            )
+
+            if results is None:
+                return None
+
+        if use_rerank:
+            results = await asyncio.gather(*[
+                self.arerank_documents(query=text, documents=query_results, limit=limit)
+                for text, query_results in zip(texts, results)
+            ])
+
+        return list(results)
+
+    def construct_rag_prompt(self, query: str, retrieved_documents: list):
 
         system_prompt = self.template_parser.get("rag", "system_prompt")
 
@@ -144,9 +839,201 @@ class NLPController(BaseController):
 
         full_prompt = "\n\n".join([documents_prompts, footer_prompt])
 
-        answer = self.generation_client.generate_text(
+        return full_prompt, chat_history
+
+    def get_rag_template_signature(self):
+        # the templates rendered with their own placeholders give back their raw text
+        return "\n".join([
+            str(self.template_parser.language),
+            self.template_parser.get("rag", "system_prompt") or "",
+            self.template_parser.get("rag", "document_prompt", {
+                "doc_num": "$doc_num",
+                "score": "$score",
+                "chunk_text": "$chunk_text",
+            }) or "",
+            self.template_parser.get("rag", "footer_prompt", {"query": "$query"}) or "",
+        ])
+
+    async def aget_answer_query_vector(self, query: str, search_mode: str):
+        """
+        The query vector keying the answer cache, embedded before the search
+        so the vector search reuses it. None without an answer cache, and in
+        lexical mode, where the search never embeds the query.
+        """
+        if not self.answer_cache or search_mode == SearchModeEnum.LEXICAL.value:
+            return None
+
+        vectors = await self.aembed_texts(
+            texts=[query],
+            document_type=DocumentTypeEnum.QUERY.value
+        )
+
+        return vectors[0] if vectors else None
+
+    def get_answer_cache_key(self, query_vector: list, retrieved_documents: list):
+        """
+        Query vector and context key of an answer in the answer cache, or
+        None when there is no query vector.
+        """
+        if query_vector is None:
+            return None
+
+        # documents without a chunk id are identified by their text
+        document_ids = sorted(
+            str(doc.chunk_id) if doc.chunk_id is not None
+            else hashlib.sha256(doc.text.encode("utf-8")).hexdigest()
+            for doc in retrieved_documents
+        )
+
+        context_key = hashlib.sha256(json.dumps({
+            "document_ids": document_ids,
+            "generation_model_id": self.generation_client.generation_model_id,
+            "template": self.get_rag_template_signature(),
+        }).encode("utf-8")).hexdigest()
+
+        return query_vector, context_key
+
+    def get_cached_answer(self, project: Project, answer_cache_key: tuple):
+        if not answer_cache_key:
+            return None
+
+        query_vector, context_key = answer_cache_key
+        return self.answer_cache.get_answer(
+            project_id=project.project_id,
+            query_vector=query_vector,
+            context_key=context_key,
+        )
+
+    def set_cached_answer(self, project: Project, answer_cache_key: tuple, answer: str):
+        if not answer_cache_key or not answer:
+            return
+
+        query_vector, context_key = answer_cache_key
+        self.answer_cache.set_answer(
+            project_id=project.project_id,
+            query_vector=query_vector,
+            context_key=context_key,
+            answer=answer,
+        )
+
+    async def aanswer_rag_question(self, project: Project, query: str, limit: int = 10, threshold: float = None,
+                                   filters: list = None, search_mode: str = None,
+                                   use_rerank: bool = False):
+        answer, full_prompt, chat_history = None, None, None
+
+        search_mode = search_mode or self.app_settings.SEARCH_DEFAULT_MODE
+        query_vector = await self.aget_answer_query_vector(query=query, search_mode=search_mode)
+
+        retrieved_documents = await self.asearch_vector_db_collection(
+            project=project,
+            text=query,
+            limit=limit,
+            threshold=threshold,
+            filters=filters,
+            search_mode=search_mode,
+            use_rerank=use_rerank,
+            query_vector=query_vector,
+        )
+
+        if not retrieved_documents:
+            return answer, full_prompt, chat_history, []
+
+        full_prompt, chat_history = self.construct_rag_prompt(
+            query=query,
+            retrieved_documents=retrieved_documents
+        )
+
+        answer_cache_key = self.get_answer_cache_key(
+            query_vector=query_vector,
+            retrieved_documents=retrieved_documents
+        )
+
+        # the same chat_history a generation leaves behind
+        answer = self.get_cached_answer(project=project, answer_cache_key=answer_cache_key)
+        if answer:
+            chat_history = self.generation_client.add_user_prompt(prompt=full_prompt, chat_history=chat_history)
+            return answer, full_prompt, chat_history, retrieved_documents
+
+        answer = await self.generation_client.agenerate_text(
             prompt=full_prompt,
             chat_history=chat_history
         )
 
+        self.set_cached_answer(project=project, answer_cache_key=answer_cache_key, answer=answer)
+
         return answer, full_prompt, chat_history, retrieved_documents
+
+    async def astream_rag_answer(self, project: Project, query: str, limit: int = 10, threshold: float = None,
+                                 filters: list = None, search_mode: str = None,
+                                 use_rerank: bool = False):
+        """
+        Streaming version of aanswer_rag_question. Yields (event, data) pairs:
+        the retrieved documents first, then the answer tokens as they arrive,
+        then a final event with the full answer.
+        """
+        search_mode = search_mode or self.app_settings.SEARCH_DEFAULT_MODE
+        query_vector = await self.aget_answer_query_vector(query=query, search_mode=search_mode)
+
+        retrieved_documents = await self.asearch_vector_db_collection(
+            project=project,
+            text=query,
+            limit=limit,
+            threshold=threshold,
+            filters=filters,
+            search_mode=search_mode,
+            use_rerank=use_rerank,
+            query_vector=query_vector,
+        )
+
+        if not retrieved_documents:
+            yield StreamEventEnum.ERROR.value, {"signal": ResponseSignal.RAG_ANSWER_ERROR.value}
+            return
+
+        full_prompt, chat_history = self.construct_rag_prompt(
+            query=query,
+            retrieved_documents=retrieved_documents
+        )
+
+        yield StreamEventEnum.DOCUMENTS.value, {
+            "used_documents": [doc.dict() for doc in retrieved_documents],
+        }
+
+        answer_cache_key = self.get_answer_cache_key(
+            query_vector=query_vector,
+            retrieved_documents=retrieved_documents
+        )
+
+        # a cached answer comes as a single token
+        answer = self.get_cached_answer(project=project, answer_cache_key=answer_cache_key)
+        if answer:
+            chat_history = self.generation_client.add_user_prompt(prompt=full_prompt, chat_history=chat_history)
+            yield StreamEventEnum.TOKEN.value, {"text": answer}
+            yield StreamEventEnum.DONE.value, {
+                "signal": ResponseSignal.RAG_ANSWER_SUCCESS.value,
+                "answer": answer,
+                "full_prompt": full_prompt,
+                "chat_history": chat_history,
+            }
+            return
+
+        answer_parts = []
+        async for token in self.generation_client.astream_text(
+            prompt=full_prompt,
+            chat_history=chat_history
+        ):
+            answer_parts.append(token)
+            yield StreamEventEnum.TOKEN.value, {"text": token}
+
+        if not answer_parts:
+            yield StreamEventEnum.ERROR.value, {"signal": ResponseSignal.RAG_ANSWER_ERROR.value}
+            return
+
+        answer = "".join(answer_parts)
+        self.set_cached_answer(project=project, answer_cache_key=answer_cache_key, answer=answer)
+
+        yield StreamEventEnum.DONE.value, {
+            "signal": ResponseSignal.RAG_ANSWER_SUCCESS.value,
+            "answer": answer,
+            "full_prompt": full_prompt,
+            "chat_history": chat_history,
+        }
@@ -1,12 +1,51 @@
 from .BaseController import BaseController
 from .ProjectController import ProjectController
+from concurrent.futures import Executor
+import asyncio
+import hashlib
+import logging
 import os
 from langchain_community.document_loaders import TextLoader
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from models import ProcessingEnum
+from models.enums.ProcessingEnum import AssetProcessingEnum
 from langchain_community.document_loaders import CSVLoader
 
+logger = logging.getLogger(__name__)
+
+def load_and_split_file(project_id: str, file_id: str, chunk_size: int, overlap_size: int):
+    """
+    Load and split one file, returning plain (text, metadata) pairs.
+
+    Lives at module level so a ProcessPoolExecutor can pickle it, and returns
+    plain tuples so only the chunk texts and metadata travel back to the API.
+    """
+    file_chunks = ProcessController(project_id=project_id).get_file_chunks(
+        file_id=file_id,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size
+    )
+
+    if file_chunks is None:
+        return None
+
+    return [
+        (chunk.page_content, chunk.metadata)
+        for chunk in file_chunks
+    ]
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024):
+    """
+    sha256 of the file content, read block by block.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
 class ProcessController(BaseController):
 
     def __init__(self, project_id: str):
@@ -18,14 +57,17 @@ class ProcessController(BaseController):
     def get_file_extension(self, file_id: str):
         return os.path.splitext(file_id)[-1]
 
-    def get_file_loader(self, file_id: str):
-
-        file_ext = self.get_file_extension(file_id=file_id)
-        file_path = os.path.join(
+    def get_file_path(self, file_id: str):
+        return os.path.join(
             self.project_path,
             file_id
         )
 
+    def get_file_loader(self, file_id: str):
+
+        file_ext = self.get_file_extension(file_id=file_id)
+        file_path = self.get_file_path(file_id=file_id)
+
         if not os.path.exists(file_path):
             return None
         
@@ -75,6 +117,143 @@ class ProcessController(BaseController):
 
         return chunks
 
+    def get_file_chunks(self, file_id: str, chunk_size: int=100, overlap_size: int=20):
+
+        file_content = self.get_file_content(file_id=file_id)
+        if file_content is None:
+            return None
+
+        return self.process_file_content(
+            file_content=file_content,
+            file_id=file_id,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size
+        )
+
+    async def iter_files_chunks(self, project_files_ids: dict, chunk_size: int=100,
+                                overlap_size: int=20, executor: Executor=None,
+                                max_pending: int=None):
+        """
+        Load and split many files, yielding (asset_id, file_id, chunks, error)
+        in the order of project_files_ids. chunks is a list of (text, metadata)
+        pairs, or None if the file could not be loaded.
+
+        With an executor (e.g. a ProcessPoolExecutor) up to max_pending files
+        are parsed at the same time; without one, files are parsed one by one
+        on a worker thread so the event loop stays free.
+        """
+        loop = asyncio.get_running_loop()
+        max_pending = max(max_pending or 1, 1)
+
+        def submit(file_id: str):
+            return loop.run_in_executor(
+                executor,
+                load_and_split_file,
+                self.project_id,
+                file_id,
+                chunk_size,
+                overlap_size,
+            )
+
+        items = list(project_files_ids.items())
+        pending = [submit(file_id) for _, file_id in items[:max_pending]]
+
+        for i, (asset_id, file_id) in enumerate(items):
+
+            # keep the window full while the oldest file is awaited
+            if i + max_pending < len(items):
+                pending.append(submit(items[i + max_pending][1]))
+
+            try:
+                file_chunks = await pending[i]
+                error = None
+            except Exception as e:
+                logger.error(f"Error while loading file {file_id}: {e}")
+                file_chunks, error = None, str(e)
+
+            pending[i] = None
+            yield asset_id, file_id, file_chunks, error
+
+    def get_processing_signature(self, chunk_size: int, overlap_size: int):
+        return {
+            "chunk_size": chunk_size,
+            "overlap_size": overlap_size,
+            "splitter_version": AssetProcessingEnum.SPLITTER_VERSION.value,
+        }
+
+    def get_file_stat(self, file_id: str):
+
+        file_path = self.get_file_path(file_id=file_id)
+        if not os.path.exists(file_path):
+            return None
+
+        file_stat = os.stat(file_path)
+        return {
+            "file_size": file_stat.st_size,
+            "file_mtime_ns": file_stat.st_mtime_ns,
+        }
+
+    async def get_assets_to_process(self, assets: list, chunk_size: int=100,
+                                    overlap_size: int=20, force: bool=False,
+                                    executor: Executor=None):
+        """
+        Pick the assets whose file content or processing signature changed since
+        they were last processed (all of them when force is set).
+
+        Returns (asset_id -> file_id, asset_id -> processing state); the state is
+        what should be saved into the asset_config once its chunks are replaced.
+        Files whose size and mtime did not move are not read at all, the others
+        are hashed on the executor and compared with the stored content hash.
+        """
+        loop = asyncio.get_running_loop()
+        signature = self.get_processing_signature(
+            chunk_size=chunk_size,
+            overlap_size=overlap_size
+        )
+
+        to_hash = []
+        for asset in assets:
+            stored_state = (asset.asset_config or {}).get(AssetProcessingEnum.CONFIG_KEY.value)
+            file_stat = self.get_file_stat(file_id=asset.asset_name)
+
+            is_same_signature = bool(stored_state) and all(
+                stored_state.get(key) == value
+                for key, value in signature.items()
+            )
+
+            if not force and is_same_signature and file_stat is not None \
+                    and all(stored_state.get(key) == value for key, value in file_stat.items()):
+                continue
+
+            to_hash.append((asset, stored_state if is_same_signature else None, file_stat))
+
+        async def get_file_hash(file_id: str, file_stat: dict):
+            if file_stat is None:
+                return None
+
+            try:
+                return await loop.run_in_executor(executor, hash_file, self.get_file_path(file_id=file_id))
+            except Exception as e:
+                logger.error(f"Error while hashing file {file_id}: {e}")
+                return None
+
+        files_hashes = await asyncio.gather(*[
+            get_file_hash(file_id=asset.asset_name, file_stat=file_stat)
+            for asset, _, file_stat in to_hash
+        ])
+
+        project_files_ids, processing_states = {}, {}
+        for (asset, stored_state, file_stat), file_hash in zip(to_hash, files_hashes):
+
+            if not force and stored_state and file_hash is not None \
+                    and stored_state.get("content_hash") == file_hash:
+                continue
 
-    
+            project_files_ids[asset.asset_id] = asset.asset_name
+            processing_states[asset.asset_id] = {
+                **signature,
+                **(file_stat or {}),
+                "content_hash": file_hash,
+            }
 
+        return project_files_ids, processing_states
@@ -0,0 +1,174 @@
+from .BaseController import BaseController
+from .ProcessController import ProcessController
+from models.ProcessJobModel import ProcessJobModel
+from models.ChunkModel import ChunkModel
+from models.db_schemes import ProcessJob, DataChunk
+from models.enums.ProcessJobStatusEnum import ProcessJobStatusEnum, AssetProgressStatusEnum
+from models import ResponseSignal
+from datetime import datetime, timezone
+from concurrent.futures import Executor
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ProcessJobController(BaseController):
+
+    def __init__(self, db_client: object, executor: Executor = None):
+        super().__init__()
+        self.db_client = db_client
+        self.executor = executor
+
+    def create_job_progress(self, project_files_ids: dict, processing_states: dict = None):
+        processing_states = processing_states or {}
+        return {
+            str(asset_id): {
+                "file_id": file_id,
+                "status": AssetProgressStatusEnum.PENDING.value,
+                "inserted_chunks": 0,
+                "error": None,
+                "processing_state": processing_states.get(asset_id),
+            }
+            for asset_id, file_id in project_files_ids.items()
+        }
+
+    def get_job_status(self, job: ProcessJob):
+
+        now = datetime.now(timezone.utc)
+        elapsed_seconds = 0.0
+        if job.started_at:
+            elapsed_seconds = ((job.finished_at or now) - job.started_at).total_seconds()
+
+        assets_per_second, chunks_per_second = 0.0, 0.0
+        if elapsed_seconds > 0:
+            assets_per_second = job.job_processed_assets / elapsed_seconds
+            chunks_per_second = job.job_inserted_chunks / elapsed_seconds
+
+        return {
+            "job_id": str(job.job_uuid),
+            "project_id": job.job_project_id,
+            "status": job.job_status,
+            "error": job.job_error,
+            "total_assets": job.job_total_assets,
+            "processed_assets": job.job_processed_assets,
+            "failed_assets": job.job_failed_assets,
+            "inserted_chunks": job.job_inserted_chunks,
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "assets_per_second": round(assets_per_second, 3),
+            "chunks_per_second": round(chunks_per_second, 3),
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "assets": job.job_progress,
+        }
+
+    async def insert_asset_chunks(self, chunk_model: ChunkModel, project_id: int,
+                                  asset_id: int, file_chunks: list, processing_state: dict = None):
+
+        if len(file_chunks) == 0:
+            return 0, ResponseSignal.PROCESSING_FAILED.value
+
+        file_chunks_records = [
+            DataChunk(
+                chunk_text=chunk_text,
+                chunk_metadata=chunk_metadata,
+                chunk_order=i+1,
+                chunk_project_id=project_id,
+                chunk_asset_id=asset_id
+            )
+            for i, (chunk_text, chunk_metadata) in enumerate(file_chunks)
+        ]
+
+        # replacing also covers a resumed job that finds chunks of an asset it already did
+        no_records = await chunk_model.replace_asset_chunks(
+            asset_id=asset_id,
+            chunks=file_chunks_records,
+            processing_state=processing_state or {},
+        )
+
+        return no_records, ResponseSignal.PROCESSING_SUCCESS.value
+
+    async def run_job(self, job: ProcessJob):
+
+        job_model = await ProcessJobModel.create_instance(db_client=self.db_client)
+        chunk_model = await ChunkModel.create_instance(db_client=self.db_client)
+
+        config = job.job_config or {}
+        progress = dict(job.job_progress or {})
+        process_controller = ProcessController(project_id=job.job_project_id)
+
+        counters = {
+            "job_processed_assets": job.job_processed_assets,
+            "job_failed_assets": job.job_failed_assets,
+            "job_inserted_chunks": job.job_inserted_chunks,
+        }
+
+        # only reset on a fresh run, a resumed job keeps what it already inserted
+        is_fresh = all(
+            entry["status"] == AssetProgressStatusEnum.PENDING.value
+            for entry in progress.values()
+        )
+        if config.get("do_reset") == 1 and is_fresh:
+            _ = await chunk_model.delete_chunks_by_project_id(project_id=job.job_project_id)
+
+        pending_files_ids = {
+            asset_id: entry["file_id"]
+            for asset_id, entry in progress.items()
+            if entry["status"] != AssetProgressStatusEnum.DONE.value
+        }
+
+        files_chunks = process_controller.iter_files_chunks(
+            project_files_ids=pending_files_ids,
+            chunk_size=config.get("chunk_size"),
+            overlap_size=config.get("overlap_size"),
+            executor=self.executor,
+            max_pending=2 * self.app_settings.PROCESSING_POOL_WORKERS,
+        )
+
+        async for asset_id, file_id, file_chunks, error in files_chunks:
+
+            entry = progress[asset_id]
+            if entry["status"] == AssetProgressStatusEnum.FAILED.value:
+                counters["job_failed_assets"] -= 1
+
+            if file_chunks is None:
+                no_records, signal = 0, error or ResponseSignal.FILE_ID_ERROR.value
+            else:
+                try:
+                    no_records, signal = await self.insert_asset_chunks(
+                        chunk_model=chunk_model,
+                        project_id=job.job_project_id,
+                        asset_id=int(asset_id),
+                        file_chunks=file_chunks,
+                        processing_state=entry.get("processing_state"),
+                    )
+                except Exception as e:
+                    logger.error(f"Error while inserting chunks of asset {asset_id} of job {job.job_uuid}: {e}")
+                    no_records, signal = 0, str(e)
+
+            if signal == ResponseSignal.PROCESSING_SUCCESS.value:
+                entry = {**entry, "status": AssetProgressStatusEnum.DONE.value,
+                         "inserted_chunks": no_records, "error": None}
+                counters["job_processed_assets"] += 1
+                counters["job_inserted_chunks"] += no_records
+            else:
+                entry = {**entry, "status": AssetProgressStatusEnum.FAILED.value, "error": signal}
+                counters["job_failed_assets"] += 1
+
+            progress[asset_id] = entry
+
+            await job_model.update_job(job_id=job.job_id, job_progress=progress, **counters)
+
+        job_status = ProcessJobStatusEnum.COMPLETED.value
+        job_error = None
+        if len(progress) and counters["job_failed_assets"] == len(progress):
+            job_status = ProcessJobStatusEnum.FAILED.value
+            job_error = ResponseSignal.PROCESSING_FAILED.value
+
+        await job_model.update_job(
+            job_id=job.job_id,
+            job_status=job_status,
+            job_error=job_error,
+            finished_at=datetime.now(timezone.utc),
+        )
+
+        return job_status
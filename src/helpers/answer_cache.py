@@ -0,0 +1,136 @@
+from collections import OrderedDict
+import numpy as np
+import time
+
+class ProjectAnswerIndex:
+    """
+    Answers of one project: a matrix of unit query vectors and, per row,
+    the context the answer was generated from.
+    """
+
+    def __init__(self, embedding_size: int):
+        self.vectors = np.zeros((0, embedding_size), dtype=np.float32)
+        # per row: {"context_key", "answer", "created_at"}, oldest first
+        self.entries = []
+
+    def keep_rows(self, mask: np.ndarray):
+        self.vectors = self.vectors[mask]
+        self.entries = [entry for entry, keep in zip(self.entries, mask) if keep]
+
+class SemanticAnswerCache:
+    """
+    Generated answers reused for nearly identical questions.
+
+    An answer is served again when the new query vector has a cosine
+    similarity of at least similarity_cutoff with a cached one of the same
+    project, and the context key matches: the retrieved chunk ids, the
+    generation model and the prompt template. Each project has a small
+    exact-search index; entries expire after ttl seconds, and beyond
+    max_entries the oldest ones of the project are dropped. Only the
+    max_projects most recently used projects are kept.
+    """
+
+    def __init__(self, similarity_cutoff: float = 0.95, ttl: float = 3600,
+                 max_entries: int = 1000, max_projects: int = 100):
+        self.similarity_cutoff = similarity_cutoff
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_projects = max_projects
+
+        # project_id -> ProjectAnswerIndex, least recently used first
+        self.projects = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def normalize(self, vector: list):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def drop_expired(self, index: ProjectAnswerIndex):
+        if not self.ttl or not index.entries:
+            return
+
+        deadline = time.monotonic() - self.ttl
+        mask = np.array([entry["created_at"] > deadline for entry in index.entries])
+        if not mask.all():
+            self.expired += int((~mask).sum())
+            index.keep_rows(mask)
+
+    def get_answer(self, project_id: int, query_vector: list, context_key: str):
+        index = self.projects.get(project_id)
+        if index is None or index.vectors.shape[1] != len(query_vector):
+            self.misses += 1
+            return None
+
+        self.projects.move_to_end(project_id)
+        self.drop_expired(index)
+
+        rows = [i for i, entry in enumerate(index.entries) if entry["context_key"] == context_key]
+        if not rows:
+            self.misses += 1
+            return None
+
+        scores = index.vectors[rows] @ self.normalize(query_vector)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_cutoff:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return index.entries[rows[best]]["answer"]
+
+    def set_answer(self, project_id: int, query_vector: list, context_key: str, answer: str):
+        if self.max_entries <= 0:
+            return
+
+        index = self.projects.get(project_id)
+        # a new embedding model makes the old vectors useless
+        if index is None or index.vectors.shape[1] != len(query_vector):
+            index = ProjectAnswerIndex(embedding_size=len(query_vector))
+            self.projects[project_id] = index
+
+        self.projects.move_to_end(project_id)
+        self.drop_expired(index)
+
+        index.vectors = np.vstack([index.vectors, self.normalize(query_vector)[None, :]])
+        index.entries.append({
+            "context_key": context_key,
+            "answer": answer,
+            "created_at": time.monotonic(),
+        })
+        self.stored += 1
+
+        if len(index.entries) > self.max_entries:
+            no_evicted = len(index.entries) - self.max_entries
+            mask = np.arange(len(index.entries)) >= no_evicted
+            index.keep_rows(mask)
+            self.evicted += no_evicted
+
+        while len(self.projects) > self.max_projects:
+            _, dropped_index = self.projects.popitem(last=False)
+            self.evicted += len(dropped_index.entries)
+
+    def clear(self):
+        self.projects.clear()
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stored": self.stored,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "projects": len(self.projects),
+            "entries": sum(len(index.entries) for index in self.projects.values()),
+            "similarity_cutoff": self.similarity_cutoff,
+            "ttl": self.ttl,
+            "max_entries": self.max_entries,
+            "max_projects": self.max_projects,
+        }
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 
 class Settings(BaseSettings):
 
@@ -10,6 +11,27 @@ class Settings(BaseSettings):
     FILE_MAX_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
 
+    PROCESSING_POOL_WORKERS: int = 0
+    PROCESS_JOB_WORKERS: int = 2
+    PROCESS_JOB_POLL_INTERVAL: float = 2.0
+    PROCESS_JOB_STALE_AFTER: int = 600
+    CHUNKS_BULK_BATCH_SIZE: int = 5000
+
+    INDEXING_PAGE_SIZE: int = 50
+    INDEXING_EMBED_CONCURRENCY: int = 4
+    INDEXING_QUEUE_SIZE: int = 8
+
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_AGE_DAYS: float = 90
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 0
+    EMBEDDING_CACHE_EVICT_INTERVAL: float = 3600
+
+    # coalescing of the query embeddings of concurrent requests
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_CONCURRENCY: int = 4
+
     POSTGRES_USERNAME: str
     POSTGRES_PASSWORD: str
     POSTGRES_HOST: str
@@ -22,6 +44,8 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = None
     OPENAI_API_URL: str = None
     COHERE_API_KEY: str = None
+    DEEPSEEK_API_KEY: Optional[str] = None
+    DEEPSEEK_API_URL: str = "https://api.deepseek.com/v1"
 
     GENERATION_MODEL_ID: str = None
     EMBEDDING_MODEL_ID: str = None
@@ -30,9 +54,73 @@ class Settings(BaseSettings):
     GENERATION_DAFAULT_MAX_TOKENS: int = None
     GENERATION_DAFAULT_TEMPERATURE: float = None
 
+    LLM_HTTP_TIMEOUT: float = 60.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
     VECTOR_DB_BACKEND : str
     VECTOR_DB_PATH : str
     VECTOR_DB_DISTANCE_METHOD: str = None
+    VECTOR_DB_URL: Optional[str] = None
+    VECTOR_DB_GRPC_PORT: int = 6334
+    VECTOR_DB_PREFER_GRPC: bool = True
+    VECTOR_DB_TIMEOUT: int = 30
+    VECTOR_DB_API_KEY: Optional[str] = None
+    VECTOR_DB_POOL_SIZE: int = 100
+    VECTOR_DB_QUANTIZATION: Optional[str] = None
+    VECTOR_DB_QUANTIZATION_ALWAYS_RAM: bool = True
+    VECTOR_DB_ON_DISK: bool = False
+    VECTOR_DB_HNSW_M: Optional[int] = None
+    VECTOR_DB_HNSW_EF_CONSTRUCT: Optional[int] = None
+    VECTOR_DB_SEARCH_HNSW_EF: Optional[int] = None
+    VECTOR_DB_SEARCH_RESCORE: bool = True
+    VECTOR_DB_SEARCH_OVERSAMPLING: Optional[float] = None
+    # chunk metadata fields usable in search filters, e.g. {"page": "integer"}
+    VECTOR_DB_METADATA_INDEXES: dict = {}
+
+    PGVECTOR_INDEX_TYPE: str = "hnsw"
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_HNSW_EF_SEARCH: int = 40
+    PGVECTOR_IVFFLAT_LISTS: int = 100
+    PGVECTOR_IVFFLAT_PROBES: int = 1
+
+    NUMPY_VECTOR_DTYPE: str = "float32"
+    NUMPY_INITIAL_CAPACITY: int = 1024
+
+    SEARCH_DEFAULT_MODE: str = "dense"
+    SEARCH_BATCH_MAX_TEXTS: int = 256
+    # each retriever of a hybrid search returns max(limit, candidates) chunks
+    HYBRID_SEARCH_CANDIDATES: int = 50
+    HYBRID_SEARCH_RRF_K: int = 60
+
+    # reranking of the search results when a request sets use_rerank
+    RERANK_BACKEND: Optional[str] = None
+    RERANK_MODEL_ID: Optional[str] = None
+    RERANK_BATCH_SIZE: int = 50
+    RERANK_MAX_CANDIDATES: int = 50
+    RERANK_TOP_K: Optional[int] = None
+    RERANK_CACHE_SIZE: int = 10000
+
+    # query embeddings and search results, keyed by the collection version
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = 10000
+    # REDIS or LOCAL; unset keeps the in-process tier only
+    RETRIEVAL_CACHE_SHARED_BACKEND: Optional[str] = None
+    RETRIEVAL_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    RETRIEVAL_CACHE_TTL: int = 3600
+
+    # generated answers reused for nearly identical questions on the same chunks
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_CUTOFF: float = 0.95
+    ANSWER_CACHE_TTL: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    ANSWER_CACHE_MAX_PROJECTS: int = 100
+
+    # identical /index/search and /index/answer requests in flight share one run
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_DISCONNECT_POLL_INTERVAL: float = 0.5
 
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingMicroBatcher:
+    """
+    Coalesces the embedding requests of concurrent callers into batched
+    provider calls.
+
+    Texts wait in a queue per document type until max_wait_ms passed since
+    the first of them arrived or max_batch_size texts are waiting, then go
+    out in one aembed_texts call and every caller gets its own vectors back.
+    At most max_concurrency batches are in flight; while they all are, new
+    texts keep queueing, so batches grow with the load. Same contract as
+    embedding_client.aembed_texts, so it can stand in for the client (the
+    embedding cache included).
+    """
+
+    def __init__(self, embedding_client, max_wait_ms: float = 5.0,
+                 max_batch_size: int = 64, max_concurrency: int = 4):
+        self.embedding_client = embedding_client
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # document type -> [(text, future, queued_at)], oldest first
+        self.pending = {}
+        self.flush_timers = {}
+        # document types with a flush task waiting for a free batch slot
+        self.waiting_flushes = set()
+        self.flush_tasks = set()
+
+        self.requests = 0
+        self.items = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.max_seen_batch_size = 0
+        self.failed_batches = 0
+        self.waited_items = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def embedding_model_id(self):
+        return self.embedding_client.embedding_model_id
+
+    @property
+    def embedding_size(self):
+        return self.embedding_client.embedding_size
+
+    async def aembed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+
+        queue = self.pending.setdefault(document_type, [])
+        queue.extend((text, future, time.monotonic()) for text, future in zip(texts, futures))
+        self.schedule_flush(document_type=document_type)
+
+        self.requests += 1
+        self.items += len(texts)
+
+        # a cancelled caller cancels its futures, the batch then skips them
+        vectors = await asyncio.gather(*futures)
+
+        if any(vector is None for vector in vectors):
+            return None
+
+        return list(vectors)
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_texts(texts=[text], document_type=document_type)
+        if not vectors:
+            return None
+
+        return vectors[0]
+
+    def schedule_flush(self, document_type: str):
+        # a flush waiting for a slot takes the queued texts when it gets one
+        if document_type in self.waiting_flushes or not self.pending.get(document_type):
+            return
+
+        if len(self.pending[document_type]) >= self.max_batch_size:
+            self.start_flush(document_type=document_type)
+
+        elif document_type not in self.flush_timers:
+            self.flush_timers[document_type] = asyncio.get_running_loop().call_later(
+                self.max_wait_seconds, self.start_flush, document_type
+            )
+
+    def start_flush(self, document_type: str):
+        timer = self.flush_timers.pop(document_type, None)
+        if timer is not None:
+            timer.cancel()
+
+        self.waiting_flushes.add(document_type)
+        task = asyncio.ensure_future(self.flush(document_type=document_type))
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def flush(self, document_type: str):
+        async with self.semaphore:
+            self.waiting_flushes.discard(document_type)
+
+            queue = self.pending.get(document_type, [])
+            batch = [item for item in queue[:self.max_batch_size] if not item[1].done()]
+            del queue[:self.max_batch_size]
+
+            # the rest already waited, it goes out as soon as a slot is free
+            if queue:
+                self.start_flush(document_type=document_type)
+
+            if batch:
+                await self.embed_batch(document_type=document_type, batch=batch)
+
+    async def embed_batch(self, document_type: str, batch: list):
+        # callers asking for the same text at once share one embedding
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+
+        now = time.monotonic()
+        self.batches += 1
+        self.batched_texts += len(texts)
+        self.max_seen_batch_size = max(self.max_seen_batch_size, len(texts))
+        self.waited_items += len(batch)
+        self.wait_seconds += sum(now - queued_at for _, _, queued_at in batch)
+
+        text_vectors = {}
+        try:
+            vectors = await self.embedding_client.aembed_texts(
+                texts=texts,
+                document_type=document_type
+            )
+
+            if vectors and len(vectors) == len(texts):
+                text_vectors = dict(zip(texts, vectors))
+            else:
+                self.failed_batches += 1
+
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Error while embedding a batch of {len(texts)} texts: {e}")
+
+        finally:
+            # even a cancelled batch hands every caller an answer (None on failure)
+            for text, future, _ in batch:
+                if not future.done():
+                    future.set_result(text_vectors.get(text))
+
+    async def aclose(self):
+        for timer in self.flush_timers.values():
+            timer.cancel()
+        self.flush_timers.clear()
+
+        for task in list(self.flush_tasks):
+            task.cancel()
+        _ = await asyncio.gather(*self.flush_tasks, return_exceptions=True)
+
+        # nothing will embed what is still queued
+        for queue in self.pending.values():
+            for _, future, _ in queue:
+                if not future.done():
+                    future.set_result(None)
+        self.pending.clear()
+
+    def get_stats(self):
+        return {
+            "requests": self.requests,
+            "items": self.items,
+            "batches": self.batches,
+            "batched_texts": self.batched_texts,
+            "avg_batch_size": round(self.batched_texts / self.batches, 3) if self.batches else 0.0,
+            "max_batch_size": self.max_seen_batch_size,
+            "failed_batches": self.failed_batches,
+            "avg_wait_ms": round(self.wait_seconds / self.waited_items * 1000, 3) if self.waited_items else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "max_concurrency": self.max_concurrency,
+        }
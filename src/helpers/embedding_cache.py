@@ -0,0 +1,180 @@
+from models.EmbeddingCacheModel import EmbeddingCacheModel
+from datetime import datetime, timezone
+from array import array
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    Content-addressed cache in front of an embedding client.
+
+    Vectors are stored in Postgres keyed by a hash of (model id, embedding
+    size, document type, text), so a re-push or a repeated query only pays
+    for the texts the current model never embedded. Hit and miss counters
+    are kept per API process.
+    """
+
+    def __init__(self, db_client: object, max_age_days: float = 0,
+                 max_entries: int = 0, evict_interval_seconds: float = 3600):
+        self.db_client = db_client
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.evict_interval_seconds = evict_interval_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted_by_age = 0
+        self.evicted_by_size = 0
+        self.last_evicted_at = None
+        self.last_evict_check = time.monotonic()
+
+    def get_cache_key(self, embedding_client, text: str, document_type: str = None):
+        key = "|".join([
+            str(embedding_client.embedding_model_id),
+            str(embedding_client.embedding_size),
+            str(document_type),
+            text,
+        ])
+        return hashlib.sha256(key.encode("utf-8")).digest()
+
+    def pack_vector(self, vector: list):
+        return array("f", vector).tobytes()
+
+    def unpack_vector(self, packed_vector: bytes):
+        vector = array("f")
+        vector.frombytes(packed_vector)
+        return vector.tolist()
+
+    async def aembed_texts(self, embedding_client, texts: list, document_type: str = None):
+        """
+        Same contract as embedding_client.aembed_texts, only the cache misses
+        are sent to the embedding API.
+        """
+        cache_model = await EmbeddingCacheModel.create_instance(db_client=self.db_client)
+
+        cache_keys = [
+            self.get_cache_key(embedding_client=embedding_client, text=text, document_type=document_type)
+            for text in texts
+        ]
+
+        try:
+            cached_vectors = await cache_model.get_vectors(cache_keys=list(set(cache_keys)))
+        except Exception as e:
+            logger.error(f"Error while reading the embedding cache: {e}")
+            cached_vectors = {}
+
+        # the same text may come twice in a batch, embed it once
+        missed_keys = list(dict.fromkeys(
+            cache_key for cache_key in cache_keys
+            if cache_key not in cached_vectors
+        ))
+        missed_texts = {
+            cache_key: text
+            for cache_key, text in zip(cache_keys, texts)
+            if cache_key not in cached_vectors
+        }
+
+        self.hits += len(texts) - len(missed_keys)
+        self.misses += len(missed_keys)
+
+        vectors = {
+            cache_key: self.unpack_vector(packed_vector)
+            for cache_key, packed_vector in cached_vectors.items()
+        }
+
+        if missed_keys:
+            missed_vectors = await embedding_client.aembed_texts(
+                texts=[missed_texts[cache_key] for cache_key in missed_keys],
+                document_type=document_type
+            )
+
+            if not missed_vectors or len(missed_vectors) != len(missed_keys):
+                return None
+
+            vectors.update(zip(missed_keys, missed_vectors))
+            await self.store_vectors(
+                cache_model=cache_model,
+                embedding_client=embedding_client,
+                cache_keys=missed_keys,
+                vectors=missed_vectors,
+            )
+
+        return [vectors[cache_key] for cache_key in cache_keys]
+
+    async def aembed_text(self, embedding_client, text: str, document_type: str = None):
+        vectors = await self.aembed_texts(
+            embedding_client=embedding_client,
+            texts=[text],
+            document_type=document_type
+        )
+        if not vectors:
+            return None
+
+        return vectors[0]
+
+    async def store_vectors(self, cache_model: EmbeddingCacheModel, embedding_client,
+                            cache_keys: list, vectors: list):
+        # a cache write failure must not fail the embedding itself
+        try:
+            self.stored += await cache_model.insert_vectors(records=[
+                {
+                    "cache_key": cache_key,
+                    "cache_vector": self.pack_vector(vector),
+                    "cache_model_id": str(embedding_client.embedding_model_id),
+                    "cache_embedding_size": len(vector),
+                }
+                for cache_key, vector in zip(cache_keys, vectors)
+            ])
+
+            if time.monotonic() - self.last_evict_check >= self.evict_interval_seconds:
+                _ = await self.evict()
+
+        except Exception as e:
+            logger.error(f"Error while writing the embedding cache: {e}")
+
+    async def evict(self):
+        """
+        Drop the vectors older than max_age_days, then the oldest ones beyond
+        max_entries (a limit of 0 disables it).
+        """
+        cache_model = await EmbeddingCacheModel.create_instance(db_client=self.db_client)
+        self.last_evict_check = time.monotonic()
+
+        evicted_by_age, evicted_by_size = 0, 0
+        if self.max_age_days > 0:
+            evicted_by_age = await cache_model.delete_older_than(
+                max_age_seconds=self.max_age_days * 24 * 3600
+            )
+
+        if self.max_entries > 0:
+            evicted_by_size = await cache_model.delete_beyond_size(max_entries=self.max_entries)
+
+        self.evicted_by_age += evicted_by_age
+        self.evicted_by_size += evicted_by_size
+        self.last_evicted_at = datetime.now(timezone.utc)
+
+        return {
+            "evicted_by_age": evicted_by_age,
+            "evicted_by_size": evicted_by_size,
+        }
+
+    async def get_stats(self):
+        cache_model = await EmbeddingCacheModel.create_instance(db_client=self.db_client)
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stored": self.stored,
+            "evicted_by_age": self.evicted_by_age,
+            "evicted_by_size": self.evicted_by_size,
+            "last_evicted_at": self.last_evicted_at.isoformat() if self.last_evicted_at else None,
+            "max_age_days": self.max_age_days,
+            "max_entries": self.max_entries,
+            **await cache_model.get_cache_size(),
+        }
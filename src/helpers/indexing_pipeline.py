@@ -0,0 +1,178 @@
+from typing import Callable, Awaitable, AsyncIterator
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class StageCounter:
+    """
+    Pages, items and busy time of one pipeline stage.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pages = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+
+    def add(self, items: int, seconds: float):
+        self.pages += 1
+        self.items += items
+        self.busy_seconds += seconds
+
+    def as_dict(self, elapsed_seconds: float):
+        return {
+            "pages": self.pages,
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / elapsed_seconds, 3) if elapsed_seconds > 0 else 0.0,
+        }
+
+class IndexingPipeline:
+    """
+    Runs fetch -> embed -> upsert as concurrent stages joined by bounded queues.
+
+    The fetch stage reads the next pages while the embedding requests of the
+    previous ones are in flight, up to embed_concurrency of them at a time, and
+    the upsert stage writes finished pages as they come. Full queues make the
+    faster stages wait for the slower ones.
+
+    Pages may be upserted out of order; on_progress is only called with the
+    last chunk_id of a run of pages that are all upserted, so it can be stored
+    as a watermark.
+    """
+
+    def __init__(self,
+                 fetch_pages: AsyncIterator,
+                 embed_page: Callable[[list], Awaitable[list]],
+                 upsert_page: Callable[[list, list], Awaitable[bool]],
+                 on_progress: Callable[[int], Awaitable[None]] = None,
+                 embed_concurrency: int = 4,
+                 queue_size: int = 8):
+        self.fetch_pages = fetch_pages
+        self.embed_page = embed_page
+        self.upsert_page = upsert_page
+        self.on_progress = on_progress
+
+        self.embed_concurrency = max(embed_concurrency, 1)
+        self.embed_queue = asyncio.Queue(maxsize=max(queue_size, 1))
+        self.upsert_queue = asyncio.Queue(maxsize=max(queue_size, 1))
+
+        self.counters = {
+            name: StageCounter(name=name)
+            for name in ("fetch", "embed", "upsert")
+        }
+        self.elapsed_seconds = 0.0
+
+    async def fetch_stage(self):
+
+        page_no = 0
+        fetch_started = time.perf_counter()
+
+        async for page_chunks in self.fetch_pages:
+            self.counters["fetch"].add(
+                items=len(page_chunks),
+                seconds=time.perf_counter() - fetch_started,
+            )
+
+            await self.embed_queue.put((page_no, page_chunks))
+            page_no += 1
+            fetch_started = time.perf_counter()
+
+        for _ in range(self.embed_concurrency):
+            await self.embed_queue.put(None)
+
+    async def embed_stage(self):
+
+        while (item := await self.embed_queue.get()) is not None:
+            page_no, page_chunks = item
+
+            embed_started = time.perf_counter()
+            vectors = await self.embed_page(page_chunks)
+
+            if not vectors or len(vectors) != len(page_chunks):
+                raise RuntimeError(f"Error while embedding page {page_no}.")
+
+            self.counters["embed"].add(
+                items=len(page_chunks),
+                seconds=time.perf_counter() - embed_started,
+            )
+
+            await self.upsert_queue.put((page_no, page_chunks, vectors))
+
+        await self.upsert_queue.put(None)
+
+    async def upsert_stage(self):
+
+        no_finished_workers = 0
+        next_page_no = 0
+        upserted_pages = {}
+
+        while no_finished_workers < self.embed_concurrency:
+            item = await self.upsert_queue.get()
+            if item is None:
+                no_finished_workers += 1
+                continue
+
+            page_no, page_chunks, vectors = item
+
+            upsert_started = time.perf_counter()
+            is_upserted = await self.upsert_page(page_chunks, vectors)
+
+            if not is_upserted:
+                raise RuntimeError(f"Error while upserting page {page_no}.")
+
+            self.counters["upsert"].add(
+                items=len(page_chunks),
+                seconds=time.perf_counter() - upsert_started,
+            )
+
+            # move the watermark over the pages that are now all written
+            upserted_pages[page_no] = page_chunks[-1].chunk_id
+            last_chunk_id = None
+            while next_page_no in upserted_pages:
+                last_chunk_id = upserted_pages.pop(next_page_no)
+                next_page_no += 1
+
+            if last_chunk_id is not None and self.on_progress:
+                await self.on_progress(last_chunk_id)
+
+    async def run(self):
+        """
+        Run the stages until every page is upserted. Returns False if a page
+        could not be embedded or upserted, the other stages are then cancelled.
+        """
+        started = time.perf_counter()
+
+        tasks = [
+            asyncio.create_task(self.fetch_stage()),
+            *[
+                asyncio.create_task(self.embed_stage())
+                for _ in range(self.embed_concurrency)
+            ],
+            asyncio.create_task(self.upsert_stage()),
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            logger.error(f"Indexing pipeline failed: {e}")
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            self.elapsed_seconds = time.perf_counter() - started
+
+        return True
+
+    def get_stats(self):
+        return {
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            **{
+                name: counter.as_dict(elapsed_seconds=self.elapsed_seconds)
+                for name, counter in self.counters.items()
+            },
+        }
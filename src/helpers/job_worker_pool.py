@@ -0,0 +1,94 @@
+from controllers.ProcessJobController import ProcessJobController
+from models.ProcessJobModel import ProcessJobModel
+from models.enums.ProcessJobStatusEnum import ProcessJobStatusEnum
+from datetime import datetime, timezone
+from concurrent.futures import Executor
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JobWorkerPool:
+    """
+    Runs queued process jobs in the background of an API process.
+
+    Jobs live in the process_jobs table, so every API worker can start its own
+    pool: they claim jobs with SKIP LOCKED and never run the same job twice.
+    """
+
+    def __init__(self, db_client: object, workers: int = 2,
+                 poll_interval: float = 2.0, stale_after_seconds: int = 600,
+                 executor: Executor = None):
+        self.db_client = db_client
+        self.executor = executor
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after_seconds = stale_after_seconds
+
+        self.tasks = []
+
+    def start(self):
+        self.tasks = [
+            asyncio.create_task(self.worker_loop(worker_no=i))
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+
+        # a cancelled job stays "running" and is re-queued once it turns stale
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def worker_loop(self, worker_no: int):
+
+        job_model = await ProcessJobModel.create_instance(db_client=self.db_client)
+        job_controller = ProcessJobController(db_client=self.db_client, executor=self.executor)
+
+        while True:
+            try:
+                _ = await job_model.requeue_stale_jobs(stale_after_seconds=self.stale_after_seconds)
+                job = await job_model.claim_next_job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_no} could not poll the job queue: {e}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            logger.info(f"Job worker {worker_no} started job {job.job_uuid}")
+
+            # a single asset may take longer than stale_after_seconds, the
+            # heartbeat keeps the job from being re-queued while it runs
+            heartbeat = asyncio.create_task(self.send_heartbeats(job_model=job_model, job=job))
+            try:
+                job_status = await job_controller.run_job(job=job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.job_uuid} failed: {e}")
+                job_status = ProcessJobStatusEnum.FAILED.value
+                await job_model.update_job(
+                    job_id=job.job_id,
+                    job_status=job_status,
+                    job_error=str(e),
+                    finished_at=datetime.now(timezone.utc),
+                )
+            finally:
+                heartbeat.cancel()
+
+            logger.info(f"Job worker {worker_no} finished job {job.job_uuid}: {job_status}")
+
+    async def send_heartbeats(self, job_model: ProcessJobModel, job):
+        interval = self.stale_after_seconds / 3
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                _ = await job_model.touch_job(job_id=job.job_id)
+            except Exception as e:
+                logger.error(f"Could not send the heartbeat of job {job.job_uuid}: {e}")
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Bounded in-process mapping that drops the least recently used entry
+    when full. Not thread-safe: it is only touched from the event loop.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key not in self.entries:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,188 @@
+from helpers.lru_cache import LRUCache
+from models.enums.CacheEnum import SharedCacheBackendEnum
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class LocalSharedTier:
+    """
+    In-process stand-in for the shared tier: the same bytes-in, bytes-out
+    contract and TTL as Redis, bounded to max_entries.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = {}
+
+    async def aget(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            _ = self.entries.pop(key, None)
+            return None
+
+        return value
+
+    async def aset(self, key: str, value: bytes, ttl: int = None):
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + ttl if ttl else None
+        _ = self.entries.pop(key, None)
+        self.entries[key] = (value, expires_at)
+
+        # dicts keep insertion order, the first keys are the oldest writes
+        while len(self.entries) > self.max_entries:
+            _ = self.entries.pop(next(iter(self.entries)))
+
+    async def aclose(self):
+        self.entries.clear()
+
+class RedisSharedTier:
+    """
+    Shared tier on Redis, so the API processes reuse each other's results.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.client = None
+
+    def connect(self):
+        # optional dependency, only needed with RETRIEVAL_CACHE_SHARED_BACKEND=REDIS
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.error("The redis package is not installed, run `pip install redis` to use the Redis shared cache.")
+            return False
+
+        self.client = redis.from_url(self.url)
+        return True
+
+    async def aget(self, key: str):
+        return await self.client.get(key)
+
+    async def aset(self, key: str, value: bytes, ttl: int = None):
+        _ = await self.client.set(key, value, ex=ttl or None)
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+class RetrievalCache:
+    """
+    Two-tier cache of query embeddings and search results.
+
+    The first tier is an in-process LRU, the optional second one is shared
+    between the API processes. Values are stored as JSON; a shared tier
+    error counts as a miss, the caller then computes the value again.
+    Keys of the search results carry the collection version of the project,
+    so a push or a reset makes the previous ones unreachable.
+    """
+
+    def __init__(self, max_entries: int = 10000, shared_tier=None,
+                 ttl: int = 3600, key_prefix: str = "visionrag"):
+        self.local_tier = LRUCache(max_entries=max_entries)
+        self.shared_tier = shared_tier
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+        # namespace -> counters
+        self.stats = {}
+
+    @classmethod
+    def create(cls, settings):
+        shared_tier = None
+        shared_backend = settings.RETRIEVAL_CACHE_SHARED_BACKEND
+
+        if shared_backend == SharedCacheBackendEnum.REDIS.value:
+            shared_tier = RedisSharedTier(url=settings.RETRIEVAL_CACHE_REDIS_URL)
+            if not shared_tier.connect():
+                shared_tier = None
+
+        elif shared_backend == SharedCacheBackendEnum.LOCAL.value:
+            shared_tier = LocalSharedTier(max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES)
+
+        return cls(
+            max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+            shared_tier=shared_tier,
+            ttl=settings.RETRIEVAL_CACHE_TTL,
+        )
+
+    def get_cache_key(self, namespace: str, **parts):
+        key = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}:{namespace}:{digest}"
+
+    def count(self, namespace: str, counter: str):
+        namespace_stats = self.stats.setdefault(namespace, {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "shared_errors": 0,
+            "stored": 0,
+        })
+        namespace_stats[counter] += 1
+
+    async def aget(self, namespace: str, key: str):
+        value = self.local_tier.get(key)
+        if value is not None:
+            self.count(namespace=namespace, counter="local_hits")
+            return json.loads(value)
+
+        if self.shared_tier is not None:
+            try:
+                value = await self.shared_tier.aget(key)
+            except Exception as e:
+                self.count(namespace=namespace, counter="shared_errors")
+                logger.error(f"Error while reading the shared retrieval cache: {e}")
+                value = None
+
+            if value is not None:
+                self.count(namespace=namespace, counter="shared_hits")
+                self.local_tier.set(key, value)
+                return json.loads(value)
+
+        self.count(namespace=namespace, counter="misses")
+        return None
+
+    async def aset(self, namespace: str, key: str, value):
+        value = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        self.local_tier.set(key, value)
+        self.count(namespace=namespace, counter="stored")
+
+        if self.shared_tier is not None:
+            try:
+                await self.shared_tier.aset(key, value, ttl=self.ttl)
+            except Exception as e:
+                self.count(namespace=namespace, counter="shared_errors")
+                logger.error(f"Error while writing the shared retrieval cache: {e}")
+
+    async def aclose(self):
+        self.local_tier.clear()
+        if self.shared_tier is not None:
+            await self.shared_tier.aclose()
+
+    def get_stats(self):
+        namespaces = {}
+        for namespace, namespace_stats in self.stats.items():
+            hits = namespace_stats["local_hits"] + namespace_stats["shared_hits"]
+            lookups = hits + namespace_stats["misses"]
+            namespaces[namespace] = {
+                **namespace_stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+        return {
+            "namespaces": namespaces,
+            "local_tier": self.local_tier.get_stats(),
+            "shared_tier": type(self.shared_tier).__name__ if self.shared_tier else None,
+            "ttl": self.ttl,
+        }
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SingleFlightCall:
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time and hands its result to every
+    caller that asked for the same key meanwhile.
+
+    The computation runs in its own task, so a caller that goes away does
+    not cancel it for the others; it is only cancelled when its last waiter
+    is gone. A computation error reaches every waiter of that call. Later
+    callers start a new computation, nothing is kept once it finished.
+    """
+
+    def __init__(self, disconnect_poll_interval: float = 0.5):
+        self.disconnect_poll_interval = disconnect_poll_interval
+
+        # key -> SingleFlightCall in flight
+        self.calls = {}
+
+        self.leaders = 0
+        self.followers = 0
+        self.disconnected = 0
+        self.cancelled = 0
+
+    def get_key(self, namespace: str, **parts):
+        key = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{namespace}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+    def forget(self, key: str, call: SingleFlightCall):
+        # a newer call may already own the key
+        if self.calls.get(key) is call:
+            _ = self.calls.pop(key)
+
+    async def do(self, key: str, function, is_disconnected=None):
+        """
+        Await function() for this key, or join the call already in flight.
+
+        :param function: Coroutine function with no arguments.
+        :param is_disconnected: Optional coroutine function, polled every
+                                disconnect_poll_interval; when it returns
+                                True the caller stops waiting and gets None.
+        """
+        call = self.calls.get(key)
+        if call is None:
+            call = SingleFlightCall(task=asyncio.ensure_future(function()))
+            call.task.add_done_callback(lambda _: self.forget(key=key, call=call))
+            self.calls[key] = call
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        call.waiters += 1
+        try:
+            return await self.wait(call=call, is_disconnected=is_disconnected)
+
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # nobody is left for the result: stop it, and let the next
+                # caller start over instead of joining a cancelled call
+                self.forget(key=key, call=call)
+                call.task.cancel()
+                self.cancelled += 1
+
+    async def wait(self, call: SingleFlightCall, is_disconnected=None):
+        # shielded: a waiter cancelled by its request does not cancel the task
+        if is_disconnected is None:
+            return await asyncio.shield(call.task)
+
+        while True:
+            done, _ = await asyncio.wait({call.task}, timeout=self.disconnect_poll_interval)
+            if done:
+                return call.task.result()
+
+            if await is_disconnected():
+                self.disconnected += 1
+                logger.debug("A single-flight waiter disconnected.")
+                return None
+
+    def get_stats(self):
+        return {
+            "in_flight": len(self.calls),
+            "waiters": sum(call.waiters for call in self.calls.values()),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "disconnected": self.disconnected,
+            "cancelled": self.cancelled,
+        }
@@ -3,9 +3,18 @@ from routes import base, data, nlp
 from helpers.config import get_settings
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
+from stores.rerank.RerankProviderFactory import RerankProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
+from helpers.job_worker_pool import JobWorkerPool
+from helpers.embedding_cache import EmbeddingCache
+from helpers.embedding_batcher import EmbeddingMicroBatcher
+from helpers.retrieval_cache import RetrievalCache
+from helpers.answer_cache import SemanticAnswerCache
+from helpers.singleflight import SingleFlight
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 
 app = FastAPI()
 
@@ -20,16 +29,59 @@ async def startup_span():
     )
 
     llm_provider_factory = LLMProviderFactory(settings)
-    vectordb_provider_factory = VectorDBProviderFactory(settings)
+    vectordb_provider_factory = VectorDBProviderFactory(settings, db_engine=app.db_engine)
 
     # generation client
     app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
     app.generation_client.set_generation_model(model_id = settings.GENERATION_MODEL_ID)
+    app.generation_client.connect()
 
     # embedding client
     app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
     app.embedding_client.set_embedding_model(model_id=settings.EMBEDDING_MODEL_ID,
                                              embedding_size=settings.EMBEDDING_MODEL_SIZE)
+    app.embedding_client.connect()
+
+    # vectors already paid for, shared by indexing and query embedding
+    app.embedding_cache = None
+    if settings.EMBEDDING_CACHE_ENABLED:
+        app.embedding_cache = EmbeddingCache(
+            db_client=app.db_client,
+            max_age_days=settings.EMBEDDING_CACHE_MAX_AGE_DAYS,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            evict_interval_seconds=settings.EMBEDDING_CACHE_EVICT_INTERVAL,
+        )
+
+    # query embeddings of concurrent requests go out in shared batches
+    app.embedding_batcher = None
+    if settings.EMBEDDING_BATCH_ENABLED:
+        app.embedding_batcher = EmbeddingMicroBatcher(
+            embedding_client=app.embedding_client,
+            max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_concurrency=settings.EMBEDDING_BATCH_MAX_CONCURRENCY,
+        )
+
+    # repeated queries skip the embedding and the search
+    app.retrieval_cache = None
+    if settings.RETRIEVAL_CACHE_ENABLED:
+        app.retrieval_cache = RetrievalCache.create(settings)
+
+    # answers of the LLM, per project, matched on query similarity
+    app.answer_cache = None
+    if settings.ANSWER_CACHE_ENABLED:
+        app.answer_cache = SemanticAnswerCache(
+            similarity_cutoff=settings.ANSWER_CACHE_SIMILARITY_CUTOFF,
+            ttl=settings.ANSWER_CACHE_TTL,
+            max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+            max_projects=settings.ANSWER_CACHE_MAX_PROJECTS,
+        )
+
+    app.singleflight = None
+    if settings.SINGLEFLIGHT_ENABLED:
+        app.singleflight = SingleFlight(
+            disconnect_poll_interval=settings.SINGLEFLIGHT_DISCONNECT_POLL_INTERVAL,
+        )
     
     # vector db client
     app.vectordb_client = vectordb_provider_factory.create(
@@ -37,15 +89,54 @@ async def startup_span():
     )
     app.vectordb_client.connect()
 
+    # optional rerank client, used by the requests with use_rerank
+    app.rerank_client = None
+    if settings.RERANK_BACKEND:
+        app.rerank_client = RerankProviderFactory(settings).create(provider=settings.RERANK_BACKEND)
+        app.rerank_client.connect()
+
     app.template_parser = TemplateParser(
         language=settings.PRIMARY_LANG,
         default_language=settings.DEFAULT_LANG,
     )
 
+    # CPU-bound file parsing and chunking, off the event loop process
+    app.process_executor = None
+    if settings.PROCESSING_POOL_WORKERS > 0:
+        app.process_executor = ProcessPoolExecutor(
+            max_workers=settings.PROCESSING_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    # background workers for /data/process/jobs
+    app.job_worker_pool = JobWorkerPool(
+        db_client=app.db_client,
+        workers=settings.PROCESS_JOB_WORKERS,
+        poll_interval=settings.PROCESS_JOB_POLL_INTERVAL,
+        stale_after_seconds=settings.PROCESS_JOB_STALE_AFTER,
+        executor=app.process_executor,
+    )
+    app.job_worker_pool.start()
+
 
 async def shutdown_span():
-    app.db_engine.dispose()
+    await app.job_worker_pool.stop()
+    if app.embedding_batcher:
+        await app.embedding_batcher.aclose()
+    if app.retrieval_cache:
+        await app.retrieval_cache.aclose()
+    if app.process_executor:
+        app.process_executor.shutdown(wait=False, cancel_futures=True)
+    await app.db_engine.dispose()
     app.vectordb_client.disconnect()
+    await app.vectordb_client.adisconnect()
+    if app.rerank_client:
+        app.rerank_client.disconnect()
+        await app.rerank_client.adisconnect()
+    app.generation_client.disconnect()
+    app.embedding_client.disconnect()
+    await app.generation_client.adisconnect()
+    await app.embedding_client.adisconnect()
 
 app.on_event("startup")(startup_span)
 app.on_event("shutdown")(shutdown_span)
@@ -1,13 +1,29 @@
 from .BaseDataModel import BaseDataModel
-from .db_schemes import DataChunk
+from .ProjectModel import ProjectModel
+from .db_schemes import DataChunk, Asset, RetrievedDocument
 from .enums.DataBaseEnum import DataBaseEnum
+from .enums.ProcessingEnum import AssetProcessingEnum
+from .enums.IndexingEnum import IndexingEnum
+from stores.vectordb.VectorDBEnums import PayloadSchemaEnums, FilterOperatorEnums
 from bson.objectid import ObjectId
 from pymongo import InsertOne
 from sqlalchemy.future import select
-from sqlalchemy import func, delete
+from sqlalchemy import func, delete, update, insert, literal, cast, String, BigInteger, Float, Boolean, DateTime
+from itertools import islice
+from typing import Iterable
+import operator
+import json
+import uuid
+import re
 
 class ChunkModel(BaseDataModel):
 
+    # created_at and chunk_id are left to their server defaults
+    bulk_columns = (
+        "chunk_uuid", "chunk_text", "chunk_metadata", "chunk_order",
+        "chunk_project_id", "chunk_asset_id",
+    )
+
     def __init__(self, db_client: object):
         super().__init__(db_client=db_client)
         self.db_client = db_client
@@ -33,26 +49,320 @@ class ChunkModel(BaseDataModel):
             chunk = result.scalar_one_or_none()
         return chunk
 
-    async def insert_many_chunks(self, chunks: list, batch_size: int=100):
+    async def insert_many_chunks(self, chunks: list, batch_size: int=None):
+        return await self.bulk_insert_chunks(chunks=chunks, batch_size=batch_size)
+
+    def get_chunk_row(self, chunk):
+        """
+        Column values of a DataChunk (or a dict with the same keys), in the
+        order of bulk_columns.
+        """
+        if not isinstance(chunk, dict):
+            chunk = chunk.__dict__
+
+        return (
+            chunk.get("chunk_uuid") or uuid.uuid4(),
+            chunk["chunk_text"],
+            chunk.get("chunk_metadata"),
+            chunk["chunk_order"],
+            chunk["chunk_project_id"],
+            chunk["chunk_asset_id"],
+        )
+
+    async def write_chunks_batch(self, session, rows: list, return_ids: bool=False):
+        """
+        Write one batch of chunk rows inside the session's transaction.
+
+        With return_ids the rows go through a Core executemany INSERT ...
+        RETURNING chunk_id; otherwise they are streamed with COPY when the
+        driver is asyncpg, which skips statement parsing for every row.
+        """
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        if return_ids or not hasattr(driver_connection, "copy_records_to_table"):
+            stmt = insert(DataChunk)
+            if return_ids:
+                stmt = stmt.returning(DataChunk.chunk_id, sort_by_parameter_order=True)
+
+            result = await session.execute(stmt, [
+                dict(zip(self.bulk_columns, row))
+                for row in rows
+            ])
+            return result.scalars().all() if return_ids else len(rows)
+
+        # COPY bypasses the jsonb codec, so the metadata goes as json text
+        records = [
+            (chunk_uuid, chunk_text,
+             json.dumps(chunk_metadata) if chunk_metadata is not None else None,
+             *rest)
+            for chunk_uuid, chunk_text, chunk_metadata, *rest in rows
+        ]
+
+        _ = await driver_connection.copy_records_to_table(
+            DataChunk.__tablename__,
+            records=records,
+            columns=self.bulk_columns,
+        )
+        return len(rows)
+
+    async def bulk_insert_chunks(self, chunks: Iterable, batch_size: int=None,
+                                 return_ids: bool=False):
+        """
+        Insert chunks (DataChunk objects or dicts) without the ORM unit of work,
+        in a single transaction. chunks may be a generator, it is consumed
+        batch_size rows at a time.
+
+        Returns the new chunk_ids in input order if return_ids, else the count.
+        """
+        batch_size = batch_size or self.app_settings.CHUNKS_BULK_BATCH_SIZE
+        chunks = iter(chunks)
+        no_records, chunk_ids = 0, []
 
         async with self.db_client() as session:
             async with session.begin():
-                for i in range(0, len(chunks), batch_size):
-                    batch = chunks[i:i+batch_size]
-                    session.add_all(batch)
-            await session.commit()
-        return len(chunks)
+                while batch := list(islice(chunks, batch_size)):
+                    rows = [self.get_chunk_row(chunk) for chunk in batch]
+                    written = await self.write_chunks_batch(
+                        session=session,
+                        rows=rows,
+                        return_ids=return_ids
+                    )
+
+                    if return_ids:
+                        chunk_ids.extend(written)
+                    else:
+                        no_records += written
+
+        return chunk_ids if return_ids else no_records
 
     async def delete_chunks_by_project_id(self, project_id: ObjectId):
         async with self.db_client() as session:
-            stmt = delete(DataChunk).where(DataChunk.chunk_project_id == project_id)
+            async with session.begin():
+                stmt = delete(DataChunk).where(DataChunk.chunk_project_id == project_id)
+                result = await session.execute(stmt)
+
+                # without chunks the assets have to be processed again
+                _ = await session.execute(
+                    update(Asset)
+                    .where(Asset.asset_project_id == project_id)
+                    .values(asset_config=Asset.asset_config.op("-")(
+                        literal(AssetProcessingEnum.CONFIG_KEY.value, String)
+                    ))
+                )
+
+                # lexical search results read the chunks, drop the cached ones
+                _ = await session.execute(ProjectModel.get_increment_config_counter_statement(
+                    project_id=project_id,
+                    key=IndexingEnum.COLLECTION_VERSION_KEY.value,
+                ))
+        return result.rowcount
+
+    async def delete_chunks_by_asset_id(self, asset_id: int):
+        async with self.db_client() as session:
+            stmt = delete(DataChunk).where(DataChunk.chunk_asset_id == asset_id)
             result = await session.execute(stmt)
             await session.commit()
         return result.rowcount
     
+    async def replace_asset_chunks(self, asset_id: int, chunks: list, processing_state: dict):
+        """
+        Swap the chunks of an asset and save its processing state in one
+        transaction, so a failure keeps the previous chunks and state.
+        """
+        async with self.db_client() as session:
+            async with session.begin():
+                _ = await session.execute(
+                    delete(DataChunk).where(DataChunk.chunk_asset_id == asset_id)
+                )
+
+                no_records = 0
+                for i in range(0, len(chunks), self.app_settings.CHUNKS_BULK_BATCH_SIZE):
+                    rows = [
+                        self.get_chunk_row(chunk)
+                        for chunk in chunks[i:i + self.app_settings.CHUNKS_BULK_BATCH_SIZE]
+                    ]
+                    no_records += await self.write_chunks_batch(session=session, rows=rows)
+
+                asset = await session.get(Asset, asset_id, with_for_update=True)
+                if asset is not None:
+                    asset.asset_config = {
+                        **(asset.asset_config or {}),
+                        AssetProcessingEnum.CONFIG_KEY.value: {
+                            **processing_state,
+                            "chunks_count": no_records,
+                        },
+                    }
+
+                    _ = await session.execute(ProjectModel.get_increment_config_counter_statement(
+                        project_id=asset.asset_project_id,
+                        key=IndexingEnum.COLLECTION_VERSION_KEY.value,
+                    ))
+        return no_records
+    
     async def get_poject_chunks(self, project_id: ObjectId, page_no: int=1, page_size: int=50):
         async with self.db_client() as session:
-            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id).offset((page_no - 1) * page_size).limit(page_size)
+            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id).order_by(DataChunk.chunk_id).offset((page_no - 1) * page_size).limit(page_size)
             result = await session.execute(stmt)
             records = result.scalars().all()
         return records
+
+    async def count_project_chunks(self, project_id: int, max_chunk_id: int=None):
+        async with self.db_client() as session:
+            stmt = select(func.count(DataChunk.chunk_id)).where(DataChunk.chunk_project_id == project_id)
+            if max_chunk_id is not None:
+                stmt = stmt.where(DataChunk.chunk_id <= max_chunk_id)
+            result = await session.execute(stmt)
+        return result.scalar_one()
+
+    async def get_existing_chunk_ids(self, project_id: int, chunk_ids: list):
+        """
+        The subset of chunk_ids that still exist in the project.
+        """
+        if not chunk_ids:
+            return set()
+
+        async with self.db_client() as session:
+            stmt = select(DataChunk.chunk_id).where(
+                DataChunk.chunk_project_id == project_id,
+                DataChunk.chunk_id.in_(chunk_ids)
+            )
+            result = await session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def iter_project_chunks(self, project_id: int, page_size: int=50, after_chunk_id: int=0,
+                                  max_chunk_id: int=None):
+        """
+        Stream the chunks of a project in pages ordered by chunk_id.
+
+        Each page starts after the last chunk_id of the previous one (keyset
+        pagination on the (chunk_project_id, chunk_id) index), so every page
+        costs the same however deep into the project it is.
+        """
+        last_chunk_id = after_chunk_id
+
+        while True:
+            async with self.db_client() as session:
+                stmt = select(DataChunk).where(
+                    DataChunk.chunk_project_id == project_id,
+                    DataChunk.chunk_id > last_chunk_id
+                )
+                if max_chunk_id is not None:
+                    stmt = stmt.where(DataChunk.chunk_id <= max_chunk_id)
+                stmt = stmt.order_by(DataChunk.chunk_id).limit(page_size)
+                result = await session.execute(stmt)
+                records = result.scalars().all()
+
+            if not records:
+                break
+
+            yield records
+
+            if len(records) < page_size:
+                break
+
+            last_chunk_id = records[-1].chunk_id
+
+    def get_filter_column(self, field: str, field_type: str):
+        # the chunk column behind a payload field of the vector db
+        if field == "chunk_id":
+            return DataChunk.chunk_id
+
+        if field == "asset_id":
+            return DataChunk.chunk_asset_id
+
+        sql_types = {
+            PayloadSchemaEnums.KEYWORD.value: String,
+            PayloadSchemaEnums.INTEGER.value: BigInteger,
+            PayloadSchemaEnums.FLOAT.value: Float,
+            PayloadSchemaEnums.BOOL.value: Boolean,
+            PayloadSchemaEnums.DATETIME.value: DateTime(timezone=True),
+        }
+        metadata_key = field.split(".", 1)[1]
+        return cast(DataChunk.chunk_metadata[metadata_key].astext, sql_types[field_type])
+
+    def get_filter_clauses(self, filters: list = None):
+        # conditions prepared by the vector db client's prepare_filters
+        operators = {
+            FilterOperatorEnums.EQ.value: operator.eq,
+            FilterOperatorEnums.GT.value: operator.gt,
+            FilterOperatorEnums.GTE.value: operator.ge,
+            FilterOperatorEnums.LT.value: operator.lt,
+            FilterOperatorEnums.LTE.value: operator.le,
+        }
+
+        clauses = []
+        for condition in filters or []:
+            column = self.get_filter_column(condition["field"], condition["type"])
+            if condition["op"] == FilterOperatorEnums.IN.value:
+                clauses.append(column.in_(condition["value"]))
+            else:
+                clauses.append(operators[condition["op"]](column, condition["value"]))
+
+        return clauses
+
+    def get_search_statement(self, project_id: int, text: str, limit: int = 20,
+                             filters: list = None):
+        # None when the text has no searchable word
+        terms = list(dict.fromkeys(
+            term for term in re.findall(r"\w+", text.lower())
+            if term != "or"
+        ))
+        if not terms:
+            return None
+
+        ts_query = func.websearch_to_tsquery("simple", " or ".join(terms))
+        rank = func.ts_rank_cd(DataChunk.chunk_tsv, ts_query)
+
+        return select(DataChunk.chunk_id, DataChunk.chunk_text, rank.label("rank")).where(
+            DataChunk.chunk_project_id == project_id,
+            DataChunk.chunk_tsv.op("@@")(ts_query),
+            *self.get_filter_clauses(filters=filters)
+        ).order_by(rank.desc(), DataChunk.chunk_id).limit(limit)
+
+    async def search_project_chunks(self, project_id: int, text: str, limit: int = 20,
+                                    filters: list = None):
+        """
+        Full-text search of the project's chunks, best ts_rank_cd first.
+
+        Any word of the query may match (an OR query). ts_rank_cd is a cover
+        density ranking: it rewards chunks where the matched words are many and
+        close together, with no term rarity (IDF) or length saturation, so it
+        is not BM25. The chunk_tsv column is generated by Postgres and GIN indexed, so newly written
+        chunks are searchable without a separate indexing step.
+        """
+        results = await self.search_project_chunks_batch(
+            project_id=project_id,
+            texts=[text],
+            limit=limit,
+            filters=filters,
+        )
+        return results[0]
+
+    async def search_project_chunks_batch(self, project_id: int, texts: list, limit: int = 20,
+                                          filters: list = None):
+        """
+        search_project_chunks for several texts over a single session, one
+        result list per text.
+        """
+        results = []
+        async with self.db_client() as session:
+            for text in texts:
+                stmt = self.get_search_statement(
+                    project_id=project_id,
+                    text=text,
+                    limit=limit,
+                    filters=filters,
+                )
+                if stmt is None:
+                    results.append([])
+                    continue
+
+                result = await session.execute(stmt)
+                results.append([
+                    RetrievedDocument(text=chunk_text, score=float(score), chunk_id=chunk_id)
+                    for chunk_id, chunk_text, score in result.all()
+                ])
+
+        return results
@@ -0,0 +1,92 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import CachedEmbedding
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func, delete
+from datetime import datetime, timedelta, timezone
+
+class EmbeddingCacheModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client)
+        return instance
+
+    async def get_vectors(self, cache_keys: list):
+        """
+        Map cache_key -> packed vector for the keys found in the cache.
+        """
+        if not cache_keys:
+            return {}
+
+        async with self.db_client() as session:
+            stmt = select(CachedEmbedding.cache_key, CachedEmbedding.cache_vector).where(
+                CachedEmbedding.cache_key.in_(cache_keys)
+            )
+            result = await session.execute(stmt)
+            records = result.all()
+
+        return {
+            bytes(cache_key): cache_vector
+            for cache_key, cache_vector in records
+        }
+
+    async def insert_vectors(self, records: list, batch_size: int=1000):
+        """
+        Store dicts with the CachedEmbedding columns; keys already cached are
+        left untouched.
+        """
+        if not records:
+            return 0
+
+        no_records = 0
+        async with self.db_client() as session:
+            async with session.begin():
+                for i in range(0, len(records), batch_size):
+                    stmt = insert(CachedEmbedding).values(records[i:i + batch_size]).on_conflict_do_nothing(
+                        index_elements=[CachedEmbedding.cache_key]
+                    )
+                    result = await session.execute(stmt)
+                    no_records += result.rowcount
+        return no_records
+
+    async def delete_older_than(self, max_age_seconds: float):
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+
+        async with self.db_client() as session:
+            stmt = delete(CachedEmbedding).where(CachedEmbedding.created_at < cutoff)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def delete_beyond_size(self, max_entries: int):
+        # keep the newest max_entries vectors
+        async with self.db_client() as session:
+            evicted_keys = select(CachedEmbedding.cache_key).order_by(
+                CachedEmbedding.created_at.desc()
+            ).offset(max_entries)
+
+            stmt = delete(CachedEmbedding).where(CachedEmbedding.cache_key.in_(evicted_keys))
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def get_cache_size(self):
+        async with self.db_client() as session:
+            stmt = select(
+                func.count(CachedEmbedding.cache_key),
+                func.coalesce(func.sum(func.octet_length(CachedEmbedding.cache_vector)), 0),
+                func.min(CachedEmbedding.created_at),
+            )
+            result = await session.execute(stmt)
+            no_entries, no_bytes, oldest = result.one()
+
+        return {
+            "entries": no_entries,
+            "vector_bytes": int(no_bytes),
+            "oldest_entry_at": oldest.isoformat() if oldest else None,
+        }
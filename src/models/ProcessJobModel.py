@@ -0,0 +1,88 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import ProcessJob
+from .enums.ProcessJobStatusEnum import ProcessJobStatusEnum
+from sqlalchemy.future import select
+from sqlalchemy import update
+from datetime import datetime, timedelta, timezone
+
+class ProcessJobModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client)
+        return instance
+
+    async def create_job(self, job: ProcessJob):
+
+        async with self.db_client() as session:
+            async with session.begin():
+                session.add(job)
+            await session.commit()
+            await session.refresh(job)
+        return job
+
+    async def get_job_by_uuid(self, job_uuid: str):
+
+        async with self.db_client() as session:
+            stmt = select(ProcessJob).where(ProcessJob.job_uuid == job_uuid)
+            result = await session.execute(stmt)
+            record = result.scalar_one_or_none()
+        return record
+
+    async def claim_next_job(self):
+        # SKIP LOCKED lets every API worker poll the same table
+        # without two of them picking the same job
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = select(ProcessJob).where(
+                    ProcessJob.job_status == ProcessJobStatusEnum.QUEUED.value
+                ).order_by(ProcessJob.job_id).limit(1).with_for_update(skip_locked=True)
+
+                result = await session.execute(stmt)
+                job = result.scalar_one_or_none()
+
+                if job is None:
+                    return None
+
+                now = datetime.now(timezone.utc)
+                job.job_status = ProcessJobStatusEnum.RUNNING.value
+                job.started_at = job.started_at or now
+                job.updated_at = now
+
+        return job
+
+    async def update_job(self, job_id: int, **values):
+
+        async with self.db_client() as session:
+            stmt = update(ProcessJob).where(ProcessJob.job_id == job_id).values(**values)
+            await session.execute(stmt)
+            await session.commit()
+
+    async def touch_job(self, job_id: int):
+        # heartbeat of a running job, a re-queued one is left alone
+        async with self.db_client() as session:
+            stmt = update(ProcessJob).where(
+                ProcessJob.job_id == job_id,
+                ProcessJob.job_status == ProcessJobStatusEnum.RUNNING.value
+            ).values(updated_at=datetime.now(timezone.utc))
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def requeue_stale_jobs(self, stale_after_seconds: int):
+        # a running job whose worker stopped sending heartbeats (crash, restart)
+        # goes back to the queue; finished assets are skipped on the next run
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+
+        async with self.db_client() as session:
+            stmt = update(ProcessJob).where(
+                ProcessJob.job_status == ProcessJobStatusEnum.RUNNING.value,
+                ProcessJob.updated_at < cutoff
+            ).values(job_status=ProcessJobStatusEnum.QUEUED.value)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
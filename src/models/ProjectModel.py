@@ -2,7 +2,7 @@ from .BaseDataModel import BaseDataModel
 from .db_schemes import Project
 from .enums.DataBaseEnum import DataBaseEnum
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, update, literal, Integer, String
 
 class ProjectModel(BaseDataModel):
 
@@ -40,6 +40,50 @@ class ProjectModel(BaseDataModel):
                 else:
                     return project
 
+    async def update_project_config(self, project_id: int, **values):
+        """
+        Merge values into the top-level keys of the project_config.
+        """
+        async with self.db_client() as session:
+            async with session.begin():
+                project = await session.get(Project, project_id, with_for_update=True)
+                if project is None:
+                    return None
+
+                project.project_config = {
+                    **(project.project_config or {}),
+                    **values,
+                }
+            await session.refresh(project)
+
+        return project
+
+    @staticmethod
+    def get_increment_config_counter_statement(project_id: int, key: str):
+        # a single UPDATE: concurrent increments are serialized by the row lock
+        counter = Project.project_config[key].astext.cast(Integer)
+        return (
+            update(Project)
+            .where(Project.project_id == project_id)
+            .values(project_config=func.coalesce(Project.project_config, func.jsonb_build_object()).op("||")(
+                func.jsonb_build_object(literal(key, String), func.coalesce(counter, 0) + 1)
+            ))
+            .returning(counter)
+        )
+
+    async def increment_config_counter(self, project_id: int, key: str):
+        """
+        Add one to an integer key of the project_config, returns the new value.
+        """
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(
+                    self.get_increment_config_counter_statement(project_id=project_id, key=key)
+                )
+                value = result.scalar_one_or_none()
+
+        return value
+
     async def get_all_projects(self, page: int=1, page_size: int=10):
 
         async with self.db_client() as session:
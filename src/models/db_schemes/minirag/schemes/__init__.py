@@ -2,3 +2,5 @@ from .minirag_base import SQLAlchemyBase
 from .asset import Asset
 from .project import Project
 from .datachunk import DataChunk, RetrievedDocument
+from .process_job import ProcessJob
+from .embedding_cache import CachedEmbedding
@@ -1,9 +1,10 @@
 from .minirag_base import SQLAlchemyBase
-from sqlalchemy import Column, Integer, DateTime, func, String, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, DateTime, func, String, ForeignKey, Computed
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy import Index
 from pydantic import BaseModel
+from typing import Optional
 import uuid
 
 class DataChunk(SQLAlchemyBase):
@@ -17,6 +18,13 @@ class DataChunk(SQLAlchemyBase):
     chunk_metadata = Column(JSONB, nullable=True)
     chunk_order = Column(Integer, nullable=False)
 
+    # lexical index of the text, kept up to date by Postgres on every write
+    chunk_tsv = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', chunk_text)", persisted=True),
+        nullable=True,
+    ))
+
     chunk_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
     chunk_asset_id = Column(Integer, ForeignKey("assets.asset_id"), nullable=False)
 
@@ -27,10 +35,12 @@ class DataChunk(SQLAlchemyBase):
     asset = relationship("Asset", back_populates="chunks")
 
     __table_args__ = (
-        Index('ix_chunk_project_id', chunk_project_id),
+        Index('ix_chunk_project_id_chunk_id', chunk_project_id, chunk_id),
         Index('ix_chunk_asset_id', chunk_asset_id),
+        Index('ix_chunk_tsv', chunk_tsv, postgresql_using='gin'),
     )
 
 class RetrievedDocument(BaseModel):
     text: str
-    score: float
\ No newline at end of file
+    score: float
+    chunk_id: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,22 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, DateTime, func, String, LargeBinary
+from sqlalchemy import Index
+
+class CachedEmbedding(SQLAlchemyBase):
+
+    __tablename__ = "embedding_cache"
+
+    # sha256 of model id, embedding size, document type and text
+    cache_key = Column(LargeBinary, primary_key=True)
+
+    # float32 values packed with array("f")
+    cache_vector = Column(LargeBinary, nullable=False)
+
+    cache_model_id = Column(String, nullable=False)
+    cache_embedding_size = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_embedding_cache_created_at', created_at),
+    )
@@ -0,0 +1,37 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, DateTime, func, String, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy import Index
+import uuid
+
+class ProcessJob(SQLAlchemyBase):
+
+    __tablename__ = "process_jobs"
+
+    job_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+
+    job_status = Column(String, nullable=False)
+    job_config = Column(JSONB, nullable=True)
+    job_progress = Column(JSONB, nullable=True)
+    job_error = Column(String, nullable=True)
+
+    job_total_assets = Column(Integer, nullable=False, default=0)
+    job_processed_assets = Column(Integer, nullable=False, default=0)
+    job_failed_assets = Column(Integer, nullable=False, default=0)
+    job_inserted_chunks = Column(Integer, nullable=False, default=0)
+
+    job_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
+
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+    project = relationship("Project", back_populates="process_jobs")
+
+    __table_args__ = (
+        Index('ix_process_job_project_id', job_project_id),
+        Index('ix_process_job_status', job_status),
+    )
@@ -1,6 +1,6 @@
 from .minirag_base import SQLAlchemyBase
 from sqlalchemy import Column, Integer, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 from sqlalchemy.orm import relationship
 
@@ -10,9 +10,11 @@ class Project(SQLAlchemyBase):
     
     project_id = Column(Integer, primary_key=True, autoincrement=True)
     project_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    project_config = Column(JSONB, nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
     chunks = relationship("DataChunk", back_populates="project")
     assets = relationship("Asset", back_populates="project")
+    process_jobs = relationship("ProcessJob", back_populates="project")
@@ -0,0 +1,11 @@
+from enum import Enum
+
+class SharedCacheBackendEnum(Enum):
+
+    REDIS = "REDIS"    # shared by every API process
+    LOCAL = "LOCAL"    # in-process stand-in with the same TTL semantics
+
+class CacheNamespaceEnum(Enum):
+
+    EMBEDDING = "embedding"
+    SEARCH = "search"
@@ -0,0 +1,14 @@
+from enum import Enum
+
+class IndexingEnum(Enum):
+
+    # key of the vector index state inside Project.project_config
+    CONFIG_KEY = "indexing"
+
+    # per-project overrides of the vector db options, inside Project.project_config:
+    # {"collection": {...}, "search": {...}}
+    VECTOR_DB_CONFIG_KEY = "vector_db"
+
+    # counter inside Project.project_config, bumped on every push, reset or
+    # rewrite of the chunks; cached search results are keyed by it
+    COLLECTION_VERSION_KEY = "collection_version"
@@ -0,0 +1,14 @@
+from enum import Enum
+
+class ProcessJobStatusEnum(Enum):
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class AssetProgressStatusEnum(Enum):
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
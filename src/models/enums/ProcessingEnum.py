@@ -5,3 +5,11 @@ class ProcessingEnum(Enum):
     TXT = ".txt"
     PDF = ".pdf"
     CSV = ".csv"
+
+class AssetProcessingEnum(Enum):
+
+    # key of the processing state inside Asset.asset_config
+    CONFIG_KEY = "processing"
+
+    # bump whenever loading or splitting changes the chunks of a same file
+    SPLITTER_VERSION = "recursive_character_v1"
@@ -17,6 +17,26 @@ class ResponseSignal(Enum):
     VECTORDB_COLLECTION_RETRIEVED = "vectordb_collection_retrieved"
     VECTORDB_SEARCH_ERROR = "vectordb_search_error"
     VECTORDB_SEARCH_SUCCESS = "vectordb_search_success"
+    VECTORDB_SEARCH_FILTER_INVALID = "vectordb_search_filter_invalid"
+    VECTORDB_SEARCH_MODE_INVALID = "vectordb_search_mode_invalid"
+    VECTORDB_SEARCH_BATCH_INVALID = "vectordb_search_batch_invalid"
     RAG_ANSWER_ERROR = "rag_answer_error"
     RAG_ANSWER_SUCCESS = "rag_answer_success"
-    
\ No newline at end of file
+    PROCESS_JOB_SUBMITTED = "process_job_submitted"
+    PROCESS_JOB_NOT_FOUND = "process_job_not_found"
+    PROCESS_JOB_RETRIEVED = "process_job_retrieved"
+    EMBEDDING_CACHE_DISABLED = "embedding_cache_disabled"
+    EMBEDDING_CACHE_STATS_RETRIEVED = "embedding_cache_stats_retrieved"
+    EMBEDDING_CACHE_EVICTED = "embedding_cache_evicted"
+    EMBEDDING_BATCHER_DISABLED = "embedding_batcher_disabled"
+    EMBEDDING_BATCHER_STATS_RETRIEVED = "embedding_batcher_stats_retrieved"
+    RERANK_DISABLED = "rerank_disabled"
+    RERANK_STATS_RETRIEVED = "rerank_stats_retrieved"
+    RETRIEVAL_CACHE_DISABLED = "retrieval_cache_disabled"
+    RETRIEVAL_CACHE_STATS_RETRIEVED = "retrieval_cache_stats_retrieved"
+    ANSWER_CACHE_DISABLED = "answer_cache_disabled"
+    ANSWER_CACHE_STATS_RETRIEVED = "answer_cache_stats_retrieved"
+    SINGLEFLIGHT_DISABLED = "singleflight_disabled"
+    SINGLEFLIGHT_STATS_RETRIEVED = "singleflight_stats_retrieved"
+    INDEX_CONFIG_INVALID = "index_config_invalid"
+    INDEX_CONFIG_UPDATED = "index_config_updated"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class SearchModeEnum(Enum):
+
+    DENSE = "dense"        # vector search only
+    LEXICAL = "lexical"    # full-text search on the chunks only
+    HYBRID = "hybrid"      # both, merged with reciprocal rank fusion
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class SingleFlightEnum(Enum):
+
+    # key namespaces of the coalesced requests
+    SEARCH = "search"
+    ANSWER = "answer"
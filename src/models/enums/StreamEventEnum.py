@@ -0,0 +1,8 @@
+from enum import Enum
+
+class StreamEventEnum(Enum):
+
+    DOCUMENTS = "documents"
+    TOKEN = "token"
+    DONE = "done"
+    ERROR = "error"
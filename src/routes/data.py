@@ -3,15 +3,19 @@ from fastapi.responses import JSONResponse
 import os
 from helpers.config import get_settings, Settings
 from controllers import DataController, ProjectController, ProcessController
+from controllers.ProcessJobController import ProcessJobController
 import aiofiles
 from models import ResponseSignal
 import logging
+import uuid
 from .schemes.data import ProcessRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from models.AssetModel import AssetModel
-from models.db_schemes import DataChunk, Asset
+from models.ProcessJobModel import ProcessJobModel
+from models.db_schemes import DataChunk, Asset, ProcessJob
 from models.enums.AssetTypeEnum import AssetTypeEnum
+from models.enums.ProcessJobStatusEnum import ProcessJobStatusEnum
 
 logger = logging.getLogger('uvicorn.error')
 
@@ -88,8 +92,30 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
             }
         )
 
+async def get_project_assets(asset_model: AssetModel, project_id: int, file_id: str = None):
+    """
+    The assets to process: the one named by file_id, or every file of the
+    project. None if file_id is unknown.
+    """
+    if file_id:
+        asset_record = await asset_model.get_asset_record(
+            asset_project_id=project_id,
+            asset_name=file_id
+        )
+
+        if asset_record is None:
+            return None
+
+        return [asset_record]
+
+    return await asset_model.get_all_project_assets(
+        asset_project_id=project_id,
+        asset_type=AssetTypeEnum.FILE.value,
+    )
+
 @data_router.post("/process/{project_id}")
-async def process_endpoint(request: Request, project_id: int, process_request: ProcessRequest):
+async def process_endpoint(request: Request, project_id: int, process_request: ProcessRequest,
+                           app_settings: Settings = Depends(get_settings)):
 
     chunk_size = process_request.chunk_size
     overlap_size = process_request.overlap_size
@@ -107,39 +133,21 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
             db_client=request.app.db_client
         )
 
-    project_files_ids = {}
-    if process_request.file_id:
-        asset_record = await asset_model.get_asset_record(
-            asset_project_id=project.project_id,
-            asset_name=process_request.file_id
-        )
-
-        if asset_record is None:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.FILE_ID_ERROR.value,
-                }
-            )
-
-        project_files_ids = {
-            asset_record.asset_id: asset_record.asset_name
-        }
-    
-    else:
-        
+    project_assets = await get_project_assets(
+        asset_model=asset_model,
+        project_id=project.project_id,
+        file_id=process_request.file_id
+    )
 
-        project_files = await asset_model.get_all_project_assets(
-            asset_project_id=project.project_id,
-            asset_type=AssetTypeEnum.FILE.value,
+    if project_assets is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_ID_ERROR.value,
+            }
         )
 
-        project_files_ids = {
-            record.asset_id: record.asset_name
-            for record in project_files
-        }
-
-    if len(project_files_ids) == 0:
+    if len(project_assets) == 0:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
@@ -161,22 +169,27 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
             project_id=project.project_id
         )
 
-    for asset_id, file_id in project_files_ids.items():
+    # only new assets, changed files or a new chunking signature are processed
+    project_files_ids, processing_states = await process_controller.get_assets_to_process(
+        assets=project_assets,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size,
+        force=do_reset == 1,
+    )
 
-        file_content = process_controller.get_file_content(file_id=file_id)
+    async for asset_id, file_id, file_chunks, _ in process_controller.iter_files_chunks(
+        project_files_ids=project_files_ids,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size,
+        executor=request.app.process_executor,
+        max_pending=2 * app_settings.PROCESSING_POOL_WORKERS,
+    ):
 
-        if file_content is None:
+        if file_chunks is None:
             logger.error(f"Error while processing file: {file_id}")
             continue
 
-        file_chunks = process_controller.process_file_content(
-            file_content=file_content,
-            file_id=file_id,
-            chunk_size=chunk_size,
-            overlap_size=overlap_size
-        )
-
-        if file_chunks is None or len(file_chunks) == 0:
+        if len(file_chunks) == 0:
             return JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
@@ -186,22 +199,135 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
 
         file_chunks_records = [
             DataChunk(
-                chunk_text=chunk.page_content,
-                chunk_metadata=chunk.metadata,
+                chunk_text=chunk_text,
+                chunk_metadata=chunk_metadata,
                 chunk_order=i+1,
                 chunk_project_id=project.project_id,
                 chunk_asset_id=asset_id
             )
-            for i, chunk in enumerate(file_chunks)
+            for i, (chunk_text, chunk_metadata) in enumerate(file_chunks)
         ]
 
-        no_records += await chunk_model.insert_many_chunks(chunks=file_chunks_records)
+        no_records += await chunk_model.replace_asset_chunks(
+            asset_id=asset_id,
+            chunks=file_chunks_records,
+            processing_state=processing_states[asset_id],
+        )
         no_files += 1
 
     return JSONResponse(
         content={
             "signal": ResponseSignal.PROCESSING_SUCCESS.value,
             "inserted_chunks": no_records,
-            "processed_files": no_files
+            "processed_files": no_files,
+            "skipped_files": len(project_assets) - len(project_files_ids),
+        }
+    )
+
+@data_router.post("/process/jobs/{project_id}")
+async def submit_process_job(request: Request, project_id: int, process_request: ProcessRequest):
+
+    project_model = await ProjectModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(
+        project_id=project_id
+    )
+
+    asset_model = await AssetModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project_assets = await get_project_assets(
+        asset_model=asset_model,
+        project_id=project.project_id,
+        file_id=process_request.file_id
+    )
+
+    if project_assets is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_ID_ERROR.value,
+            }
+        )
+
+    if len(project_assets) == 0:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.NO_FILES_ERROR.value,
+            }
+        )
+
+    # only new assets, changed files or a new chunking signature get into the job
+    process_controller = ProcessController(project_id=project_id)
+    project_files_ids, processing_states = await process_controller.get_assets_to_process(
+        assets=project_assets,
+        chunk_size=process_request.chunk_size,
+        overlap_size=process_request.overlap_size,
+        force=process_request.do_reset == 1,
+    )
+
+    job_controller = ProcessJobController(db_client=request.app.db_client)
+    job_model = await ProcessJobModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    job = await job_model.create_job(job=ProcessJob(
+        job_project_id=project.project_id,
+        job_status=ProcessJobStatusEnum.QUEUED.value,
+        job_config={
+            "chunk_size": process_request.chunk_size,
+            "overlap_size": process_request.overlap_size,
+            "do_reset": process_request.do_reset,
+        },
+        job_progress=job_controller.create_job_progress(
+            project_files_ids=project_files_ids,
+            processing_states=processing_states,
+        ),
+        job_total_assets=len(project_files_ids),
+        job_processed_assets=0,
+        job_failed_assets=0,
+        job_inserted_chunks=0,
+    ))
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.PROCESS_JOB_SUBMITTED.value,
+            "job_id": str(job.job_uuid),
+            "total_assets": job.job_total_assets,
+            "skipped_assets": len(project_assets) - len(project_files_ids),
+        }
+    )
+
+@data_router.get("/process/jobs/status/{job_id}")
+async def get_process_job_status(request: Request, job_id: str):
+
+    job_model = await ProcessJobModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    try:
+        job = await job_model.get_job_by_uuid(job_uuid=uuid.UUID(job_id))
+    except ValueError:
+        job = None
+
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROCESS_JOB_NOT_FOUND.value,
+            }
+        )
+
+    job_controller = ProcessJobController(db_client=request.app.db_client)
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.PROCESS_JOB_RETRIEVED.value,
+            "job": job_controller.get_job_status(job=job),
         }
     )
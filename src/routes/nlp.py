@@ -1,13 +1,18 @@
 # nlp.py
-from fastapi import FastAPI, APIRouter, status, Request
-from fastapi.responses import JSONResponse
-from routes.schemes.nlp import PushRequest, SearchRequest
+from fastapi import FastAPI, APIRouter, Depends, status, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from routes.schemes.nlp import PushRequest, SearchRequest, BatchSearchRequest, IndexConfigRequest
+from helpers.config import get_settings, Settings
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from controllers import NLPController
 from models import ResponseSignal
+from models.enums.IndexingEnum import IndexingEnum
+from models.enums.SingleFlightEnum import SingleFlightEnum
+from stores.vectordb.VectorDBEnums import QdrantQuantizationEnums
 
 import logging
+import json
 
 logger = logging.getLogger('uvicorn.error')
 
@@ -16,6 +21,44 @@ nlp_router = APIRouter(
     tags=["api_v1", "nlp"],
 )
 
+def get_nlp_controller(request: Request):
+    return NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        db_client=request.app.db_client,
+        rerank_client=request.app.rerank_client,
+        embedding_batcher=request.app.embedding_batcher,
+        retrieval_cache=request.app.retrieval_cache,
+        answer_cache=request.app.answer_cache,
+    )
+
+async def run_single_flight(request: Request, namespace: str, project_id: int,
+                            search_request: SearchRequest, search_filters: list,
+                            search_mode: str, function):
+    # identical requests in flight share one computation; None if the client left
+    if request.app.singleflight is None:
+        return await function()
+
+    key = request.app.singleflight.get_key(
+        namespace=namespace,
+        project_id=project_id,
+        text=search_request.text,
+        limit=search_request.limit,
+        threshold=search_request.similarity_threshold,
+        use_rerank=search_request.use_rerank,
+        filters=search_filters,
+        search_mode=search_mode,
+    )
+
+    return await request.app.singleflight.do(
+        key=key,
+        function=function,
+        is_disconnected=request.is_disconnected,
+    )
+
 @nlp_router.post("/index/push/{project_id}")
 async def index_project(request: Request, project_id: int, push_request: PushRequest):
 
@@ -30,52 +73,25 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
             content={"signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value}
         )
     
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
-    )
+    nlp_controller = get_nlp_controller(request=request)
 
-    has_records = True
-    page_no = 1
-    inserted_items_count = 0
-    idx = 0
-
-    while has_records:
-        page_chunks = await chunk_model.get_poject_chunks(
-            project_id=project.project_id,
-            page_no=page_no
-        )
-        if len(page_chunks):
-            page_no += 1
-        
-        if not page_chunks or len(page_chunks) == 0:
-            has_records = False
-            break
+    push_stats = await nlp_controller.push_project_into_vector_db(
+        project=project,
+        chunk_model=chunk_model,
+        project_model=project_model,
+        do_reset=push_request.do_reset == 1,
+    )
 
-        chunks_ids = list(range(idx, idx + len(page_chunks)))
-        idx += len(page_chunks)
-        
-        is_inserted = nlp_controller.index_into_vector_db(
-            project=project,
-            chunks=page_chunks,
-            do_reset=push_request.do_reset,
-            chunks_ids=chunks_ids
+    if push_stats is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value}
         )
-
-        if not is_inserted:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value}
-            )
-        
-        inserted_items_count += len(page_chunks)
         
     return JSONResponse(
         content={
             "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
-            "inserted_items_count": inserted_items_count
+            **push_stats,
         }
     )
 
@@ -85,12 +101,7 @@ async def get_project_index_info(request: Request, project_id: int):
     project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
     project = await project_model.get_project_or_create_one(project_id=project_id)
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
-    )
+    nlp_controller = get_nlp_controller(request=request)
 
     collection_info = nlp_controller.get_vector_db_collection_info(project=project)
 
@@ -101,25 +112,89 @@ async def get_project_index_info(request: Request, project_id: int):
         }
     )
 
+@nlp_router.post("/index/config/{project_id}")
+async def set_project_index_config(request: Request, project_id: int, config_request: IndexConfigRequest):
+
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    if not project:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value}
+        )
+
+    quantization = config_request.collection.quantization if config_request.collection else None
+    if quantization is not None and quantization not in [q.value for q in QdrantQuantizationEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.INDEX_CONFIG_INVALID.value}
+        )
+
+    # replaces the previous overrides; collection options apply from the next
+    # push, which rebuilds the collection
+    index_config = {
+        section: (values.model_dump(exclude_none=True) or None) if values else None
+        for section, values in (("collection", config_request.collection),
+                                ("search", config_request.search))
+    }
+
+    _ = await project_model.update_project_config(
+        project_id=project.project_id,
+        **{IndexingEnum.VECTOR_DB_CONFIG_KEY.value: index_config}
+    )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.INDEX_CONFIG_UPDATED.value,
+            "index_config": index_config,
+        }
+    )
+
 @nlp_router.post("/index/search/{project_id}")
 async def search_index(request: Request, project_id: int, search_request: SearchRequest):
     
     project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
     project = await project_model.get_project_or_create_one(project_id=project_id)
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+    nlp_controller = get_nlp_controller(request=request)
+
+    search_filters = nlp_controller.prepare_search_filters(
+        filters=[f.model_dump() for f in search_request.filters or []]
     )
+    if search_filters is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_FILTER_INVALID.value}
+        )
+
+    search_mode = nlp_controller.get_search_mode(search_mode=search_request.search_mode)
+    if search_mode is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_MODE_INVALID.value}
+        )
 
     # Pass similarity_threshold to the search method
-    results = nlp_controller.search_vector_db_collection(
-        project=project, 
-        text=search_request.text, 
-        limit=search_request.limit,
-        threshold=search_request.similarity_threshold
+    async def search():
+        return await nlp_controller.asearch_vector_db_collection(
+            project=project, 
+            text=search_request.text, 
+            limit=search_request.limit,
+            threshold=search_request.similarity_threshold,
+            filters=search_filters,
+            search_mode=search_mode,
+            use_rerank=search_request.use_rerank,
+        )
+
+    results = await run_single_flight(
+        request=request,
+        namespace=SingleFlightEnum.SEARCH.value,
+        project_id=project_id,
+        search_request=search_request,
+        search_filters=search_filters,
+        search_mode=search_mode,
+        function=search,
     )
 
     if not results:
@@ -136,26 +211,109 @@ async def search_index(request: Request, project_id: int, search_request: Search
         }
     )
 
-@nlp_router.post("/index/answer/{project_id}")
-async def answer_rag(request: Request, project_id: int, search_request: SearchRequest):
+@nlp_router.post("/index/search/batch/{project_id}")
+async def search_index_batch(request: Request, project_id: int, search_request: BatchSearchRequest,
+                             app_settings: Settings = Depends(get_settings)):
+
+    if not search_request.texts or len(search_request.texts) > app_settings.SEARCH_BATCH_MAX_TEXTS:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_BATCH_INVALID.value}
+        )
 
     project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
     project = await project_model.get_project_or_create_one(project_id=project_id)
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+    nlp_controller = get_nlp_controller(request=request)
+
+    search_filters = nlp_controller.prepare_search_filters(
+        filters=[f.model_dump() for f in search_request.filters or []]
     )
+    if search_filters is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_FILTER_INVALID.value}
+        )
 
-    # answer_rag_question now returns 4 items
-    answer, full_prompt, chat_history, used_docs = nlp_controller.answer_rag_question(
+    search_mode = nlp_controller.get_search_mode(search_mode=search_request.search_mode)
+    if search_mode is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_MODE_INVALID.value}
+        )
+
+    # one embedding call and one vector DB batch for all the texts
+    results = await nlp_controller.asearch_batch_vector_db_collection(
         project=project,
-        query=search_request.text,
+        texts=search_request.texts,
         limit=search_request.limit,
-        threshold=search_request.similarity_threshold
+        threshold=search_request.similarity_threshold,
+        filters=search_filters,
+        search_mode=search_mode,
+        use_rerank=search_request.use_rerank,
+    )
+
+    if results is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_ERROR.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.VECTORDB_SEARCH_SUCCESS.value,
+            "results": [
+                [result.dict() for result in query_results]
+                for query_results in results
+            ]
+        }
+    )
+
+@nlp_router.post("/index/answer/{project_id}")
+async def answer_rag(request: Request, project_id: int, search_request: SearchRequest):
+
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    nlp_controller = get_nlp_controller(request=request)
+
+    search_filters = nlp_controller.prepare_search_filters(
+        filters=[f.model_dump() for f in search_request.filters or []]
     )
+    if search_filters is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_FILTER_INVALID.value}
+        )
+
+    search_mode = nlp_controller.get_search_mode(search_mode=search_request.search_mode)
+    if search_mode is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_MODE_INVALID.value}
+        )
+
+    # aanswer_rag_question returns 4 items
+    async def answer():
+        return await nlp_controller.aanswer_rag_question(
+            project=project,
+            query=search_request.text,
+            limit=search_request.limit,
+            threshold=search_request.similarity_threshold,
+            filters=search_filters,
+            search_mode=search_mode,
+            use_rerank=search_request.use_rerank,
+        )
+
+    answer, full_prompt, chat_history, used_docs = await run_single_flight(
+        request=request,
+        namespace=SingleFlightEnum.ANSWER.value,
+        project_id=project_id,
+        search_request=search_request,
+        search_filters=search_filters,
+        search_mode=search_mode,
+        function=answer,
+    ) or (None, None, None, [])
 
     if not answer:
         return JSONResponse(
@@ -175,3 +333,158 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchRe
             ]
         }
     )
+
+@nlp_router.post("/index/answer/stream/{project_id}")
+async def answer_rag_stream(request: Request, project_id: int, search_request: SearchRequest):
+
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    nlp_controller = get_nlp_controller(request=request)
+
+    search_filters = nlp_controller.prepare_search_filters(
+        filters=[f.model_dump() for f in search_request.filters or []]
+    )
+    if search_filters is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_FILTER_INVALID.value}
+        )
+
+    search_mode = nlp_controller.get_search_mode(search_mode=search_request.search_mode)
+    if search_mode is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_SEARCH_MODE_INVALID.value}
+        )
+
+    # server-sent events: the used documents first, then the tokens, then "done"
+    async def event_stream():
+        async for event, data in nlp_controller.astream_rag_answer(
+            project=project,
+            query=search_request.text,
+            limit=search_request.limit,
+            threshold=search_request.similarity_threshold,
+            filters=search_filters,
+            search_mode=search_mode,
+            use_rerank=search_request.use_rerank,
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@nlp_router.get("/embedding-cache/stats")
+async def get_embedding_cache_stats(request: Request):
+
+    if request.app.embedding_cache is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.EMBEDDING_CACHE_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.EMBEDDING_CACHE_STATS_RETRIEVED.value,
+            "stats": await request.app.embedding_cache.get_stats(),
+        }
+    )
+
+@nlp_router.post("/embedding-cache/evict")
+async def evict_embedding_cache(request: Request):
+
+    if request.app.embedding_cache is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.EMBEDDING_CACHE_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.EMBEDDING_CACHE_EVICTED.value,
+            **await request.app.embedding_cache.evict(),
+        }
+    )
+
+@nlp_router.get("/embedding-batcher/stats")
+async def get_embedding_batcher_stats(request: Request):
+
+    if request.app.embedding_batcher is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.EMBEDDING_BATCHER_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.EMBEDDING_BATCHER_STATS_RETRIEVED.value,
+            "stats": request.app.embedding_batcher.get_stats(),
+        }
+    )
+
+@nlp_router.get("/rerank/stats")
+async def get_rerank_stats(request: Request):
+
+    if request.app.rerank_client is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.RERANK_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.RERANK_STATS_RETRIEVED.value,
+            "score_cache": request.app.rerank_client.get_stats(),
+        }
+    )
+
+@nlp_router.get("/retrieval-cache/stats")
+async def get_retrieval_cache_stats(request: Request):
+
+    if request.app.retrieval_cache is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.RETRIEVAL_CACHE_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.RETRIEVAL_CACHE_STATS_RETRIEVED.value,
+            "stats": request.app.retrieval_cache.get_stats(),
+        }
+    )
+
+@nlp_router.get("/answer-cache/stats")
+async def get_answer_cache_stats(request: Request):
+
+    if request.app.answer_cache is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.ANSWER_CACHE_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.ANSWER_CACHE_STATS_RETRIEVED.value,
+            "stats": request.app.answer_cache.get_stats(),
+        }
+    )
+
+@nlp_router.get("/singleflight/stats")
+async def get_singleflight_stats(request: Request):
+
+    if request.app.singleflight is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.SINGLEFLIGHT_DISABLED.value}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.SINGLEFLIGHT_STATS_RETRIEVED.value,
+            "stats": request.app.singleflight.get_stats(),
+        }
+    )
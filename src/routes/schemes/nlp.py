@@ -1,11 +1,42 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Any
 
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
 
+class SearchFilter(BaseModel):
+    field: str                     # chunk_id, asset_id or metadata.<indexed field>
+    op: Optional[str] = "eq"       # eq | in | gt | gte | lt | lte
+    value: Any
+
 class SearchRequest(BaseModel):
     text: str
     limit: Optional[int] = 20
     similarity_threshold: Optional[float] = None  # <--- threshold in [0..1]
     use_rerank: Optional[bool] = False           # <--- optional re-rank flag
+    filters: Optional[List[SearchFilter]] = None  # <--- all must match
+    search_mode: Optional[str] = None             # <--- dense | lexical | hybrid
+
+class BatchSearchRequest(BaseModel):
+    texts: List[str]                              # <--- one result list per text
+    limit: Optional[int] = 20
+    similarity_threshold: Optional[float] = None
+    use_rerank: Optional[bool] = False
+    filters: Optional[List[SearchFilter]] = None  # <--- shared by all the texts
+    search_mode: Optional[str] = None
+
+class CollectionConfigRequest(BaseModel):
+    quantization: Optional[str] = None             # scalar | binary
+    quantization_always_ram: Optional[bool] = None
+    on_disk: Optional[bool] = None
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+
+class SearchConfigRequest(BaseModel):
+    hnsw_ef: Optional[int] = None
+    rescore: Optional[bool] = None
+    oversampling: Optional[float] = None
+
+class IndexConfigRequest(BaseModel):
+    collection: Optional[CollectionConfigRequest] = None
+    search: Optional[SearchConfigRequest] = None
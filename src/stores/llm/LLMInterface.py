@@ -2,6 +2,18 @@ from abc import ABC, abstractmethod
 
 class LLMInterface(ABC):
 
+    @abstractmethod
+    def connect(self):
+        pass
+
+    @abstractmethod
+    def disconnect(self):
+        pass
+
+    @abstractmethod
+    async def adisconnect(self):
+        pass
+
     @abstractmethod
     def set_generation_model(self, model_id: str):
         pass
@@ -19,6 +31,33 @@ class LLMInterface(ABC):
     def embed_text(self, text: str, document_type: str = None):
         pass
 
+    @abstractmethod
+    def embed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        pass
+
+    @abstractmethod
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                                   temperature: float = None):
+        pass
+
+    @abstractmethod
+    async def astream_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                                 temperature: float = None):
+        pass
+
+    @abstractmethod
+    async def aembed_text(self, text: str, document_type: str = None):
+        pass
+
+    @abstractmethod
+    async def aembed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        pass
+
     @abstractmethod
     def construct_prompt(self, prompt: str, role: str):
         pass
+
+    @abstractmethod
+    def add_user_prompt(self, prompt: str, chat_history: list):
+        # chat_history as the generate calls leave it, for answers served without one
+        pass
@@ -12,7 +12,11 @@ class LLMProviderFactory:
                 api_url=self.config.OPENAI_API_URL,
                 default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                http_timeout=self.config.LLM_HTTP_TIMEOUT,
+                http_max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                http_max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                http_keepalive_expiry=self.config.LLM_HTTP_KEEPALIVE_EXPIRY,
             )
 
         if provider == LLMEnums.COHERE.value:
@@ -20,7 +24,11 @@ class LLMProviderFactory:
                 api_key=self.config.COHERE_API_KEY,
                 default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                http_timeout=self.config.LLM_HTTP_TIMEOUT,
+                http_max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                http_max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                http_keepalive_expiry=self.config.LLM_HTTP_KEEPALIVE_EXPIRY,
             )
 
         if provider == LLMEnums.DEEPSEEK.value:
@@ -29,7 +37,11 @@ class LLMProviderFactory:
                 api_url=self.config.DEEPSEEK_API_URL,  
                 default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                http_timeout=self.config.LLM_HTTP_TIMEOUT,
+                http_max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                http_max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                http_keepalive_expiry=self.config.LLM_HTTP_KEEPALIVE_EXPIRY,
             )
 
         return None
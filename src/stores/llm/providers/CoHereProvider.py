@@ -1,6 +1,7 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import CoHereEnums, DocumentTypeEnum
 import cohere
+import httpx
 import logging
 
 class CoHereProvider(LLMInterface):
@@ -8,7 +9,11 @@ class CoHereProvider(LLMInterface):
     def __init__(self, api_key: str,
                        default_input_max_characters: int=1000,
                        default_generation_max_output_tokens: int=1000,
-                       default_generation_temperature: float=0.1):
+                       default_generation_temperature: float=0.1,
+                       http_timeout: float=60.0,
+                       http_max_connections: int=100,
+                       http_max_keepalive_connections: int=20,
+                       http_keepalive_expiry: float=30.0):
         
         self.api_key = api_key
 
@@ -21,11 +26,64 @@ class CoHereProvider(LLMInterface):
         self.embedding_model_id = None
         self.embedding_size = None
 
-        self.client = cohere.Client(api_key=self.api_key)
+        # Max number of texts the embed endpoint accepts in one request
+        self.max_embedding_batch_size = 96
+
+        self.http_timeout = http_timeout
+        self.http_limits = httpx.Limits(
+            max_connections=http_max_connections,
+            max_keepalive_connections=http_max_keepalive_connections,
+            keepalive_expiry=http_keepalive_expiry,
+        )
+
+        # long-lived client over a keep-alive pool, created in connect()
+        self.http_client = None
+        self.client = None
+
+        # async counterpart used by the request path
+        self.async_http_client = None
+        self.async_client = None
 
         self.enums = CoHereEnums
         self.logger = logging.getLogger(__name__)
 
+    def connect(self):
+        self.http_client = httpx.Client(
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+        self.client = cohere.Client(
+            api_key=self.api_key,
+            timeout=self.http_timeout,
+            httpx_client=self.http_client,
+        )
+
+        self.async_http_client = httpx.AsyncClient(
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+        self.async_client = cohere.AsyncClient(
+            api_key=self.api_key,
+            timeout=self.http_timeout,
+            httpx_client=self.async_http_client,
+        )
+
+    def disconnect(self):
+        if self.http_client:
+            self.http_client.close()
+
+        self.http_client = None
+        self.client = None
+
+    async def adisconnect(self):
+        if self.async_http_client:
+            await self.async_http_client.aclose()
+
+        self.async_http_client = None
+        self.async_client = None
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
@@ -50,13 +108,17 @@ class CoHereProvider(LLMInterface):
         max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
         temperature = temperature if temperature else self.default_generation_temperature
 
-        response = self.client.chat(
-            model = self.generation_model_id,
-            chat_history = chat_history,
-            message = self.process_text(prompt),
-            temperature = temperature,
-            max_tokens = max_output_tokens
-        )
+        try:
+            response = self.client.chat(
+                model = self.generation_model_id,
+                chat_history = chat_history,
+                message = self.process_text(prompt),
+                temperature = temperature,
+                max_tokens = max_output_tokens
+            )
+        except Exception as e:
+            self.logger.error(f"Error while generating text with CoHere: {e}")
+            return None
 
         if not response or not response.text:
             self.logger.error("Error while generating text with CoHere")
@@ -77,21 +139,178 @@ class CoHereProvider(LLMInterface):
         if document_type == DocumentTypeEnum.QUERY:
             input_type = CoHereEnums.QUERY
 
-        response = self.client.embed(
-            model = self.embedding_model_id,
-            texts = [self.process_text(text)],
-            input_type = input_type,
-            embedding_types=['float'],
-        )
+        try:
+            response = self.client.embed(
+                model = self.embedding_model_id,
+                texts = [self.process_text(text)],
+                input_type = input_type,
+                embedding_types=['float'],
+            )
+        except Exception as e:
+            self.logger.error(f"Error while embedding text with CoHere: {e}")
+            return None
 
         if not response or not response.embeddings or not response.embeddings.float:
             self.logger.error("Error while embedding text with CoHere")
             return None
         
         return response.embeddings.float[0]
+
+    def embed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not self.client:
+            self.logger.error("CoHere client was not set")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for CoHere was not set")
+            return None
+
+        input_type = CoHereEnums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = CoHereEnums.QUERY.value
+
+        batch_size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+
+            try:
+                response = self.client.embed(
+                    model = self.embedding_model_id,
+                    texts = [self.process_text(text) for text in batch_texts],
+                    input_type = input_type,
+                    embedding_types=['float'],
+                    batching=False,
+                )
+            except Exception as e:
+                self.logger.error(f"Error while embedding texts with CoHere: {e}")
+                return None
+
+            if not response or not response.embeddings or not response.embeddings.float \
+                    or len(response.embeddings.float) != len(batch_texts):
+                self.logger.error("Error while embedding texts with CoHere")
+                return None
+
+            vectors.extend(response.embeddings.float)
+
+        return vectors
+
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                                   temperature: float = None):
+
+        if not self.async_client:
+            self.logger.error("CoHere async client was not set")
+            return None
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return None
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature else self.default_generation_temperature
+
+        try:
+            response = await self.async_client.chat(
+                model = self.generation_model_id,
+                chat_history = chat_history,
+                message = self.process_text(prompt),
+                temperature = temperature,
+                max_tokens = max_output_tokens
+            )
+        except Exception as e:
+            self.logger.error(f"Error while generating text with CoHere: {e}")
+            return None
+
+        if not response or not response.text:
+            self.logger.error("Error while generating text with CoHere")
+            return None
+
+        return response.text
+
+    async def astream_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                                 temperature: float = None):
+
+        if not self.async_client:
+            self.logger.error("CoHere async client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature else self.default_generation_temperature
+
+        try:
+            async for event in self.async_client.chat_stream(
+                model = self.generation_model_id,
+                chat_history = chat_history,
+                message = self.process_text(prompt),
+                temperature = temperature,
+                max_tokens = max_output_tokens
+            ):
+                if event.event_type == "text-generation" and event.text:
+                    yield event.text
+
+        except Exception as e:
+            self.logger.error(f"Error while streaming text with CoHere: {e}")
+            return
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_texts(texts=[text], document_type=document_type)
+        if not vectors:
+            return None
+
+        return vectors[0]
+
+    async def aembed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not self.async_client:
+            self.logger.error("CoHere async client was not set")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for CoHere was not set")
+            return None
+
+        input_type = CoHereEnums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = CoHereEnums.QUERY.value
+
+        batch_size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+
+            try:
+                response = await self.async_client.embed(
+                    model = self.embedding_model_id,
+                    texts = [self.process_text(text) for text in batch_texts],
+                    input_type = input_type,
+                    embedding_types=['float'],
+                    batching=False,
+                )
+            except Exception as e:
+                self.logger.error(f"Error while embedding texts with CoHere: {e}")
+                return None
+
+            if not response or not response.embeddings or not response.embeddings.float \
+                    or len(response.embeddings.float) != len(batch_texts):
+                self.logger.error("Error while embedding texts with CoHere")
+                return None
+
+            vectors.extend(response.embeddings.float)
+
+        return vectors
     
     def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
             "text": prompt,
-        }
\ No newline at end of file
+        }
+
+    def add_user_prompt(self, prompt: str, chat_history: list):
+        # the prompt goes as the chat message, never into the history
+        return chat_history
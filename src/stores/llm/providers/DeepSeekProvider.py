@@ -1,4 +1,5 @@
-import requests
+import httpx
+import json
 import logging
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import DeepSeekEnums  
@@ -8,7 +9,11 @@ class DeepSeekProvider(LLMInterface):
     def __init__(self, api_key: str, api_url: str = "https://api.deepseek.com/v1",
                  default_input_max_characters: int = 1000,
                  default_generation_max_output_tokens: int = 1000,
-                 default_generation_temperature: float = 0.1):
+                 default_generation_temperature: float = 0.1,
+                 http_timeout: float = 60.0,
+                 http_max_connections: int = 100,
+                 http_max_keepalive_connections: int = 20,
+                 http_keepalive_expiry: float = 30.0):
         
         self.api_key = api_key
         self.api_url = api_url
@@ -21,8 +26,55 @@ class DeepSeekProvider(LLMInterface):
         self.embedding_model_id = None
         self.embedding_size = None
 
+        # Max number of inputs sent to the embeddings endpoint in one request
+        self.max_embedding_batch_size = 256
+
+        self.http_timeout = http_timeout
+        self.http_limits = httpx.Limits(
+            max_connections=http_max_connections,
+            max_keepalive_connections=http_max_keepalive_connections,
+            keepalive_expiry=http_keepalive_expiry,
+        )
+
+        # long-lived clients over a keep-alive pool, created in connect()
+        self.client = None
+        self.async_client = None
+
         self.logger = logging.getLogger(__name__)
 
+    def get_headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def connect(self):
+        self.client = httpx.Client(
+            base_url=self.api_url,
+            headers=self.get_headers(),
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+        self.async_client = httpx.AsyncClient(
+            base_url=self.api_url,
+            headers=self.get_headers(),
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+    def disconnect(self):
+        if self.client:
+            self.client.close()
+
+        self.client = None
+
+    async def adisconnect(self):
+        if self.async_client:
+            await self.async_client.aclose()
+
+        self.async_client = None
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
@@ -52,12 +104,14 @@ class DeepSeekProvider(LLMInterface):
             "temperature": temperature
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        if not self.client:
+            self.connect()
 
-        response = requests.post(f"{self.api_url}/chat/completions", json=payload, headers=headers)
+        try:
+            response = self.client.post("/chat/completions", json=payload)
+        except Exception as e:
+            self.logger.error(f"Error while generating text with DeepSeek: {e}")
+            return None
 
         if response.status_code != 200:
             self.logger.error(f"Error while generating text with DeepSeek: {response.text}")
@@ -77,12 +131,14 @@ class DeepSeekProvider(LLMInterface):
             "input": text
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        if not self.client:
+            self.connect()
 
-        response = requests.post(f"{self.api_url}/embeddings", json=payload, headers=headers)
+        try:
+            response = self.client.post("/embeddings", json=payload)
+        except Exception as e:
+            self.logger.error(f"Error while embedding text with DeepSeek: {e}")
+            return None
 
         if response.status_code != 200:
             self.logger.error(f"Error while embedding text with DeepSeek: {response.text}")
@@ -91,8 +147,192 @@ class DeepSeekProvider(LLMInterface):
         result = response.json()
         return result.get("data", [{}])[0].get("embedding", None)
 
+    def embed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for DeepSeek was not set")
+            return None
+
+        if not self.client:
+            self.connect()
+
+        batch_size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+
+            payload = {
+                "model": self.embedding_model_id,
+                "input": batch_texts
+            }
+
+            try:
+                response = self.client.post("/embeddings", json=payload)
+            except Exception as e:
+                self.logger.error(f"Error while embedding texts with DeepSeek: {e}")
+                return None
+
+            if response.status_code != 200:
+                self.logger.error(f"Error while embedding texts with DeepSeek: {response.text}")
+                return None
+
+            data = response.json().get("data", [])
+            if len(data) != len(batch_texts):
+                self.logger.error("Error while embedding texts with DeepSeek (no valid response).")
+                return None
+
+            vectors.extend([
+                record.get("embedding")
+                for record in sorted(data, key=lambda record: record.get("index", 0))
+            ])
+
+        return vectors
+
+    async def agenerate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+                             temperature: float = None):
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for DeepSeek was not set")
+            return None
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        temperature = temperature or self.default_generation_temperature
+
+        chat_history.append(self.construct_prompt(prompt=prompt, role=DeepSeekEnums.USER.value))
+
+        payload = {
+            "model": self.generation_model_id,
+            "messages": chat_history,
+            "max_tokens": max_output_tokens,
+            "temperature": temperature
+        }
+
+        if not self.async_client:
+            self.connect()
+
+        try:
+            response = await self.async_client.post("/chat/completions", json=payload)
+        except Exception as e:
+            self.logger.error(f"Error while generating text with DeepSeek: {e}")
+            return None
+
+        if response.status_code != 200:
+            self.logger.error(f"Error while generating text with DeepSeek: {response.text}")
+            return None
+
+        result = response.json()
+        return result.get("choices", [{}])[0].get("message", {}).get("content", None)
+
+    async def astream_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+                           temperature: float = None):
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for DeepSeek was not set")
+            return
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        temperature = temperature or self.default_generation_temperature
+
+        chat_history.append(self.construct_prompt(prompt=prompt, role=DeepSeekEnums.USER.value))
+
+        payload = {
+            "model": self.generation_model_id,
+            "messages": chat_history,
+            "max_tokens": max_output_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+
+        if not self.async_client:
+            self.connect()
+
+        # a failure ends the stream, the caller sees the tokens it already got
+        try:
+            async with self.async_client.stream("POST", "/chat/completions", json=payload) as response:
+
+                if response.status_code != 200:
+                    await response.aread()
+                    self.logger.error(f"Error while streaming text with DeepSeek: {response.text}")
+                    return
+
+                # server-sent events: "data: {...}" lines, closed by "data: [DONE]"
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+
+                    try:
+                        result = json.loads(data)
+                    except json.JSONDecodeError:
+                        self.logger.error(f"Invalid stream chunk from DeepSeek: {data}")
+                        continue
+
+                    content = result.get("choices", [{}])[0].get("delta", {}).get("content", None)
+                    if content:
+                        yield content
+        except Exception as e:
+            self.logger.error(f"Error while streaming text with DeepSeek: {e}")
+            return
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_texts(texts=[text], document_type=document_type)
+        if not vectors:
+            return None
+
+        return vectors[0]
+
+    async def aembed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for DeepSeek was not set")
+            return None
+
+        if not self.async_client:
+            self.connect()
+
+        batch_size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+
+            payload = {
+                "model": self.embedding_model_id,
+                "input": batch_texts
+            }
+
+            try:
+                response = await self.async_client.post("/embeddings", json=payload)
+            except Exception as e:
+                self.logger.error(f"Error while embedding texts with DeepSeek: {e}")
+                return None
+
+            if response.status_code != 200:
+                self.logger.error(f"Error while embedding texts with DeepSeek: {response.text}")
+                return None
+
+            data = response.json().get("data", [])
+            if len(data) != len(batch_texts):
+                self.logger.error("Error while embedding texts with DeepSeek (no valid response).")
+                return None
+
+            vectors.extend([
+                record.get("embedding")
+                for record in sorted(data, key=lambda record: record.get("index", 0))
+            ])
+
+        return vectors
+
     def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
             "content": prompt,
         }
+
+    def add_user_prompt(self, prompt: str, chat_history: list):
+        chat_history.append(self.construct_prompt(prompt=prompt, role=DeepSeekEnums.USER.value))
+        return chat_history
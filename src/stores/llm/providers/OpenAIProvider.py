@@ -1,6 +1,7 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import OpenAIEnums
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import httpx
 import logging
 import math
 
@@ -12,7 +13,11 @@ class OpenAIProvider(LLMInterface):
         api_url: str = None,
         default_input_max_characters: int = 1000,
         default_generation_max_output_tokens: int = 1000,
-        default_generation_temperature: float = 0.1
+        default_generation_temperature: float = 0.1,
+        http_timeout: float = 60.0,
+        http_max_connections: int = 100,
+        http_max_keepalive_connections: int = 20,
+        http_keepalive_expiry: float = 30.0
     ):
         self.api_key = api_key
 
@@ -30,12 +35,116 @@ class OpenAIProvider(LLMInterface):
         self.embedding_model_id = None
         self.embedding_size = None
 
-        # We will initialize the client as None; we set base_url in each method via if–else.
-        self.client = None
+        # Max number of inputs the embeddings endpoint accepts in one request
+        self.max_embedding_batch_size = 2048
+
+        self.http_timeout = http_timeout
+        self.http_limits = httpx.Limits(
+            max_connections=http_max_connections,
+            max_keepalive_connections=http_max_keepalive_connections,
+            keepalive_expiry=http_keepalive_expiry,
+        )
+
+        # One long-lived client per base URL, all sharing the same keep-alive pool.
+        # They are created in connect() and picked per call with get_client().
+        self.http_client = None
+        self.clients = {}
+
+        # Same layout for the async clients used by the request path
+        self.async_http_client = None
+        self.async_clients = {}
 
         self.enums = OpenAIEnums
         self.logger = logging.getLogger(__name__)
 
+    def connect(self):
+        self.connect_sync()
+        self.connect_async()
+
+    def connect_sync(self):
+        # built once, a second call keeps the existing pool
+        if self.http_client is not None:
+            return
+
+        self.http_client = httpx.Client(
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+        for base_url in [self.openai_official_url, self.ollama_base_url]:
+            if base_url and base_url not in self.clients:
+                self.clients[base_url] = OpenAI(
+                    api_key=self.api_key,
+                    base_url=base_url,
+                    http_client=self.http_client,
+                )
+
+    def connect_async(self):
+        if self.async_http_client is not None:
+            return
+
+        self.async_http_client = httpx.AsyncClient(
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+        for base_url in [self.openai_official_url, self.ollama_base_url]:
+            if base_url and base_url not in self.async_clients:
+                self.async_clients[base_url] = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=base_url,
+                    http_client=self.async_http_client,
+                )
+
+    def disconnect(self):
+        if self.http_client:
+            self.http_client.close()
+
+        self.http_client = None
+        self.clients = {}
+
+    async def adisconnect(self):
+        if self.async_http_client:
+            await self.async_http_client.aclose()
+
+        self.async_http_client = None
+        self.async_clients = {}
+
+    def get_client(self, base_url: str):
+        if not self.clients:
+            self.connect_sync()
+
+        client = self.clients.get(base_url)
+        if not client:
+            self.logger.error(f"No OpenAI client for base url: {base_url}")
+
+        return client
+
+    def get_async_client(self, base_url: str):
+        if not self.async_clients:
+            self.connect_async()
+
+        client = self.async_clients.get(base_url)
+        if not client:
+            self.logger.error(f"No async OpenAI client for base url: {base_url}")
+
+        return client
+
+    def get_generation_base_url(self):
+        # official if model starts with "gpt", else local
+        if self.generation_model_id.startswith("gpt"):
+            return self.openai_official_url
+
+        # without OPENAI_API_URL every model goes to the official API
+        return self.ollama_base_url or self.openai_official_url
+
+    def get_embedding_base_url(self):
+        # Adjust as needed, e.g., if "text-embedding-ada" or "ada" in self.embedding_model_id => official, else local
+        if self.embedding_model_id.startswith("gpt") or "ada" in self.embedding_model_id.lower():
+            return self.openai_official_url
+
+        return self.ollama_base_url or self.openai_official_url
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
@@ -57,14 +166,9 @@ class OpenAIProvider(LLMInterface):
             self.logger.error("Generation model for OpenAI was not set")
             return None
 
-        # Decide which base URL to use (official if model starts with "gpt", else local)
-        if self.generation_model_id.startswith("gpt"):
-            base_url = self.openai_official_url
-        else:
-            base_url = self.ollama_base_url
-
-        # Create the client with appropriate base_url
-        self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+        client = self.get_client(self.get_generation_base_url())
+        if not client:
+            return None
 
         max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
         temperature = temperature or self.default_generation_temperature
@@ -72,7 +176,7 @@ class OpenAIProvider(LLMInterface):
         chat_history.append(self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value))
 
         try:
-            response = self.client.chat.completions.create(
+            response = client.chat.completions.create(
                 model=self.generation_model_id,
                 messages=chat_history,
                 max_tokens=max_output_tokens,
@@ -93,17 +197,12 @@ class OpenAIProvider(LLMInterface):
             self.logger.error("Embedding model for OpenAI was not set")
             return None
 
-        # Decide which base URL to use (example: if it starts with "gpt", use official)
-        # Adjust as needed, e.g., if "text-embedding-ada" or "ada" in self.embedding_model_id => official, else local
-        if self.embedding_model_id.startswith("gpt") or "ada" in self.embedding_model_id.lower():
-            base_url = self.openai_official_url
-        else:
-            base_url = self.ollama_base_url
-
-        self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+        client = self.get_client(self.get_embedding_base_url())
+        if not client:
+            return None
 
         try:
-            response = self.client.embeddings.create(
+            response = client.embeddings.create(
                 model=self.embedding_model_id,
                 input=text
             )
@@ -117,8 +216,167 @@ class OpenAIProvider(LLMInterface):
 
         return response.data[0].embedding
 
+    def embed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for OpenAI was not set")
+            return None
+
+        client = self.get_client(self.get_embedding_base_url())
+        if not client:
+            return None
+
+        batch_size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+
+            try:
+                response = client.embeddings.create(
+                    model=self.embedding_model_id,
+                    input=batch_texts
+                )
+            except Exception as e:
+                self.logger.error(f"Error while calling embed_texts: {e}")
+                return None
+
+            if not response or not response.data or len(response.data) != len(batch_texts):
+                self.logger.error("Error while embedding texts (no valid response).")
+                return None
+
+            # the API does not promise to keep the input order, "index" does
+            vectors.extend([
+                record.embedding
+                for record in sorted(response.data, key=lambda record: record.index)
+            ])
+
+        return vectors
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        chat_history: list = [],
+        max_output_tokens: int = None,
+        temperature: float = None
+    ):
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI was not set")
+            return None
+
+        client = self.get_async_client(self.get_generation_base_url())
+        if not client:
+            return None
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        temperature = temperature or self.default_generation_temperature
+
+        chat_history.append(self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value))
+
+        try:
+            response = await client.chat.completions.create(
+                model=self.generation_model_id,
+                messages=chat_history,
+                max_tokens=max_output_tokens,
+                temperature=temperature
+            )
+        except Exception as e:
+            self.logger.error(f"Error while calling agenerate_text: {e}")
+            return None
+
+        if not response or not response.choices or not response.choices[0].message:
+            self.logger.error("Error while generating text (no valid response).")
+            return None
+
+        return response.choices[0].message.content
+
+    async def astream_text(
+        self,
+        prompt: str,
+        chat_history: list = [],
+        max_output_tokens: int = None,
+        temperature: float = None
+    ):
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI was not set")
+            return
+
+        client = self.get_async_client(self.get_generation_base_url())
+        if not client:
+            return
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        temperature = temperature or self.default_generation_temperature
+
+        chat_history.append(self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value))
+
+        try:
+            stream = await client.chat.completions.create(
+                model=self.generation_model_id,
+                messages=chat_history,
+                max_tokens=max_output_tokens,
+                temperature=temperature,
+                stream=True
+            )
+
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta:
+                    continue
+
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            self.logger.error(f"Error while calling astream_text: {e}")
+            return
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_texts(texts=[text], document_type=document_type)
+        if not vectors:
+            return None
+
+        return vectors[0]
+
+    async def aembed_texts(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for OpenAI was not set")
+            return None
+
+        client = self.get_async_client(self.get_embedding_base_url())
+        if not client:
+            return None
+
+        batch_size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+
+            try:
+                response = await client.embeddings.create(
+                    model=self.embedding_model_id,
+                    input=batch_texts
+                )
+            except Exception as e:
+                self.logger.error(f"Error while calling aembed_texts: {e}")
+                return None
+
+            if not response or not response.data or len(response.data) != len(batch_texts):
+                self.logger.error("Error while embedding texts (no valid response).")
+                return None
+
+            vectors.extend([
+                record.embedding
+                for record in sorted(response.data, key=lambda record: record.index)
+            ])
+
+        return vectors
+
     def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
             "content": prompt,
         }
+
+    def add_user_prompt(self, prompt: str, chat_history: list):
+        chat_history.append(self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value))
+        return chat_history
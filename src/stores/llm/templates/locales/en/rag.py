@@ -6,7 +6,7 @@ system_prompt = Template(
     "\n".join([
         "You are an AI assistant providing fact-based responses using retrieved documents.",
         "Your goal is to generate a clear, structured report comparing the political opinions found in the provided documents. Assume the reader is generally aware of the broader context, so focus on analyzing and contrasting viewpoints rather than recounting the full background.",
-        "$context",
+        context,
         "",
         "### **How to Respond:**",
         "- **Prioritize a comparative approach** to the political opinions, arguments, suggestions, or viewpoints presented by the authors. Organize these opinions in a way that highlights similarities, differences, and any notable trends.",
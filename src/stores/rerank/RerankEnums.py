@@ -0,0 +1,6 @@
+from enum import Enum
+
+class RerankEnums(Enum):
+    COHERE = "COHERE"
+    CROSS_ENCODER = "CROSS_ENCODER"
+    LEXICAL = "LEXICAL"   # deterministic term overlap, no model needed
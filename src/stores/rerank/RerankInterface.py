@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from models.db_schemes import RetrievedDocument
+from typing import List
+import asyncio
+
+class RerankInterface(ABC):
+
+    @abstractmethod
+    def connect(self):
+        pass
+
+    @abstractmethod
+    def disconnect(self):
+        pass
+
+    @abstractmethod
+    async def adisconnect(self):
+        pass
+
+    @abstractmethod
+    async def ascore_texts(self, query: str, texts: list):
+        """
+        Relevance of each text to the query, in input order, or None on error.
+        """
+        pass
+
+    def get_cache_key(self, query: str, document: RetrievedDocument):
+        # chunk ids are never reused, a re-processed chunk gets a new one
+        return query, document.chunk_id if document.chunk_id is not None else document.text
+
+    async def arerank(self, query: str, documents: List[RetrievedDocument], top_k: int = None):
+        """
+        Reorder the documents by relevance to the query and keep the top_k.
+
+        Only the first max_candidates documents are scored, in concurrent
+        batches of batch_size, and only the (query, chunk) pairs missing from
+        the score cache are sent to the model. The document scores become the
+        rerank scores; the documents past max_candidates follow the reranked
+        ones in their retrieval order, with their retrieval scores. Returns
+        None if a batch could not be scored.
+        """
+        candidates = documents[:self.max_candidates]
+        cache_keys = [self.get_cache_key(query=query, document=doc) for doc in candidates]
+        scores = [self.score_cache.get(cache_key) for cache_key in cache_keys]
+
+        missed = [i for i, score in enumerate(scores) if score is None]
+        batches = [missed[i:i + self.batch_size] for i in range(0, len(missed), self.batch_size)]
+
+        batch_scores = await asyncio.gather(*[
+            self.ascore_texts(query=query, texts=[candidates[i].text for i in batch])
+            for batch in batches
+        ])
+
+        for batch, new_scores in zip(batches, batch_scores):
+            if new_scores is None or len(new_scores) != len(batch):
+                return None
+
+            for i, score in zip(batch, new_scores):
+                scores[i] = float(score)
+                self.score_cache.set(cache_keys[i], scores[i])
+
+        ranked = sorted(zip(candidates, scores), key=lambda item: item[1], reverse=True)
+
+        reranked = [
+            RetrievedDocument(text=doc.text, score=score, chunk_id=doc.chunk_id)
+            for doc, score in ranked
+        ]
+
+        return (reranked + documents[self.max_candidates:])[:top_k]
+
+    def get_stats(self):
+        return self.score_cache.get_stats()
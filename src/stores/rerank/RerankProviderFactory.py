@@ -0,0 +1,37 @@
+from .RerankEnums import RerankEnums
+from .providers import CoHereRerankProvider, CrossEncoderRerankProvider, LexicalRerankProvider
+
+class RerankProviderFactory:
+    def __init__(self, config: dict):
+        self.config = config
+
+    def create(self, provider: str):
+        if provider == RerankEnums.COHERE.value:
+            return CoHereRerankProvider(
+                api_key=self.config.COHERE_API_KEY,
+                model_id=self.config.RERANK_MODEL_ID,
+                batch_size=self.config.RERANK_BATCH_SIZE,
+                max_candidates=self.config.RERANK_MAX_CANDIDATES,
+                cache_size=self.config.RERANK_CACHE_SIZE,
+                http_timeout=self.config.LLM_HTTP_TIMEOUT,
+                http_max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                http_max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                http_keepalive_expiry=self.config.LLM_HTTP_KEEPALIVE_EXPIRY,
+            )
+
+        if provider == RerankEnums.CROSS_ENCODER.value:
+            return CrossEncoderRerankProvider(
+                model_id=self.config.RERANK_MODEL_ID,
+                batch_size=self.config.RERANK_BATCH_SIZE,
+                max_candidates=self.config.RERANK_MAX_CANDIDATES,
+                cache_size=self.config.RERANK_CACHE_SIZE,
+            )
+
+        if provider == RerankEnums.LEXICAL.value:
+            return LexicalRerankProvider(
+                batch_size=self.config.RERANK_BATCH_SIZE,
+                max_candidates=self.config.RERANK_MAX_CANDIDATES,
+                cache_size=self.config.RERANK_CACHE_SIZE,
+            )
+
+        return None
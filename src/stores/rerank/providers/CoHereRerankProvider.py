@@ -0,0 +1,91 @@
+from ..RerankInterface import RerankInterface
+from helpers.lru_cache import LRUCache
+import cohere
+import httpx
+import logging
+
+class CoHereRerankProvider(RerankInterface):
+
+    default_model_id = "rerank-multilingual-v3.0"
+
+    # max number of documents the rerank endpoint accepts in one request
+    max_batch_size = 1000
+
+    def __init__(self, api_key: str, model_id: str = None,
+                       batch_size: int = 100,
+                       max_candidates: int = 50,
+                       cache_size: int = 10000,
+                       http_timeout: float = 60.0,
+                       http_max_connections: int = 100,
+                       http_max_keepalive_connections: int = 20,
+                       http_keepalive_expiry: float = 30.0):
+
+        self.api_key = api_key
+        self.model_id = model_id or self.default_model_id
+
+        self.batch_size = min(batch_size, self.max_batch_size)
+        self.max_candidates = max_candidates
+        self.score_cache = LRUCache(max_entries=cache_size)
+
+        self.http_timeout = http_timeout
+        self.http_limits = httpx.Limits(
+            max_connections=http_max_connections,
+            max_keepalive_connections=http_max_keepalive_connections,
+            keepalive_expiry=http_keepalive_expiry,
+        )
+
+        # long-lived async client over a keep-alive pool, created in connect()
+        self.async_http_client = None
+        self.async_client = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        self.async_http_client = httpx.AsyncClient(
+            limits=self.http_limits,
+            timeout=self.http_timeout,
+        )
+
+        self.async_client = cohere.AsyncClient(
+            api_key=self.api_key,
+            timeout=self.http_timeout,
+            httpx_client=self.async_http_client,
+        )
+
+    def disconnect(self):
+        pass
+
+    async def adisconnect(self):
+        if self.async_http_client:
+            await self.async_http_client.aclose()
+
+        self.async_http_client = None
+        self.async_client = None
+
+    async def ascore_texts(self, query: str, texts: list):
+        if not self.async_client:
+            self.logger.error("CoHere rerank client was not set")
+            return None
+
+        try:
+            response = await self.async_client.rerank(
+                model=self.model_id,
+                query=query,
+                documents=texts,
+                top_n=len(texts),
+                return_documents=False,
+            )
+        except Exception as e:
+            self.logger.error(f"Error while reranking with CoHere: {e}")
+            return None
+
+        if not response or not response.results or len(response.results) != len(texts):
+            self.logger.error("Error while reranking with CoHere")
+            return None
+
+        # results come sorted by relevance, put them back in input order
+        scores = [None] * len(texts)
+        for result in response.results:
+            scores[result.index] = result.relevance_score
+
+        return scores
@@ -0,0 +1,62 @@
+from ..RerankInterface import RerankInterface
+from helpers.lru_cache import LRUCache
+import asyncio
+import logging
+
+class CrossEncoderRerankProvider(RerankInterface):
+    """
+    Local cross-encoder on the CPU. Needs the optional sentence-transformers
+    package, which is imported on connect.
+    """
+
+    default_model_id = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+    def __init__(self, model_id: str = None,
+                       batch_size: int = 32,
+                       max_candidates: int = 50,
+                       cache_size: int = 10000,
+                       max_length: int = 512):
+
+        self.model_id = model_id or self.default_model_id
+
+        self.batch_size = batch_size
+        self.max_candidates = max_candidates
+        self.max_length = max_length
+        self.score_cache = LRUCache(max_entries=cache_size)
+
+        self.model = None
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            self.logger.error("sentence-transformers is required by the CROSS_ENCODER reranker")
+            return
+
+        self.model = CrossEncoder(self.model_id, max_length=self.max_length, device="cpu")
+
+    def disconnect(self):
+        self.model = None
+
+    async def adisconnect(self):
+        pass
+
+    async def ascore_texts(self, query: str, texts: list):
+        if not self.model:
+            self.logger.error("Cross-encoder model was not loaded")
+            return None
+
+        # the forward pass is CPU-bound, keep it off the event loop
+        try:
+            scores = await asyncio.to_thread(
+                self.model.predict,
+                [(query, text) for text in texts],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+        except Exception as e:
+            self.logger.error(f"Error while reranking with the cross-encoder: {e}")
+            return None
+
+        return [float(score) for score in scores]
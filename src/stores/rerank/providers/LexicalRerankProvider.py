@@ -0,0 +1,52 @@
+from ..RerankInterface import RerankInterface
+from helpers.lru_cache import LRUCache
+from collections import Counter
+import logging
+import re
+
+class LexicalRerankProvider(RerankInterface):
+    """
+    Scores a text by the query terms it contains, each term's count
+    saturated like in BM25. Deterministic and model-free: a stand-in for
+    the model rerankers in development and tests.
+    """
+
+    def __init__(self, batch_size: int = 100,
+                       max_candidates: int = 50,
+                       cache_size: int = 10000,
+                       k1: float = 1.2):
+
+        self.batch_size = batch_size
+        self.max_candidates = max_candidates
+        self.k1 = k1
+        self.score_cache = LRUCache(max_entries=cache_size)
+
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    async def adisconnect(self):
+        pass
+
+    def get_terms(self, text: str):
+        return re.findall(r"\w+", text.lower())
+
+    async def ascore_texts(self, query: str, texts: list):
+        query_terms = set(self.get_terms(query))
+        if not query_terms:
+            return [0.0] * len(texts)
+
+        scores = []
+        for text in texts:
+            term_counts = Counter(self.get_terms(text))
+            score = sum(
+                term_counts[term] / (term_counts[term] + self.k1)
+                for term in query_terms
+            )
+            scores.append(score / len(query_terms))
+
+        return scores
@@ -0,0 +1,3 @@
+from .CoHereRerankProvider import CoHereRerankProvider
+from .CrossEncoderRerankProvider import CrossEncoderRerankProvider
+from .LexicalRerankProvider import LexicalRerankProvider
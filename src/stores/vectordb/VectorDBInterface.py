@@ -1,9 +1,16 @@
 from abc import ABC, abstractmethod
 from typing import List
+from datetime import datetime
+import asyncio
 from models.db_schemes import RetrievedDocument
+from .VectorDBEnums import PayloadSchemaEnums, FilterOperatorEnums
 
 class VectorDBInterface(ABC):
 
+    # filterable payload fields (field -> PayloadSchemaEnums value), with a
+    # payload index where the provider has one; set by the providers
+    payload_schema = {}
+
     @abstractmethod
     def connect(self):
         pass
@@ -12,6 +19,10 @@ class VectorDBInterface(ABC):
     def disconnect(self):
         pass
 
+    async def adisconnect(self):
+        # only providers with a native async client have one to close
+        pass
+
     @abstractmethod
     def is_collection_existed(self, collection_name: str) -> bool:
         pass
@@ -31,7 +42,11 @@ class VectorDBInterface(ABC):
     @abstractmethod
     def create_collection(self, collection_name: str, 
                                 embedding_size: int,
-                                do_reset: bool = False):
+                                do_reset: bool = False,
+                                collection_config: dict = None):
+        # collection_config overrides the provider's collection options
+        # (quantization, on_disk, hnsw_m, hnsw_ef_construct); the ones a
+        # provider has no equivalent for are ignored
         pass
 
     @abstractmethod
@@ -43,10 +58,185 @@ class VectorDBInterface(ABC):
     @abstractmethod
     def insert_many(self, collection_name: str, texts: list, 
                           vectors: list, metadata: list = None, 
-                          record_ids: list = None, batch_size: int = 50):
+                          record_ids: list = None, batch_size: int = 50,
+                          asset_ids: list = None):
+        # record_ids are the chunk_ids; they and the asset_ids are stored as
+        # filterable payload next to the text and metadata
+        pass
+
+    @abstractmethod
+    def delete_by_ids(self, collection_name: str, record_ids: list):
+        pass
+
+    @abstractmethod
+    def list_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+        """
+        One page of the record ids of a collection: (record_ids, next_offset),
+        next_offset is None after the last page.
+        """
         pass
 
     @abstractmethod
-    def search_by_vector(self, collection_name: str, vector: list, limit: int) -> List[RetrievedDocument]:
+    def count_records(self, collection_name: str) -> int:
         pass
-    
\ No newline at end of file
+
+    @abstractmethod
+    def search_by_vector(self, collection_name: str, vector: list, limit: int,
+                         threshold: float = None, search_config: dict = None,
+                         filters: list = None) -> List[RetrievedDocument]:
+        # search_config overrides the provider's search options
+        # (hnsw_ef, rescore, oversampling), same rule as collection_config.
+        # filters (see prepare_filters) are applied inside the search.
+        pass
+
+    def coerce_payload_value(self, field_type: str, value):
+        if field_type == PayloadSchemaEnums.KEYWORD.value:
+            return str(value)
+
+        if field_type == PayloadSchemaEnums.INTEGER.value and not isinstance(value, bool):
+            return int(value)
+
+        if field_type == PayloadSchemaEnums.FLOAT.value and not isinstance(value, bool):
+            return float(value)
+
+        if field_type == PayloadSchemaEnums.BOOL.value and isinstance(value, bool):
+            return value
+
+        if field_type == PayloadSchemaEnums.DATETIME.value:
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+        raise ValueError(f"Invalid {field_type} value: {value}")
+
+    def prepare_filters(self, filters: list):
+        """
+        Check filter conditions ({"field", "op", "value"}, all of them must
+        match) against the payload schema and coerce their values to the field
+        types. Returns None if a condition is invalid.
+        """
+        range_operators = [
+            FilterOperatorEnums.GT.value, FilterOperatorEnums.GTE.value,
+            FilterOperatorEnums.LT.value, FilterOperatorEnums.LTE.value,
+        ]
+        ordered_types = [
+            PayloadSchemaEnums.INTEGER.value, PayloadSchemaEnums.FLOAT.value,
+            PayloadSchemaEnums.DATETIME.value,
+        ]
+
+        prepared_filters = []
+        for condition in filters or []:
+            field = condition.get("field")
+            operator = condition.get("op") or FilterOperatorEnums.EQ.value
+            value = condition.get("value")
+
+            field_type = self.payload_schema.get(field)
+            if field_type is None:
+                return None
+
+            if operator in range_operators and field_type not in ordered_types:
+                return None
+
+            try:
+                if operator == FilterOperatorEnums.IN.value:
+                    if not isinstance(value, list) or not value:
+                        return None
+                    value = [self.coerce_payload_value(field_type, v) for v in value]
+                elif operator == FilterOperatorEnums.EQ.value or operator in range_operators:
+                    value = self.coerce_payload_value(field_type, value)
+                else:
+                    return None
+            except (TypeError, ValueError):
+                return None
+
+            prepared_filters.append({"field": field, "op": operator, "value": value, "type": field_type})
+
+        return prepared_filters
+
+    async def asearch_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                                threshold: float = None, search_config: dict = None,
+                                filters: list = None) -> List[RetrievedDocument]:
+        # providers without a native async client keep the event loop free
+        # by running the blocking search on a worker thread
+        return await asyncio.to_thread(
+            self.search_by_vector,
+            collection_name=collection_name,
+            vector=vector,
+            limit=limit,
+            threshold=threshold,
+            search_config=search_config,
+            filters=filters,
+        )
+
+    def search_batch_by_vectors(self, collection_name: str, vectors: list, limit: int = 5,
+                                threshold: float = None, search_config: dict = None,
+                                filters: list = None) -> List[List[RetrievedDocument]]:
+        # one result list per vector; providers with a batch query override it
+        return [
+            self.search_by_vector(
+                collection_name=collection_name,
+                vector=vector,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            )
+            for vector in vectors
+        ]
+
+    async def asearch_batch_by_vectors(self, collection_name: str, vectors: list, limit: int = 5,
+                                       threshold: float = None, search_config: dict = None,
+                                       filters: list = None) -> List[List[RetrievedDocument]]:
+        return await asyncio.to_thread(
+            self.search_batch_by_vectors,
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+            threshold=threshold,
+            search_config=search_config,
+            filters=filters,
+        )
+
+    async def acreate_collection(self, collection_name: str, embedding_size: int,
+                                 do_reset: bool = False, collection_config: dict = None):
+        return await asyncio.to_thread(
+            self.create_collection,
+            collection_name=collection_name,
+            embedding_size=embedding_size,
+            do_reset=do_reset,
+            collection_config=collection_config,
+        )
+
+    async def ainsert_many(self, collection_name: str, texts: list,
+                           vectors: list, metadata: list = None,
+                           record_ids: list = None, batch_size: int = 50,
+                           asset_ids: list = None):
+        return await asyncio.to_thread(
+            self.insert_many,
+            collection_name=collection_name,
+            texts=texts,
+            vectors=vectors,
+            metadata=metadata,
+            record_ids=record_ids,
+            batch_size=batch_size,
+            asset_ids=asset_ids,
+        )
+
+    async def adelete_by_ids(self, collection_name: str, record_ids: list):
+        return await asyncio.to_thread(
+            self.delete_by_ids,
+            collection_name=collection_name,
+            record_ids=record_ids,
+        )
+
+    async def alist_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+        return await asyncio.to_thread(
+            self.list_record_ids,
+            collection_name=collection_name,
+            offset=offset,
+            limit=limit,
+        )
+
+    async def acount_records(self, collection_name: str) -> int:
+        return await asyncio.to_thread(
+            self.count_records,
+            collection_name=collection_name,
+        )
@@ -1,12 +1,25 @@
-from .providers import QdrantDBProvider
-from .VectorDBEnums import VectorDBEnums
+from .providers import QdrantDBProvider, PGVectorProvider, NumpyMemmapProvider
+from .VectorDBEnums import VectorDBEnums, PayloadSchemaEnums
 from controllers.BaseController import BaseController
 
 class VectorDBProviderFactory:
-    def __init__(self, config):
+    def __init__(self, config, db_engine=None):
         self.config = config
+        self.db_engine = db_engine
         self.base_controller = BaseController()
 
+    def get_payload_schema(self):
+        # chunk_id and asset_id, plus the metadata fields picked in the settings
+        return {
+            "chunk_id": PayloadSchemaEnums.INTEGER.value,
+            "asset_id": PayloadSchemaEnums.INTEGER.value,
+            **{
+                f"metadata.{field}": field_type
+                for field, field_type in self.config.VECTOR_DB_METADATA_INDEXES.items()
+                if field_type in [t.value for t in PayloadSchemaEnums]
+            },
+        }
+
     def create(self, provider: str):
         if provider == VectorDBEnums.QDRANT.value:
             db_path = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_PATH)
@@ -14,6 +27,55 @@ class VectorDBProviderFactory:
             return QdrantDBProvider(
                 db_path=db_path,
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                url=self.config.VECTOR_DB_URL,
+                grpc_port=self.config.VECTOR_DB_GRPC_PORT,
+                prefer_grpc=self.config.VECTOR_DB_PREFER_GRPC,
+                timeout=self.config.VECTOR_DB_TIMEOUT,
+                api_key=self.config.VECTOR_DB_API_KEY,
+                pool_size=self.config.VECTOR_DB_POOL_SIZE,
+                collection_config={
+                    "quantization": self.config.VECTOR_DB_QUANTIZATION,
+                    "quantization_always_ram": self.config.VECTOR_DB_QUANTIZATION_ALWAYS_RAM,
+                    "on_disk": self.config.VECTOR_DB_ON_DISK,
+                    "hnsw_m": self.config.VECTOR_DB_HNSW_M,
+                    "hnsw_ef_construct": self.config.VECTOR_DB_HNSW_EF_CONSTRUCT,
+                },
+                search_config={
+                    "hnsw_ef": self.config.VECTOR_DB_SEARCH_HNSW_EF,
+                    "rescore": self.config.VECTOR_DB_SEARCH_RESCORE,
+                    "oversampling": self.config.VECTOR_DB_SEARCH_OVERSAMPLING,
+                },
+                payload_schema=self.get_payload_schema(),
+            )
+
+        if provider == VectorDBEnums.PGVECTOR.value:
+            sync_db_url = (
+                f"postgresql+psycopg2://{self.config.POSTGRES_USERNAME}:{self.config.POSTGRES_PASSWORD}"
+                f"@{self.config.POSTGRES_HOST}:{self.config.POSTGRES_PORT}/{self.config.POSTGRES_MAIN_DATABASE}"
+            )
+
+            return PGVectorProvider(
+                db_engine=self.db_engine,
+                sync_db_url=sync_db_url,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                index_type=self.config.PGVECTOR_INDEX_TYPE,
+                hnsw_m=self.config.PGVECTOR_HNSW_M,
+                hnsw_ef_construction=self.config.PGVECTOR_HNSW_EF_CONSTRUCTION,
+                hnsw_ef_search=self.config.PGVECTOR_HNSW_EF_SEARCH,
+                ivfflat_lists=self.config.PGVECTOR_IVFFLAT_LISTS,
+                ivfflat_probes=self.config.PGVECTOR_IVFFLAT_PROBES,
+                payload_schema=self.get_payload_schema(),
+            )
+
+        if provider == VectorDBEnums.NUMPY.value:
+            db_path = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_PATH)
+
+            return NumpyMemmapProvider(
+                db_path=db_path,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                dtype=self.config.NUMPY_VECTOR_DTYPE,
+                initial_capacity=self.config.NUMPY_INITIAL_CAPACITY,
+                payload_schema=self.get_payload_schema(),
             )
         
         return None
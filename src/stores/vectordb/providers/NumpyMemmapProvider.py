@@ -0,0 +1,623 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums, PayloadSchemaEnums, FilterOperatorEnums
+from numpy.lib.format import open_memmap
+from contextlib import contextmanager
+import numpy as np
+import sqlite3
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from typing import List
+from models.db_schemes import RetrievedDocument
+
+class NumpyMemmapProvider(VectorDBInterface):
+    """
+    Exact search over a memory-mapped matrix, with no extra service.
+
+    Each collection is a directory with:
+      - vectors.<generation>.npy: an append-only float32/float16 matrix,
+        opened read-only (mmap, no copy) by every searching process.
+      - records.sqlite: row -> id/text/metadata, tombstones of deleted or
+        replaced rows, and the collection state (version, count, matrix file).
+      - write.lock: flock taken by writers, so several processes can share
+        one collection.
+
+    Rows past the committed count are invisible, so appends are written into
+    the matrix before the count is bumped. When the matrix is full it is
+    rewritten without its tombstoned rows into a new generation file.
+    """
+
+    def __init__(self, db_path: str, distance_method: str,
+                 dtype: str = "float32", initial_capacity: int = 1024,
+                 payload_schema: dict = None):
+
+        self.db_path = db_path
+        self.distance_method = distance_method
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = initial_capacity
+        self.payload_schema = payload_schema or {}
+
+        # collection_name -> read state of the last seen version
+        self.collections = {}
+
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        os.makedirs(self.db_path, exist_ok=True)
+
+    def disconnect(self):
+        self.collections = {}
+
+    def get_collection_path(self, collection_name: str):
+        if not re.fullmatch(r"[A-Za-z0-9_]+", collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+
+        return os.path.join(self.db_path, collection_name)
+
+    def get_records_path(self, collection_name: str):
+        return os.path.join(self.get_collection_path(collection_name), "records.sqlite")
+
+    def open_records(self, collection_name: str, path: str = None):
+        # transactions are opened explicitly (BEGIN / BEGIN IMMEDIATE)
+        connection = sqlite3.connect(
+            path or self.get_records_path(collection_name),
+            timeout=30,
+            isolation_level=None,
+        )
+        return connection
+
+    @contextmanager
+    def write_lock(self, collection_name: str):
+        # POSIX only, imported here so the other backends still load elsewhere
+        import fcntl
+
+        lock_path = os.path.join(self.get_collection_path(collection_name), "write.lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_state(self, connection):
+        version, count, capacity, dim, matrix_file = connection.execute(
+            "SELECT version, count, capacity, dim, matrix_file FROM collection_state"
+        ).fetchone()
+
+        return {
+            "version": version,
+            "count": count,
+            "capacity": capacity,
+            "dim": dim,
+            "matrix_file": matrix_file,
+        }
+
+    def get_read_state(self, collection_name: str, connection, max_attempts: int = 3):
+        """
+        Matrix and tombstone mask of the version seen by the connection's
+        read transaction, reloaded only when a writer committed a new one.
+
+        A compaction removes the previous matrix file right after its commit,
+        so a snapshot taken just before may name a file that is gone; the read
+        transaction is then restarted on the new state.
+        """
+        for attempt in range(max_attempts):
+            state = self.get_state(connection)
+
+            # a recreated collection counts its versions from 1 again, but
+            # always starts on a new matrix file
+            cached = self.collections.get(collection_name)
+            if cached and cached["version"] == state["version"] \
+                    and cached["matrix_file"] == state["matrix_file"]:
+                return cached
+
+            if cached and cached["matrix_file"] == state["matrix_file"]:
+                matrix = cached["matrix"]
+                break
+
+            try:
+                matrix = np.load(
+                    os.path.join(self.get_collection_path(collection_name), state["matrix_file"]),
+                    mmap_mode="r",
+                )
+                break
+            except FileNotFoundError:
+                if attempt == max_attempts - 1:
+                    raise
+
+                connection.execute("ROLLBACK")
+                connection.execute("BEGIN")
+
+        deleted = np.zeros(state["count"], dtype=bool)
+        deleted_rows = [
+            row for (row,) in connection.execute(
+                "SELECT row FROM records WHERE deleted = 1 AND row < ?", (state["count"],)
+            )
+        ]
+        deleted[deleted_rows] = True
+
+        read_state = {
+            **state,
+            "matrix": matrix,
+            "deleted": deleted,
+            "no_live": state["count"] - len(deleted_rows),
+        }
+        self.collections[collection_name] = read_state
+
+        return read_state
+
+    def prepare_vectors(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+
+        # cosine is the dot product of unit vectors
+        if self.distance_method == DistanceMethodEnums.COSINE.value:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+        return vectors
+
+    def is_collection_existed(self, collection_name: str) -> bool:
+        return os.path.exists(self.get_records_path(collection_name))
+
+    def list_all_collections(self) -> List:
+        if not os.path.isdir(self.db_path):
+            return []
+
+        return sorted(
+            name for name in os.listdir(self.db_path)
+            if os.path.exists(os.path.join(self.db_path, name, "records.sqlite"))
+        )
+
+    def get_collection_info(self, collection_name: str) -> dict:
+        if not self.is_collection_existed(collection_name):
+            return None
+
+        connection = self.open_records(collection_name)
+        try:
+            state = self.get_state(connection)
+        finally:
+            connection.close()
+
+        return {
+            "collection_name": collection_name,
+            "points_count": self.count_records(collection_name=collection_name),
+            "rows_count": state["count"],
+            "capacity": state["capacity"],
+            "dim": state["dim"],
+            "dtype": self.dtype.name,
+            "distance_method": self.distance_method,
+        }
+
+    def delete_collection(self, collection_name: str):
+        self.collections.pop(collection_name, None)
+
+        if os.path.isdir(self.get_collection_path(collection_name)):
+            shutil.rmtree(self.get_collection_path(collection_name))
+            return True
+
+        return False
+
+    def create_collection(self, collection_name: str,
+                          embedding_size: int,
+                          do_reset: bool = False,
+                          collection_config: dict = None):
+        # the matrix is scanned exactly, there is no index or quantization to configure
+        if do_reset:
+            _ = self.delete_collection(collection_name=collection_name)
+
+        if self.is_collection_existed(collection_name):
+            return False
+
+        collection_path = self.get_collection_path(collection_name)
+        os.makedirs(collection_path, exist_ok=True)
+
+        with self.write_lock(collection_name):
+            if self.is_collection_existed(collection_name):
+                return False
+
+            matrix_file = f"vectors.{uuid.uuid4().hex}.npy"
+            matrix = open_memmap(
+                os.path.join(collection_path, matrix_file),
+                mode="w+",
+                dtype=self.dtype,
+                shape=(self.initial_capacity, embedding_size),
+            )
+            matrix.flush()
+            del matrix
+
+            # built aside and renamed, so the collection appears complete or not at all
+            tmp_path = os.path.join(collection_path, "records.sqlite.tmp")
+            connection = self.open_records(collection_name, path=tmp_path)
+            try:
+                connection.executescript(f"""
+                    PRAGMA journal_mode = DELETE;
+                    CREATE TABLE records (
+                        row INTEGER PRIMARY KEY,
+                        id INTEGER NOT NULL,
+                        asset_id INTEGER,
+                        text TEXT,
+                        metadata TEXT,
+                        deleted INTEGER NOT NULL DEFAULT 0
+                    );
+                    CREATE UNIQUE INDEX ix_records_live_id ON records (id) WHERE deleted = 0;
+                    CREATE INDEX ix_records_deleted_row ON records (row) WHERE deleted = 1;
+                    CREATE INDEX ix_records_asset_id ON records (asset_id) WHERE deleted = 0;
+                    CREATE TABLE collection_state (
+                        version INTEGER NOT NULL,
+                        count INTEGER NOT NULL,
+                        capacity INTEGER NOT NULL,
+                        dim INTEGER NOT NULL,
+                        matrix_file TEXT NOT NULL
+                    );
+                    INSERT INTO collection_state VALUES
+                        (1, 0, {int(self.initial_capacity)}, {int(embedding_size)}, '{matrix_file}');
+                """)
+            finally:
+                connection.close()
+
+            os.replace(tmp_path, self.get_records_path(collection_name))
+
+            connection = self.open_records(collection_name)
+            try:
+                # WAL lets searches read a snapshot while a writer appends
+                connection.execute("PRAGMA journal_mode = WAL")
+            finally:
+                connection.close()
+
+        return True
+
+    def rewrite_matrix(self, collection_name: str, connection, state: dict, no_new_rows: int):
+        """
+        Copy the live rows into a new, larger generation file and renumber
+        them. Runs inside the writer's transaction; readers keep the old file
+        until they see the committed state.
+        """
+        collection_path = self.get_collection_path(collection_name)
+        live_rows = np.array([
+            row for (row,) in connection.execute(
+                "SELECT row FROM records WHERE deleted = 0 ORDER BY row"
+            )
+        ], dtype=np.int64)
+
+        capacity = max(self.initial_capacity, 2 * (len(live_rows) + no_new_rows))
+        matrix_file = f"vectors.{uuid.uuid4().hex}.npy"
+
+        old_matrix = np.load(os.path.join(collection_path, state["matrix_file"]), mmap_mode="r")
+        new_matrix = open_memmap(
+            os.path.join(collection_path, matrix_file),
+            mode="w+",
+            dtype=self.dtype,
+            shape=(capacity, state["dim"]),
+        )
+
+        block_size = 65536
+        for i in range(0, len(live_rows), block_size):
+            block_rows = live_rows[i:i + block_size]
+            new_matrix[i:i + len(block_rows)] = old_matrix[block_rows]
+        new_matrix.flush()
+        del new_matrix, old_matrix
+
+        # rows only move down, so renumbering in ascending order never collides
+        connection.execute("DELETE FROM records WHERE deleted = 1")
+        connection.executemany(
+            "UPDATE records SET row = ? WHERE row = ?",
+            [(i, int(row)) for i, row in enumerate(live_rows) if i != row]
+        )
+
+        return {
+            **state,
+            "count": len(live_rows),
+            "capacity": capacity,
+            "matrix_file": matrix_file,
+        }
+
+    def insert_one(self, collection_name: str, text: str, vector: list,
+                   metadata: dict = None, record_id: str = None):
+        return self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            metadata=[metadata],
+            record_ids=[record_id],
+        )
+
+    def insert_many(self, collection_name: str, texts: list,
+                    vectors: list, metadata: list = None,
+                    record_ids: list = None, batch_size: int = 50,
+                    asset_ids: list = None):
+
+        if not self.is_collection_existed(collection_name):
+            self.logger.error(f"Cannot insert to non-existent collection: {collection_name}")
+            return False
+
+        if metadata is None:
+            metadata = [None] * len(texts)
+
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+
+        if asset_ids is None:
+            asset_ids = [None] * len(texts)
+
+        # an id given twice keeps its last record
+        last_positions = list({int(record_id): i for i, record_id in enumerate(record_ids)}.values())
+        if not last_positions:
+            return True
+
+        vectors = self.prepare_vectors([vectors[i] for i in last_positions])
+
+        with self.write_lock(collection_name):
+            connection = self.open_records(collection_name)
+            old_matrix_file = None
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                state = self.get_state(connection)
+
+                if vectors.shape[1] != state["dim"]:
+                    connection.execute("ROLLBACK")
+                    self.logger.error(f"Vector size {vectors.shape[1]} does not match collection {collection_name}")
+                    return False
+
+                # upserted ids are tombstoned first, so compaction drops their old rows
+                batch_ids = [int(record_ids[i]) for i in last_positions]
+                for i in range(0, len(batch_ids), 500):
+                    ids = batch_ids[i:i + 500]
+                    connection.execute(
+                        f"UPDATE records SET deleted = 1 WHERE deleted = 0 AND id IN ({','.join('?' * len(ids))})",
+                        ids
+                    )
+
+                if state["count"] + len(vectors) > state["capacity"]:
+                    old_matrix_file = state["matrix_file"]
+                    state = self.rewrite_matrix(
+                        collection_name=collection_name,
+                        connection=connection,
+                        state=state,
+                        no_new_rows=len(vectors),
+                    )
+
+                start = state["count"]
+                matrix = np.load(
+                    os.path.join(self.get_collection_path(collection_name), state["matrix_file"]),
+                    mmap_mode="r+",
+                )
+                matrix[start:start + len(vectors)] = vectors.astype(self.dtype)
+                matrix.flush()
+                del matrix
+
+                connection.executemany(
+                    "INSERT INTO records (row, id, asset_id, text, metadata, deleted) VALUES (?, ?, ?, ?, ?, 0)",
+                    [
+                        (start + j, int(record_ids[i]),
+                         int(asset_ids[i]) if asset_ids[i] is not None else None,
+                         texts[i],
+                         json.dumps(metadata[i]) if metadata[i] is not None else None)
+                        for j, i in enumerate(last_positions)
+                    ]
+                )
+
+                connection.execute(
+                    "UPDATE collection_state SET version = version + 1, count = ?, capacity = ?, matrix_file = ?",
+                    (start + len(vectors), state["capacity"], state["matrix_file"])
+                )
+                connection.execute("COMMIT")
+
+            except Exception as e:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                self.logger.error(f"Error while inserting batch: {e}")
+                return False
+            finally:
+                connection.close()
+
+            # processes still mapping the old generation keep it until they reload
+            if old_matrix_file:
+                os.remove(os.path.join(self.get_collection_path(collection_name), old_matrix_file))
+
+        return True
+
+    def delete_by_ids(self, collection_name: str, record_ids: list):
+
+        if not self.is_collection_existed(collection_name):
+            return False
+
+        record_ids = [int(record_id) for record_id in record_ids]
+
+        with self.write_lock(collection_name):
+            connection = self.open_records(collection_name)
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                for i in range(0, len(record_ids), 500):
+                    ids = record_ids[i:i + 500]
+                    connection.execute(
+                        f"UPDATE records SET deleted = 1 WHERE deleted = 0 AND id IN ({','.join('?' * len(ids))})",
+                        ids
+                    )
+                connection.execute("UPDATE collection_state SET version = version + 1")
+                connection.execute("COMMIT")
+            except Exception as e:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                self.logger.error(f"Error while deleting records: {e}")
+                return False
+            finally:
+                connection.close()
+
+        return True
+
+    def list_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+        # offset is the last id of the previous page
+        if not self.is_collection_existed(collection_name):
+            return [], None
+
+        connection = self.open_records(collection_name)
+        try:
+            record_ids = [
+                record_id for (record_id,) in connection.execute(
+                    "SELECT id FROM records WHERE deleted = 0 AND id > ? ORDER BY id LIMIT ?",
+                    (offset if offset is not None else -2**63, limit)
+                )
+            ]
+        finally:
+            connection.close()
+
+        next_offset = record_ids[-1] if len(record_ids) == limit else None
+        return record_ids, next_offset
+
+    def count_records(self, collection_name: str) -> int:
+        if not self.is_collection_existed(collection_name):
+            return 0
+
+        connection = self.open_records(collection_name)
+        try:
+            (no_records,) = connection.execute(
+                "SELECT count(*) FROM records WHERE deleted = 0"
+            ).fetchone()
+        finally:
+            connection.close()
+
+        return no_records
+
+    def get_filter_sql(self, filters: list = None):
+        """
+        SQLite conditions of the filters prepared by prepare_filters:
+        chunk_id is the id, asset_id a column, "metadata.<key>" a value of
+        the metadata JSON. Datetimes are compared through datetime().
+        """
+        operators = {
+            FilterOperatorEnums.EQ.value: "=",
+            FilterOperatorEnums.GT.value: ">",
+            FilterOperatorEnums.GTE.value: ">=",
+            FilterOperatorEnums.LT.value: "<",
+            FilterOperatorEnums.LTE.value: "<=",
+        }
+
+        conditions, params = [], []
+        for condition in filters or []:
+            field, field_type = condition["field"], self.payload_schema[condition["field"]]
+
+            field_sql, field_params = "asset_id", []
+            if field == "chunk_id":
+                field_sql = "id"
+            elif field.startswith("metadata."):
+                field_sql = "json_extract(metadata, ?)"
+                field_params = ['$."' + field.split(".", 1)[1].replace('"', '""') + '"']
+
+            value_sql = "?"
+            values = condition["value"] if isinstance(condition["value"], list) else [condition["value"]]
+            if field_type == PayloadSchemaEnums.DATETIME.value:
+                field_sql, value_sql = f"datetime({field_sql})", "datetime(?)"
+                values = [value.isoformat() for value in values]
+            elif field_type == PayloadSchemaEnums.BOOL.value:
+                values = [int(value) for value in values]
+
+            if condition["op"] == FilterOperatorEnums.IN.value:
+                conditions.append(f"{field_sql} IN ({', '.join([value_sql] * len(values))})")
+            else:
+                conditions.append(f"{field_sql} {operators[condition['op']]} {value_sql}")
+            params.extend(field_params + values)
+
+        return conditions, params
+
+    def search_by_vector(self, collection_name: str, vector: list,
+                         limit: int = 5, threshold: float = None,
+                         search_config: dict = None, filters: list = None):
+        return self.search_batch_by_vectors(
+            collection_name=collection_name,
+            vectors=[vector],
+            limit=limit,
+            threshold=threshold,
+            search_config=search_config,
+            filters=filters,
+        )[0]
+
+    def search_batch_by_vectors(self, collection_name: str, vectors: list,
+                                limit: int = 5, threshold: float = None,
+                                search_config: dict = None, filters: list = None):
+        """
+        Exact top-k: one matrix product of the committed rows with all the
+        queries, then argpartition for the k best scores of each query.
+        Scores follow the Qdrant provider (cosine similarity, or the inner
+        product for dot). With filters, the matching rows are selected in
+        SQLite first and only they are scored.
+        """
+        if not vectors or not self.is_collection_existed(collection_name):
+            return [[] for _ in vectors]
+
+        connection = self.open_records(collection_name)
+        try:
+            # one read snapshot for the state and the payloads
+            connection.execute("BEGIN")
+            state = self.get_read_state(collection_name=collection_name, connection=connection)
+            queries = self.prepare_vectors(vectors)
+
+            if filters:
+                conditions, params = self.get_filter_sql(filters=filters)
+                rows = np.array([
+                    row for (row,) in connection.execute(
+                        f"SELECT row FROM records WHERE deleted = 0 AND row < ? "
+                        f"AND {' AND '.join(conditions)} ORDER BY row",
+                        [state["count"], *params]
+                    )
+                ], dtype=np.int64)
+
+                if len(rows) == 0:
+                    return [[] for _ in vectors]
+
+                scores = np.asarray(state["matrix"][rows] @ queries.T, dtype=np.float32)
+            else:
+                rows = None
+                scores = np.asarray(state["matrix"][:state["count"]] @ queries.T, dtype=np.float32)
+                scores[state["deleted"]] = -np.inf
+
+            k = min(limit, state["no_live"] if rows is None else len(rows))
+            if k <= 0:
+                return [[] for _ in vectors]
+
+            # (row, score) pairs of each query, best first
+            hits = []
+            for query_scores in scores.T:
+                top = np.argpartition(-query_scores, k - 1)[:k]
+                top = top[np.argsort(-query_scores[top])]
+
+                if threshold is not None:
+                    top = top[query_scores[top] >= threshold]
+
+                top_rows = rows[top] if rows is not None else top
+                hits.append([(int(row), float(score)) for row, score in zip(top_rows, query_scores[top])])
+
+            # the payloads of all the hits, in chunks under the SQLite variables limit
+            hit_rows = list({row for query_hits in hits for row, _ in query_hits})
+            records = {}
+            for i in range(0, len(hit_rows), 900):
+                batch_rows = hit_rows[i:i + 900]
+                records.update({
+                    row: (record_id, text)
+                    for row, record_id, text in connection.execute(
+                        f"SELECT row, id, text FROM records WHERE row IN ({','.join('?' * len(batch_rows))})",
+                        batch_rows
+                    )
+                })
+        except Exception as e:
+            self.logger.error(f"Error while searching collection {collection_name}: {e}")
+            return [[] for _ in vectors]
+        finally:
+            connection.close()
+
+        return [
+            [
+                RetrievedDocument(
+                    text=records[row][1],
+                    score=score,
+                    chunk_id=records[row][0],
+                )
+                for row, score in query_hits
+                if row in records
+            ]
+            for query_hits in hits
+        ]
@@ -0,0 +1,637 @@
+from sqlalchemy import create_engine, text
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import (DistanceMethodEnums, PgVectorIndexTypeEnums,
+                             PgVectorDistanceMethodEnums, PayloadSchemaEnums,
+                             FilterOperatorEnums)
+import json
+import logging
+import re
+from typing import List
+from models.db_schemes import RetrievedDocument
+
+class PGVectorProvider(VectorDBInterface):
+    """
+    Collections are tables of the main Postgres database with a pgvector
+    column and an HNSW (or IVFFlat) index.
+
+    The async methods, used by the API, run on the application's async engine;
+    the sync interface runs on a small psycopg2 engine of the same database.
+    """
+
+    def __init__(self, db_engine, sync_db_url: str, distance_method: str,
+                 index_type: str = PgVectorIndexTypeEnums.HNSW.value,
+                 hnsw_m: int = 16, hnsw_ef_construction: int = 64,
+                 hnsw_ef_search: int = 40, ivfflat_lists: int = 100,
+                 ivfflat_probes: int = 1, payload_schema: dict = None):
+
+        self.db_engine = db_engine
+        self.sync_db_url = sync_db_url
+        self.sync_engine = None
+
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivfflat_lists = ivfflat_lists
+        self.ivfflat_probes = ivfflat_probes
+        self.payload_schema = payload_schema or {}
+
+        self.table_prefix = "pgvector_"
+
+        # (major, minor, patch) of the installed extension, read in connect()
+        self.extension_version = None
+
+        # <=> is the cosine distance, <#> the negative inner product
+        self.distance_method = distance_method
+        self.distance_operator = "<=>"
+        self.index_operator_class = PgVectorDistanceMethodEnums.COSINE.value
+        if distance_method == DistanceMethodEnums.DOT.value:
+            self.distance_operator = "<#>"
+            self.index_operator_class = PgVectorDistanceMethodEnums.DOT.value
+
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        self.sync_engine = create_engine(self.sync_db_url, pool_size=2, max_overflow=2)
+
+        with self.sync_engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            extension_version = connection.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+
+        self.extension_version = tuple(int(part) for part in re.findall(r"\d+", extension_version or "0"))
+
+    def supports_iterative_scan(self):
+        # hnsw/ivfflat.iterative_scan came with pgvector 0.8.0
+        return self.extension_version is not None and self.extension_version >= (0, 8, 0)
+
+    def disconnect(self):
+        if self.sync_engine:
+            self.sync_engine.dispose()
+
+        self.sync_engine = None
+
+    def get_table_name(self, collection_name: str):
+        # table names can not be bound as parameters, so only plain names pass
+        if not re.fullmatch(r"[A-Za-z0-9_]+", collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+
+        return f"{self.table_prefix}{collection_name}"
+
+    def format_vector(self, vector: list):
+        return "[" + ",".join(str(float(x)) for x in vector) + "]"
+
+    def run_statements(self, statements: list):
+        return self.run_statement_groups([statements])[0]
+
+    async def arun_statements(self, statements: list):
+        return (await self.arun_statement_groups([statements]))[0]
+
+    def run_statement_groups(self, statement_groups: list):
+        # all the groups in one transaction, the rows of each group's last statement
+        with self.sync_engine.begin() as connection:
+            groups_rows = []
+            for statements in statement_groups:
+                result = None
+                for sql, params in statements:
+                    result = connection.execute(text(sql), params)
+
+                groups_rows.append(result.all() if result is not None and result.returns_rows else None)
+
+            return groups_rows
+
+    async def arun_statement_groups(self, statement_groups: list):
+        async with self.db_engine.begin() as connection:
+            groups_rows = []
+            for statements in statement_groups:
+                result = None
+                for sql, params in statements:
+                    result = await connection.execute(text(sql), params)
+
+                groups_rows.append(result.all() if result is not None and result.returns_rows else None)
+
+            return groups_rows
+
+    def get_exists_statements(self, collection_name: str):
+        return [(
+            "SELECT to_regclass(:table_name) IS NOT NULL",
+            {"table_name": self.get_table_name(collection_name=collection_name)},
+        )]
+
+    def get_field_sql(self, field: str):
+        """
+        SQL expression of a payload field: chunk_id is the id, asset_id a
+        column, and "metadata.<key>" a typed value of the metadata JSONB.
+        """
+        if field == "chunk_id":
+            return "id"
+
+        if field == "asset_id":
+            return "asset_id"
+
+        sql_types = {
+            PayloadSchemaEnums.KEYWORD.value: "TEXT",
+            PayloadSchemaEnums.INTEGER.value: "BIGINT",
+            PayloadSchemaEnums.FLOAT.value: "DOUBLE PRECISION",
+            PayloadSchemaEnums.BOOL.value: "BOOLEAN",
+            PayloadSchemaEnums.DATETIME.value: "TIMESTAMPTZ",
+        }
+        metadata_key = field.split(".", 1)[1].replace("'", "''")
+        return f"CAST(metadata->>'{metadata_key}' AS {sql_types[self.payload_schema[field]]})"
+
+    def get_filter_sql(self, filters: list = None):
+        # conditions prepared by prepare_filters, joined with AND
+        operators = {
+            FilterOperatorEnums.EQ.value: "=",
+            FilterOperatorEnums.GT.value: ">",
+            FilterOperatorEnums.GTE.value: ">=",
+            FilterOperatorEnums.LT.value: "<",
+            FilterOperatorEnums.LTE.value: "<=",
+        }
+
+        conditions, params = [], {}
+        for i, condition in enumerate(filters or []):
+            field_sql = self.get_field_sql(condition["field"])
+            if condition["op"] == FilterOperatorEnums.IN.value:
+                conditions.append(f"{field_sql} = ANY(:filter_{i})")
+            else:
+                conditions.append(f"{field_sql} {operators[condition['op']]} :filter_{i}")
+            params[f"filter_{i}"] = condition["value"]
+
+        return conditions, params
+
+    def get_create_statements(self, collection_name: str, embedding_size: int,
+                              collection_config: dict = None):
+        table_name = self.get_table_name(collection_name=collection_name)
+        collection_config = collection_config or {}
+
+        hnsw_m = collection_config.get("hnsw_m") or self.hnsw_m
+        hnsw_ef_construction = collection_config.get("hnsw_ef_construct") or self.hnsw_ef_construction
+
+        index_options = f"m = {int(hnsw_m)}, ef_construction = {int(hnsw_ef_construction)}"
+        if self.index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+            index_options = f"lists = {int(self.ivfflat_lists)}"
+
+        # btree indexes of the filterable fields; casts to timestamptz are
+        # not immutable, so datetime fields are filtered without one
+        payload_indexes = [
+            (f'CREATE INDEX IF NOT EXISTS "{table_name}_payload_{i}_idx" ON "{table_name}" '
+             f'(({self.get_field_sql(field)}))', {})
+            for i, (field, field_type) in enumerate(self.payload_schema.items())
+            if field != "chunk_id" and field_type != PayloadSchemaEnums.DATETIME.value
+        ]
+
+        return [
+            (f'CREATE TABLE IF NOT EXISTS "{table_name}" ('
+             f'id BIGINT PRIMARY KEY, '
+             f'asset_id BIGINT, '
+             f'text TEXT NOT NULL, '
+             f'metadata JSONB, '
+             f'vector vector({int(embedding_size)}) NOT NULL)', {}),
+            (f'CREATE INDEX IF NOT EXISTS "{table_name}_vector_idx" ON "{table_name}" '
+             f'USING {self.index_type} (vector {self.index_operator_class}) '
+             f'WITH ({index_options})', {}),
+            *payload_indexes,
+        ]
+
+    def get_drop_statements(self, collection_name: str):
+        table_name = self.get_table_name(collection_name=collection_name)
+        return [(f'DROP TABLE IF EXISTS "{table_name}"', {})]
+
+    def get_upsert_sql(self, collection_name: str, source: str = None):
+        table_name = self.get_table_name(collection_name=collection_name)
+
+        values = "VALUES (:id, :asset_id, :text, CAST(:metadata AS JSONB), CAST(:vector AS vector))"
+        if source:
+            values = f'SELECT id, asset_id, text, metadata, CAST(vector AS vector) FROM "{source}"'
+
+        return (
+            f'INSERT INTO "{table_name}" (id, asset_id, text, metadata, vector) {values} '
+            f'ON CONFLICT (id) DO UPDATE SET '
+            f'asset_id = EXCLUDED.asset_id, text = EXCLUDED.text, '
+            f'metadata = EXCLUDED.metadata, vector = EXCLUDED.vector'
+        )
+
+    def get_upsert_params(self, texts: list, vectors: list, metadata: list, record_ids: list,
+                          asset_ids: list):
+        return [
+            {
+                "id": int(record_id),
+                "asset_id": int(asset_id) if asset_id is not None else None,
+                "text": record_text,
+                "metadata": json.dumps(record_metadata) if record_metadata is not None else None,
+                "vector": self.format_vector(vector),
+            }
+            for record_id, asset_id, record_text, record_metadata, vector
+            in zip(record_ids, asset_ids, texts, metadata, vectors)
+        ]
+
+    def get_search_statements(self, collection_name: str, vector: list,
+                              limit: int = 5, threshold: float = None,
+                              search_config: dict = None, filters: list = None):
+        """
+        Nearest neighbours ordered by the index operator, with the threshold
+        turned into a distance bound and the filters as conditions, so
+        Postgres filters and limits the rows.
+        """
+        table_name = self.get_table_name(collection_name=collection_name)
+        distance = f"vector {self.distance_operator} CAST(:vector AS vector)"
+
+        # scores follow Qdrant: cosine similarity, or the inner product for dot
+        score = f"1 - ({distance})"
+        max_distance = 1 - threshold if threshold is not None else None
+        if self.distance_method == DistanceMethodEnums.DOT.value:
+            score = f"-({distance})"
+            max_distance = -threshold if threshold is not None else None
+
+        conditions, params = self.get_filter_sql(filters=filters)
+        if threshold is not None:
+            conditions.append(f"{distance} <= :max_distance")
+            params["max_distance"] = max_distance
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # an HNSW scan returns at most ef_search rows
+        hnsw_ef_search = max(int((search_config or {}).get("hnsw_ef") or self.hnsw_ef_search), int(limit))
+        is_ivfflat = self.index_type == PgVectorIndexTypeEnums.IVFFLAT.value
+
+        # the conditions run on the rows the index scan returns, without an
+        # iterative scan a selective filter leaves fewer than limit of them
+        iterative_scan_setting = None
+        if conditions and self.supports_iterative_scan():
+            iterative_scan_setting = "SET LOCAL hnsw.iterative_scan = strict_order"
+            if is_ivfflat:
+                iterative_scan_setting = "SET LOCAL ivfflat.iterative_scan = relaxed_order"
+
+        elif conditions:
+            # older pgvector: widen the scan as far as it goes instead
+            hnsw_ef_search = 1000
+
+        search_setting = f"SET LOCAL hnsw.ef_search = {hnsw_ef_search}"
+        if is_ivfflat:
+            search_setting = f"SET LOCAL ivfflat.probes = {int(self.ivfflat_probes)}"
+
+        params.update({"vector": self.format_vector(vector), "limit": limit})
+
+        settings_statements = [(search_setting, {})]
+        if iterative_scan_setting:
+            settings_statements.append((iterative_scan_setting, {}))
+
+        return [
+            *settings_statements,
+            (f'SELECT text, {score} AS score, id FROM "{table_name}" {where} '
+             f'ORDER BY {distance} LIMIT :limit', params),
+        ]
+
+    def get_delete_statements(self, collection_name: str, record_ids: list):
+        table_name = self.get_table_name(collection_name=collection_name)
+        return [(
+            f'DELETE FROM "{table_name}" WHERE id = ANY(CAST(:ids AS BIGINT[]))',
+            {"ids": [int(record_id) for record_id in record_ids]},
+        )]
+
+    def get_list_ids_statements(self, collection_name: str, offset=None, limit: int = 1000):
+        # offset is the last id of the previous page (keyset)
+        table_name = self.get_table_name(collection_name=collection_name)
+        where = "WHERE id > :offset" if offset is not None else ""
+
+        return [(
+            f'SELECT id FROM "{table_name}" {where} ORDER BY id LIMIT :limit',
+            {"offset": offset, "limit": limit} if offset is not None else {"limit": limit},
+        )]
+
+    def get_count_statements(self, collection_name: str):
+        table_name = self.get_table_name(collection_name=collection_name)
+        return [(f'SELECT count(*) FROM "{table_name}"', {})]
+
+    def build_record_ids_page(self, rows: list, limit: int):
+        record_ids = [row[0] for row in rows]
+        next_offset = record_ids[-1] if len(record_ids) == limit else None
+        return record_ids, next_offset
+
+    def build_retrieved_documents(self, rows: list):
+        return [
+            RetrievedDocument(text=row[0], score=float(row[1]), chunk_id=int(row[2]))
+            for row in rows or []
+        ]
+
+    def is_collection_existed(self, collection_name: str) -> bool:
+        rows = self.run_statements(self.get_exists_statements(collection_name=collection_name))
+        return bool(rows[0][0])
+
+    def list_all_collections(self) -> List:
+        rows = self.run_statements([(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_schema = current_schema() AND table_name LIKE :prefix",
+            {"prefix": f"{self.table_prefix}%"},
+        )])
+        return [row[0][len(self.table_prefix):] for row in rows]
+
+    def get_collection_info(self, collection_name: str) -> dict:
+        if not self.is_collection_existed(collection_name):
+            return None
+
+        return {
+            "collection_name": collection_name,
+            "points_count": self.count_records(collection_name=collection_name),
+            "distance_method": self.distance_method,
+            "index_type": self.index_type,
+        }
+
+    def delete_collection(self, collection_name: str):
+        return self.run_statements(self.get_drop_statements(collection_name=collection_name))
+
+    def create_collection(self, collection_name: str,
+                          embedding_size: int,
+                          do_reset: bool = False,
+                          collection_config: dict = None):
+        if do_reset:
+            _ = self.delete_collection(collection_name=collection_name)
+
+        if self.is_collection_existed(collection_name):
+            return False
+
+        _ = self.run_statements(self.get_create_statements(
+            collection_name=collection_name,
+            embedding_size=embedding_size,
+            collection_config=collection_config,
+        ))
+        return True
+
+    def insert_one(self, collection_name: str, text: str, vector: list,
+                   metadata: dict = None, record_id: str = None):
+        return self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            metadata=[metadata],
+            record_ids=[record_id],
+        )
+
+    def insert_many(self, collection_name: str, texts: list,
+                    vectors: list, metadata: list = None,
+                    record_ids: list = None, batch_size: int = 50,
+                    asset_ids: list = None):
+
+        if metadata is None:
+            metadata = [None] * len(texts)
+
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+
+        if asset_ids is None:
+            asset_ids = [None] * len(texts)
+
+        try:
+            with self.sync_engine.begin() as connection:
+                for i in range(0, len(texts), batch_size):
+                    batch_end = i + batch_size
+                    connection.execute(
+                        text(self.get_upsert_sql(collection_name=collection_name)),
+                        self.get_upsert_params(
+                            texts=texts[i:batch_end],
+                            vectors=vectors[i:batch_end],
+                            metadata=metadata[i:batch_end],
+                            record_ids=record_ids[i:batch_end],
+                            asset_ids=asset_ids[i:batch_end],
+                        )
+                    )
+        except Exception as e:
+            self.logger.error(f"Error while inserting batch: {e}")
+            return False
+
+        return True
+
+    def delete_by_ids(self, collection_name: str, record_ids: list):
+        try:
+            _ = self.run_statements(self.get_delete_statements(
+                collection_name=collection_name,
+                record_ids=record_ids,
+            ))
+        except Exception as e:
+            self.logger.error(f"Error while deleting records: {e}")
+            return False
+
+        return True
+
+    def list_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+        if not self.is_collection_existed(collection_name):
+            return [], None
+
+        rows = self.run_statements(self.get_list_ids_statements(
+            collection_name=collection_name,
+            offset=offset,
+            limit=limit,
+        ))
+        return self.build_record_ids_page(rows=rows, limit=limit)
+
+    def count_records(self, collection_name: str) -> int:
+        if not self.is_collection_existed(collection_name):
+            return 0
+
+        rows = self.run_statements(self.get_count_statements(collection_name=collection_name))
+        return rows[0][0]
+
+    def search_by_vector(self, collection_name: str, vector: list,
+                         limit: int = 5, threshold: float = None,
+                         search_config: dict = None, filters: list = None):
+        try:
+            rows = self.run_statements(self.get_search_statements(
+                collection_name=collection_name,
+                vector=vector,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            ))
+        except Exception as e:
+            self.logger.error(f"Error while searching {collection_name}: {e}")
+            return []
+
+        return self.build_retrieved_documents(rows=rows)
+
+    def get_search_batch_statements(self, collection_name: str, vectors: list,
+                                    limit: int = 5, threshold: float = None,
+                                    search_config: dict = None, filters: list = None):
+        return [
+            self.get_search_statements(
+                collection_name=collection_name,
+                vector=vector,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            )
+            for vector in vectors
+        ]
+
+    def search_batch_by_vectors(self, collection_name: str, vectors: list,
+                                limit: int = 5, threshold: float = None,
+                                search_config: dict = None, filters: list = None):
+        # one connection and transaction for all the queries
+        try:
+            groups_rows = self.run_statement_groups(self.get_search_batch_statements(
+                collection_name=collection_name,
+                vectors=vectors,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            ))
+        except Exception as e:
+            self.logger.error(f"Error while searching {collection_name}: {e}")
+            return [[] for _ in vectors]
+
+        return [self.build_retrieved_documents(rows=rows) for rows in groups_rows]
+
+    async def ais_collection_existed(self, collection_name: str) -> bool:
+        rows = await self.arun_statements(self.get_exists_statements(collection_name=collection_name))
+        return bool(rows[0][0])
+
+    async def acreate_collection(self, collection_name: str, embedding_size: int,
+                                 do_reset: bool = False, collection_config: dict = None):
+        if do_reset:
+            _ = await self.arun_statements(self.get_drop_statements(collection_name=collection_name))
+
+        if await self.ais_collection_existed(collection_name):
+            return False
+
+        _ = await self.arun_statements(self.get_create_statements(
+            collection_name=collection_name,
+            embedding_size=embedding_size,
+            collection_config=collection_config,
+        ))
+        return True
+
+    async def ainsert_many(self, collection_name: str, texts: list,
+                           vectors: list, metadata: list = None,
+                           record_ids: list = None, batch_size: int = 50,
+                           asset_ids: list = None):
+        """
+        Bulk upsert: the rows are COPYed into a temporary staging table with a
+        real[] column, then merged into the collection in one INSERT ... ON
+        CONFLICT, instead of one statement per batch.
+        """
+        if metadata is None:
+            metadata = [None] * len(texts)
+
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+
+        if asset_ids is None:
+            asset_ids = [None] * len(texts)
+
+        staging_table = f"{self.table_prefix}staging"
+
+        try:
+            async with self.db_engine.begin() as connection:
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+
+                if not hasattr(driver_connection, "copy_records_to_table"):
+                    await connection.execute(
+                        text(self.get_upsert_sql(collection_name=collection_name)),
+                        self.get_upsert_params(
+                            texts=texts,
+                            vectors=vectors,
+                            metadata=metadata,
+                            record_ids=record_ids,
+                            asset_ids=asset_ids,
+                        )
+                    )
+                    return True
+
+                await connection.execute(text(
+                    f'CREATE TEMP TABLE "{staging_table}" '
+                    f'(id BIGINT, asset_id BIGINT, text TEXT, metadata JSONB, vector REAL[]) ON COMMIT DROP'
+                ))
+
+                _ = await driver_connection.copy_records_to_table(
+                    staging_table,
+                    records=[
+                        (int(record_id), int(asset_id) if asset_id is not None else None,
+                         record_text,
+                         json.dumps(record_metadata) if record_metadata is not None else None,
+                         [float(x) for x in vector])
+                        for record_id, asset_id, record_text, record_metadata, vector
+                        in zip(record_ids, asset_ids, texts, metadata, vectors)
+                    ],
+                    columns=["id", "asset_id", "text", "metadata", "vector"],
+                )
+
+                await connection.execute(text(self.get_upsert_sql(
+                    collection_name=collection_name,
+                    source=staging_table,
+                )))
+        except Exception as e:
+            self.logger.error(f"Error while inserting batch: {e}")
+            return False
+
+        return True
+
+    async def adelete_by_ids(self, collection_name: str, record_ids: list):
+        try:
+            _ = await self.arun_statements(self.get_delete_statements(
+                collection_name=collection_name,
+                record_ids=record_ids,
+            ))
+        except Exception as e:
+            self.logger.error(f"Error while deleting records: {e}")
+            return False
+
+        return True
+
+    async def alist_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+        if not await self.ais_collection_existed(collection_name):
+            return [], None
+
+        rows = await self.arun_statements(self.get_list_ids_statements(
+            collection_name=collection_name,
+            offset=offset,
+            limit=limit,
+        ))
+        return self.build_record_ids_page(rows=rows, limit=limit)
+
+    async def acount_records(self, collection_name: str) -> int:
+        if not await self.ais_collection_existed(collection_name):
+            return 0
+
+        rows = await self.arun_statements(self.get_count_statements(collection_name=collection_name))
+        return rows[0][0]
+
+    async def asearch_by_vector(self, collection_name: str, vector: list,
+                                limit: int = 5, threshold: float = None,
+                                search_config: dict = None, filters: list = None):
+        try:
+            rows = await self.arun_statements(self.get_search_statements(
+                collection_name=collection_name,
+                vector=vector,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            ))
+        except Exception as e:
+            self.logger.error(f"Error while searching {collection_name}: {e}")
+            return []
+
+        return self.build_retrieved_documents(rows=rows)
+
+    async def asearch_batch_by_vectors(self, collection_name: str, vectors: list,
+                                       limit: int = 5, threshold: float = None,
+                                       search_config: dict = None, filters: list = None):
+        try:
+            groups_rows = await self.arun_statement_groups(self.get_search_batch_statements(
+                collection_name=collection_name,
+                vectors=vectors,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            ))
+        except Exception as e:
+            self.logger.error(f"Error while searching {collection_name}: {e}")
+            return [[] for _ in vectors]
+
+        return [self.build_retrieved_documents(rows=rows) for rows in groups_rows]
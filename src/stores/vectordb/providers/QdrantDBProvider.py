@@ -1,18 +1,41 @@
-from qdrant_client import models, QdrantClient
+from qdrant_client import models, QdrantClient, AsyncQdrantClient
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceMethodEnums
+from ..VectorDBEnums import (DistanceMethodEnums, QdrantQuantizationEnums,
+                             PayloadSchemaEnums, FilterOperatorEnums)
+import asyncio
+import httpx
 import logging
 from typing import List
 from models.db_schemes import RetrievedDocument
 
 class QdrantDBProvider(VectorDBInterface):
 
-    def __init__(self, db_path: str, distance_method: str):
+    def __init__(self, db_path: str, distance_method: str,
+                 url: str = None, grpc_port: int = 6334, prefer_grpc: bool = False,
+                 timeout: int = None, api_key: str = None, pool_size: int = None,
+                 collection_config: dict = None, search_config: dict = None,
+                 payload_schema: dict = None):
 
         self.client = None
+        self.async_client = None
         self.db_path = db_path
         self.distance_method = None
 
+        # with a url the provider talks to a Qdrant server, else it opens the
+        # embedded storage at db_path
+        self.url = url
+        self.grpc_port = grpc_port
+        self.prefer_grpc = prefer_grpc
+        self.timeout = timeout
+        self.api_key = api_key
+        self.pool_size = pool_size
+
+        # defaults of the collection and search options, a project may
+        # override any of them
+        self.collection_config = collection_config or {}
+        self.search_config = search_config or {}
+        self.payload_schema = payload_schema or {}
+
         if distance_method == DistanceMethodEnums.COSINE.value:
             self.distance_method = models.Distance.COSINE
         elif distance_method == DistanceMethodEnums.DOT.value:
@@ -20,12 +43,146 @@ class QdrantDBProvider(VectorDBInterface):
 
         self.logger = logging.getLogger(__name__)
 
+    def get_server_client_args(self):
+        client_args = {
+            "url": self.url,
+            "grpc_port": self.grpc_port,
+            "prefer_grpc": self.prefer_grpc,
+            "timeout": self.timeout,
+            "api_key": self.api_key,
+        }
+
+        # REST connection pool of each client; gRPC multiplexes one channel
+        if self.pool_size:
+            client_args["limits"] = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+            )
+
+        return client_args
+
     def connect(self):
+        if self.url:
+            # the server owns the storage, so any number of API workers and
+            # processes can share it, each with a sync and a native async client
+            self.client = QdrantClient(**self.get_server_client_args())
+            self.async_client = AsyncQdrantClient(**self.get_server_client_args())
+            return
+
+        # The embedded (path) storage is guarded by an exclusive file lock, so it
+        # cannot be opened by a second AsyncQdrantClient next to the sync one.
+        # In that mode the async methods fall back to a worker thread.
         self.client = QdrantClient(path=self.db_path)
 
     def disconnect(self):
+        if self.client:
+            self.client.close()
+
         self.client = None
 
+    async def adisconnect(self):
+        if self.async_client:
+            await self.async_client.close()
+
+        self.async_client = None
+
+    def get_collection_options(self, embedding_size: int, collection_config: dict = None):
+        """
+        create_collection arguments: int8 scalar or binary quantization (kept
+        in RAM with always_ram), the original vectors on disk, HNSW
+        m/ef_construct. Unset options keep the Qdrant defaults.
+        """
+        config = {**self.collection_config, **(collection_config or {})}
+
+        quantization_config = None
+        if config.get("quantization") == QdrantQuantizationEnums.SCALAR.value:
+            quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=config.get("quantization_always_ram"),
+                )
+            )
+        elif config.get("quantization") == QdrantQuantizationEnums.BINARY.value:
+            quantization_config = models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(
+                    always_ram=config.get("quantization_always_ram"),
+                )
+            )
+
+        return {
+            "vectors_config": models.VectorParams(
+                size=embedding_size,
+                distance=self.distance_method,
+                on_disk=config.get("on_disk"),
+            ),
+            "hnsw_config": models.HnswConfigDiff(
+                m=config.get("hnsw_m"),
+                ef_construct=config.get("hnsw_ef_construct"),
+            ),
+            "quantization_config": quantization_config,
+        }
+
+    def get_search_params(self, search_config: dict = None):
+        # rescore re-ranks the quantized candidates with the original vectors,
+        # oversampling fetches limit * oversampling candidates to re-rank
+        config = {**self.search_config, **(search_config or {})}
+
+        quantization = None
+        if config.get("rescore") is not None or config.get("oversampling") is not None:
+            quantization = models.QuantizationSearchParams(
+                rescore=config.get("rescore"),
+                oversampling=config.get("oversampling"),
+            )
+
+        return models.SearchParams(
+            hnsw_ef=config.get("hnsw_ef"),
+            quantization=quantization,
+        )
+
+    def build_payload(self, text: str, metadata: dict, record_id, asset_id):
+        return {
+            "text": text,
+            "metadata": metadata,
+            "chunk_id": record_id,
+            "asset_id": asset_id,
+        }
+
+    def build_filter(self, filters: list = None):
+        """
+        Qdrant Filter of the conditions prepared by prepare_filters, all of
+        them required (must).
+        """
+        if not filters:
+            return None
+
+        conditions = []
+        for condition in filters:
+            field, operator, value = condition["field"], condition["op"], condition["value"]
+            field_type = self.payload_schema.get(field)
+
+            range_class = models.Range
+            if field_type == PayloadSchemaEnums.DATETIME.value:
+                range_class = models.DatetimeRange
+
+            # float and datetime values have no exact match, only ranges
+            is_range_only = field_type in [PayloadSchemaEnums.FLOAT.value, PayloadSchemaEnums.DATETIME.value]
+
+            if operator in [FilterOperatorEnums.EQ.value, FilterOperatorEnums.IN.value] and is_range_only:
+                values = value if operator == FilterOperatorEnums.IN.value else [value]
+                conditions.append(models.Filter(should=[
+                    models.FieldCondition(key=field, range=range_class(gte=v, lte=v))
+                    for v in values
+                ]))
+            elif operator == FilterOperatorEnums.EQ.value:
+                conditions.append(models.FieldCondition(key=field, match=models.MatchValue(value=value)))
+            elif operator == FilterOperatorEnums.IN.value:
+                conditions.append(models.FieldCondition(key=field, match=models.MatchAny(any=value)))
+            else:
+                conditions.append(models.FieldCondition(key=field, range=range_class(**{operator: value})))
+
+        return models.Filter(must=conditions)
+
     def is_collection_existed(self, collection_name: str) -> bool:
         return self.client.collection_exists(collection_name=collection_name)
     
@@ -41,18 +198,27 @@ class QdrantDBProvider(VectorDBInterface):
         
     def create_collection(self, collection_name: str, 
                           embedding_size: int,
-                          do_reset: bool = False):
+                          do_reset: bool = False,
+                          collection_config: dict = None):
         if do_reset:
             _ = self.delete_collection(collection_name=collection_name)
         
         if not self.is_collection_existed(collection_name):
             _ = self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=models.VectorParams(
-                    size=embedding_size,
-                    distance=self.distance_method
+                **self.get_collection_options(
+                    embedding_size=embedding_size,
+                    collection_config=collection_config,
                 )
             )
+
+            # payload indexes let filtered searches stay inside the HNSW graph
+            for field, field_type in self.payload_schema.items():
+                _ = self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field,
+                    field_schema=models.PayloadSchemaType(field_type),
+                )
             return True
         
         return False
@@ -83,7 +249,8 @@ class QdrantDBProvider(VectorDBInterface):
     
     def insert_many(self, collection_name: str, texts: list, 
                     vectors: list, metadata: list = None, 
-                    record_ids: list = None, batch_size: int = 50):
+                    record_ids: list = None, batch_size: int = 50,
+                    asset_ids: list = None):
         
         if metadata is None:
             metadata = [None] * len(texts)
@@ -91,6 +258,9 @@ class QdrantDBProvider(VectorDBInterface):
         if record_ids is None:
             record_ids = list(range(0, len(texts)))
 
+        if asset_ids is None:
+            asset_ids = [None] * len(texts)
+
         for i in range(0, len(texts), batch_size):
             batch_end = i + batch_size
 
@@ -98,6 +268,7 @@ class QdrantDBProvider(VectorDBInterface):
             batch_vectors = vectors[i:batch_end]
             batch_metadata = metadata[i:batch_end]
             batch_record_ids = record_ids[i:batch_end]
+            batch_asset_ids = asset_ids[i:batch_end]
 
             batch_records = []
             for x in range(len(batch_texts)):
@@ -105,10 +276,12 @@ class QdrantDBProvider(VectorDBInterface):
                     models.Record(
                         id=batch_record_ids[x],
                         vector=batch_vectors[x],
-                        payload={
-                            "text": batch_texts[x],
-                            "metadata": batch_metadata[x]
-                        }
+                        payload=self.build_payload(
+                            text=batch_texts[x],
+                            metadata=batch_metadata[x],
+                            record_id=batch_record_ids[x],
+                            asset_id=batch_asset_ids[x],
+                        )
                     )
                 )
 
@@ -123,54 +296,336 @@ class QdrantDBProvider(VectorDBInterface):
 
         return True
     
-    def search_by_vector(self, 
-                         collection_name: str, 
-                         vector: list, 
-                         limit: int = 5, 
-                         threshold: float = None):
-        """
-        Perform a semantic search in Qdrant, returning up to 'limit' docs
-        whose similarity is >= threshold (0..1).
-        
-        Qdrant 'score' is actually the distance for COSINE or DOT.
-        For COSINE, distance is in [0..2].
-        We convert to similarity in [0..1]: similarity = 1 - distance/2
-        
-        Steps:
-          1) Retrieve a large set of docs (big_limit).
-          2) Convert distance->similarity, filter by threshold.
-          3) Sort by similarity desc.
-          4) Return top 'limit' docs.
+    def delete_by_ids(self, collection_name: str, record_ids: list):
+
+        if not self.is_collection_existed(collection_name):
+            return False
+
+        try:
+            _ = self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=list(record_ids)),
+            )
+        except Exception as e:
+            self.logger.error(f"Error while deleting records: {e}")
+            return False
+
+        return True
+
+    def list_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+
+        if not self.is_collection_existed(collection_name):
+            return [], None
+
+        records, next_offset = self.client.scroll(
+            collection_name=collection_name,
+            offset=offset,
+            limit=limit,
+            with_payload=False,
+            with_vectors=False,
+        )
+
+        return [record.id for record in records], next_offset
+
+    def count_records(self, collection_name: str) -> int:
+
+        if not self.is_collection_existed(collection_name):
+            return 0
+
+        return self.client.count(collection_name=collection_name, exact=True).count
+
+    async def acreate_collection(self, collection_name: str, embedding_size: int,
+                                 do_reset: bool = False, collection_config: dict = None):
+
+        if not self.async_client:
+            return await super().acreate_collection(
+                collection_name=collection_name,
+                embedding_size=embedding_size,
+                do_reset=do_reset,
+                collection_config=collection_config,
+            )
+
+        if do_reset and await self.async_client.collection_exists(collection_name=collection_name):
+            _ = await self.async_client.delete_collection(collection_name=collection_name)
+
+        if await self.async_client.collection_exists(collection_name=collection_name):
+            return False
+
+        _ = await self.async_client.create_collection(
+            collection_name=collection_name,
+            **self.get_collection_options(
+                embedding_size=embedding_size,
+                collection_config=collection_config,
+            )
+        )
+
+        for field, field_type in self.payload_schema.items():
+            _ = await self.async_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=models.PayloadSchemaType(field_type),
+            )
+        return True
+
+    async def ainsert_many(self, collection_name: str, texts: list,
+                           vectors: list, metadata: list = None,
+                           record_ids: list = None, batch_size: int = 50,
+                           asset_ids: list = None):
+
+        if not self.async_client:
+            return await super().ainsert_many(
+                collection_name=collection_name,
+                texts=texts,
+                vectors=vectors,
+                metadata=metadata,
+                record_ids=record_ids,
+                batch_size=batch_size,
+                asset_ids=asset_ids,
+            )
+
+        if metadata is None:
+            metadata = [None] * len(texts)
+
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+
+        if asset_ids is None:
+            asset_ids = [None] * len(texts)
+
+        for i in range(0, len(texts), batch_size):
+            batch_end = i + batch_size
+
+            batch_points = [
+                models.PointStruct(
+                    id=record_id,
+                    vector=vector,
+                    payload=self.build_payload(
+                        text=text,
+                        metadata=record_metadata,
+                        record_id=record_id,
+                        asset_id=asset_id,
+                    )
+                )
+                for text, vector, record_metadata, record_id, asset_id in zip(
+                    texts[i:batch_end], vectors[i:batch_end],
+                    metadata[i:batch_end], record_ids[i:batch_end],
+                    asset_ids[i:batch_end]
+                )
+            ]
+
+            try:
+                _ = await self.async_client.upsert(
+                    collection_name=collection_name,
+                    points=batch_points,
+                )
+            except Exception as e:
+                self.logger.error(f"Error while inserting batch: {e}")
+                return False
+
+        return True
+
+    async def adelete_by_ids(self, collection_name: str, record_ids: list):
+
+        if not self.async_client:
+            return await super().adelete_by_ids(
+                collection_name=collection_name,
+                record_ids=record_ids,
+            )
+
+        try:
+            _ = await self.async_client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=list(record_ids)),
+            )
+        except Exception as e:
+            self.logger.error(f"Error while deleting records: {e}")
+            return False
+
+        return True
+
+    async def alist_record_ids(self, collection_name: str, offset=None, limit: int = 1000):
+
+        if not self.async_client:
+            return await super().alist_record_ids(
+                collection_name=collection_name,
+                offset=offset,
+                limit=limit,
+            )
+
+        if not await self.async_client.collection_exists(collection_name=collection_name):
+            return [], None
+
+        records, next_offset = await self.async_client.scroll(
+            collection_name=collection_name,
+            offset=offset,
+            limit=limit,
+            with_payload=False,
+            with_vectors=False,
+        )
+
+        return [record.id for record in records], next_offset
+
+    async def acount_records(self, collection_name: str) -> int:
+
+        if not self.async_client:
+            return await super().acount_records(collection_name=collection_name)
+
+        if not await self.async_client.collection_exists(collection_name=collection_name):
+            return 0
+
+        result = await self.async_client.count(collection_name=collection_name, exact=True)
+        return result.count
+
+    def search_by_vector(self,
+                         collection_name: str,
+                         vector: list,
+                         limit: int = 5,
+                         threshold: float = None,
+                         search_config: dict = None,
+                         filters: list = None):
         """
+        Return up to 'limit' docs whose similarity is >= threshold.
 
-        # 1) Pull more docs than 'limit' so we can filter some out
-        big_limit = max(limit, 1000)
+        The threshold is applied by Qdrant (score_threshold) and the hits come
+        back sorted by score, so only the text payload of the returned hits is
+        transferred. filters run inside the search, on the indexed payload;
+        search_config overrides hnsw_ef, rescore and oversampling.
+        """
         raw_results = self.client.search(
             collection_name=collection_name,
             query_vector=vector,
-            limit=big_limit,
+            limit=limit,
+            score_threshold=threshold,
+            query_filter=self.build_filter(filters=filters),
+            search_params=self.get_search_params(search_config=search_config),
+            with_payload=["text"],
         )
 
-        if not raw_results:
+        return self.build_retrieved_documents(raw_results=raw_results)
+
+    async def asearch_by_vector(self,
+                                collection_name: str,
+                                vector: list,
+                                limit: int = 5,
+                                threshold: float = None,
+                                search_config: dict = None,
+                                filters: list = None):
+
+        if not self.async_client:
+            return await asyncio.to_thread(
+                self.search_by_vector,
+                collection_name=collection_name,
+                vector=vector,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            )
+
+        raw_results = await self.async_client.search(
+            collection_name=collection_name,
+            query_vector=vector,
+            limit=limit,
+            score_threshold=threshold,
+            query_filter=self.build_filter(filters=filters),
+            search_params=self.get_search_params(search_config=search_config),
+            with_payload=["text"],
+        )
+
+        return self.build_retrieved_documents(raw_results=raw_results)
+
+    def get_search_requests(self, vectors: list, limit: int = 5, threshold: float = None,
+                            search_config: dict = None, filters: list = None):
+        query_filter = self.build_filter(filters=filters)
+        search_params = self.get_search_params(search_config=search_config)
+
+        return [
+            models.SearchRequest(
+                vector=vector,
+                limit=limit,
+                score_threshold=threshold,
+                filter=query_filter,
+                params=search_params,
+                with_payload=["text"],
+            )
+            for vector in vectors
+        ]
+
+    def search_batch_by_vectors(self,
+                                collection_name: str,
+                                vectors: list,
+                                limit: int = 5,
+                                threshold: float = None,
+                                search_config: dict = None,
+                                filters: list = None):
+        """
+        All the queries in one search_batch request, one result list per
+        vector. Same options as search_by_vector, without the post filter.
+        """
+        if not vectors:
             return []
 
-        # 2) Convert distance -> similarity, filter out docs below threshold
-        filtered_docs = []
-        for r in raw_results:
-            similarity = r.score  # Qdrant's score is a "distance"
-            
-            # if threshold is set, skip doc if similarity < threshold
-            if threshold is not None and similarity < threshold:
-                continue
-            
-            doc = RetrievedDocument(
-                score=similarity,
-                text=r.payload["text"],
+        batch_results = self.client.search_batch(
+            collection_name=collection_name,
+            requests=self.get_search_requests(
+                vectors=vectors,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            ),
+        )
+
+        return [
+            self.build_retrieved_documents(raw_results=raw_results)
+            for raw_results in batch_results
+        ]
+
+    async def asearch_batch_by_vectors(self,
+                                       collection_name: str,
+                                       vectors: list,
+                                       limit: int = 5,
+                                       threshold: float = None,
+                                       search_config: dict = None,
+                                       filters: list = None):
+
+        if not self.async_client:
+            return await asyncio.to_thread(
+                self.search_batch_by_vectors,
+                collection_name=collection_name,
+                vectors=vectors,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
             )
-            filtered_docs.append(doc)
 
-        # 3) Sort by similarity desc
-        filtered_docs.sort(key=lambda d: d.score, reverse=True)
+        if not vectors:
+            return []
+
+        batch_results = await self.async_client.search_batch(
+            collection_name=collection_name,
+            requests=self.get_search_requests(
+                vectors=vectors,
+                limit=limit,
+                threshold=threshold,
+                search_config=search_config,
+                filters=filters,
+            ),
+        )
+
+        return [
+            self.build_retrieved_documents(raw_results=raw_results)
+            for raw_results in batch_results
+        ]
+
+    def build_retrieved_documents(self, raw_results: list):
 
-        # 4) Return top 'limit'
-        return filtered_docs[:limit]
+        return [
+            RetrievedDocument(
+                score=r.score,
+                text=r.payload["text"],
+                chunk_id=r.id if isinstance(r.id, int) else None,
+            )
+            for r in raw_results
+        ]
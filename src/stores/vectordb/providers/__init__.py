@@ -1 +1,3 @@
 from .QdrantDBProvider import QdrantDBProvider
+from .PGVectorProvider import PGVectorProvider
+from .NumpyMemmapProvider import NumpyMemmapProvider